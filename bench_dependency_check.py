@@ -0,0 +1,140 @@
+"""依存ライブラリ判定のベンチマーク
+
+requirements.txt のパッケージをすべてimportするスクリプトに対して、
+旧方式（__import__で実際に読み込む）と現在の DependencyChecker
+（importlib.util.find_spec / importlib.metadata）の所要時間と
+メモリ使用量（最大RSSの増加分）を比較する。
+
+各方式は別プロセスで実行するため、互いの読み込み結果は影響しない。
+
+実行方法:
+  python bench_dependency_check.py
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.resolve()
+
+# requirements.txt のディストリビューション名 -> import名
+REQUIREMENT_IMPORTS = {
+    'PySide6': 'PySide6',
+    'pandas': 'pandas',
+    'numpy': 'numpy',
+    'openpyxl': 'openpyxl',
+    'xlrd': 'xlrd',
+    'Pillow': 'PIL',
+    'PyPDF2': 'PyPDF2',
+    'PyMuPDF': 'fitz',
+    'pypdf': 'pypdf',
+    'reportlab': 'reportlab',
+    'cairosvg': 'cairosvg',
+    'SQLAlchemy': 'sqlalchemy',
+    'python-dateutil': 'dateutil',
+    'pytz': 'pytz',
+    'pyperclip': 'pyperclip',
+    'pyserial': 'serial',
+    'python-barcode': 'barcode',
+    'qrcode': 'qrcode',
+    'requests': 'requests',
+    'python-dotenv': 'dotenv',
+    'matplotlib': 'matplotlib',
+    'networkx': 'networkx',
+    'plotly': 'plotly',
+    'python-docx': 'docx',
+    'beautifulsoup4': 'bs4',
+    'lxml': 'lxml',
+    'markdown': 'markdown',
+    'sympy': 'sympy',
+    'pytest': 'pytest',
+    'pytest-cov': 'pytest_cov',
+    'pytest-qt': 'pytestqt',
+    'black': 'black',
+    'flake8': 'flake8',
+    'pyinstaller': 'PyInstaller',
+    'playwright': 'playwright',
+    'pix2tex': 'pix2tex',
+    'Sphinx': 'sphinx',
+}
+
+# 子プロセスで実行するコード（argv: モード, スクリプトパス）
+CHILD_CODE = r'''
+import json, sys, time, ast
+sys.path.insert(0, sys.argv[3])
+from game_script_button import DependencyChecker
+
+def rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windowsではresourceがないため計測しない
+        return 0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+def legacy_check(script_path):
+    with open(script_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name.split('.')[0])
+    installed, missing = [], []
+    for module in imports - set(sys.stdlib_module_names):
+        try:
+            __import__(module)
+            installed.append(module)
+        except Exception:
+            missing.append(module)
+    return {'installed': installed, 'missing': missing}
+
+before = rss_kb()
+start = time.perf_counter()
+if sys.argv[1] == 'legacy':
+    result = legacy_check(sys.argv[2])
+else:
+    result = DependencyChecker.check_python_script(sys.argv[2], use_cache=False)
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_delta_kb': rss_kb() - before,
+    'installed': len(result['installed']),
+    'missing': len(result['missing']),
+    'loaded_modules': len(sys.modules),
+}))
+'''
+
+
+def run_mode(mode, script_path):
+    """1つの方式を別プロセスで計測"""
+    completed = subprocess.run(
+        [sys.executable, '-c', CHILD_CODE, mode, str(script_path), str(BASE_DIR)],
+        capture_output=True, text=True
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f"{mode} の計測に失敗しました:\n{completed.stderr}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script_path = Path(temp_dir) / "imports_all.py"
+        script_path.write_text(
+            "".join(f"import {module}\n" for module in REQUIREMENT_IMPORTS.values()),
+            encoding='utf-8'
+        )
+
+        results = {mode: run_mode(mode, script_path) for mode in ('legacy', 'find_spec')}
+
+    print(f"対象: requirements.txt の {len(REQUIREMENT_IMPORTS)} パッケージ")
+    print(f"{'方式':<12}{'時間(秒)':>10}{'RSS増加(MB)':>14}{'インストール済':>10}{'未インストール':>10}{'読込モジュール数':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<12}{result['seconds']:>10.3f}{result['rss_delta_kb'] / 1024:>14.1f}"
+              f"{result['installed']:>10}{result['missing']:>10}{result['loaded_modules']:>12}")
+
+
+if __name__ == "__main__":
+    main()
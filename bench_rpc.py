@@ -0,0 +1,106 @@
+"""JSON-RPC 制御ソケットの負荷テスト
+
+起動中のスクリプトボタンに複数のクライアントから同時に要求を送り続け、
+1秒あたりの処理件数と応答時間（中央値・99パーセンタイル）を表示する。
+先に game_script_button.py を起動しておくこと。
+
+ローカルソケット（Unixドメインソケット）を使う。Windowsでは名前付きパイプになるため、
+config.json の rpc_http_port を設定して --http で HTTP 経由で計測する。
+
+実行方法:
+  python bench_rpc.py
+  python bench_rpc.py --clients 16 --seconds 10 --method cassettes.list
+  python bench_rpc.py --http
+"""
+import argparse
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+from game_script_button import instance_server_name, send_instance_request
+
+BASE_DIR = Path(__file__).parent.resolve()
+
+
+def socket_worker(path, request, deadline, latencies, errors):
+    """ローカルソケットで1要求ずつ送って応答を待つ"""
+    payload = (json.dumps(request) + "\n").encode('utf-8')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        reader = client.makefile('rb')
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            client.sendall(payload)
+            response = json.loads(reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if 'error' in response:
+                errors.append(response['error'])
+
+
+def http_worker(port, request, deadline, latencies, errors):
+    """HTTP（Keep-Alive）で1要求ずつ送って応答を待つ"""
+    payload = json.dumps(request)
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        connection.request('POST', '/', payload, {'Content-Type': 'application/json'})
+        response = json.loads(connection.getresponse().read())
+        latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            errors.append(response['error'])
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON-RPC 制御ソケットの負荷テスト")
+    parser.add_argument('--clients', type=int, default=8, help="同時に接続するクライアント数（既定: 8）")
+    parser.add_argument('--seconds', type=float, default=5.0, help="計測時間（秒、既定: 5）")
+    parser.add_argument('--method', default='processes.list', help="送るメソッド（既定: processes.list）")
+    parser.add_argument('--params', default='{}', help="メソッドの引数（JSON、既定: {}）")
+    parser.add_argument('--http', action='store_true', help="ローカルソケットの代わりに HTTP で送る")
+    args = parser.parse_args()
+
+    info = send_instance_request(instance_server_name(BASE_DIR), 'server.info')
+    if not info or 'result' not in info:
+        print("起動中のスクリプトボタンが見つかりません。先に game_script_button.py を起動してください。")
+        sys.exit(1)
+    info = info['result']
+
+    if args.http:
+        if not info['http_port']:
+            print("HTTP が無効です。config.json の rpc_http_port を設定して起動し直してください。")
+            sys.exit(1)
+        worker, target = http_worker, info['http_port']
+    else:
+        worker, target = socket_worker, info['socket']
+
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': args.method, 'params': json.loads(args.params)}
+    deadline = time.perf_counter() + args.seconds
+    latencies, errors = [], []
+    threads = [threading.Thread(target=worker, args=(target, request, deadline, latencies, errors))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    if not latencies:
+        print("応答がありませんでした。")
+        sys.exit(1)
+    print(f"対象: {'HTTP :' + str(target) if args.http else target}  メソッド: {args.method}")
+    print(f"クライアント数: {args.clients}  計測時間: {elapsed:.1f}秒")
+    print(f"処理件数: {len(latencies)}件  ({len(latencies) / elapsed:.0f} 件/秒)  エラー: {len(errors)}件")
+    print(f"応答時間: 中央値 {latencies[len(latencies) // 2] * 1000:.2f}ms"
+          f" / 99% {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms"
+          f" / 最大 {latencies[-1] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
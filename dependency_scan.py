@@ -0,0 +1,290 @@
+"""依存関係チェック用のimport解析
+
+標準ライブラリだけを使う小さなモジュール。GUI本体（PySide6・NumPy）を読み込まずに
+使えるので、並列解析のワーカープロセスはこのファイルだけを実行する。
+
+multiprocessing の spawn はワーカーごとに呼び出し元のメインスクリプトを読み込み直すため、
+GUI本体から使うと各ワーカーが PySide6 と NumPy を読み込んでしまう。ScanPool は
+代わりに `python dependency_scan.py --worker` を起動し、1行1件のJSON（ASCIIのみ）で
+要求と結果をやり取りする。
+"""
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def is_installed(module):
+    """モジュールがインストールされているか（importはしない）"""
+    if module in sys.modules:
+        return True
+    try:
+        # トップレベル名のfind_specは親パッケージの読み込みも発生しない
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def file_signature(file_path):
+    """ファイルの変更検出用シグネチャ [更新時刻, サイズ]"""
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def parse_imports(file_path):
+    """ファイル内のimport文を抽出
+
+    Returns:
+        ([(モジュール名, 相対レベル, [importした名前]), ...], エラー文字列またはNone)
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=str(file_path))
+    except (OSError, SyntaxError, ValueError) as e:
+        return [], str(e)
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, 0, []))
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module or '', node.level, [alias.name for alias in node.names]))
+    return imports, None
+
+
+def find_local_module(base_dir, dotted, top_level=False):
+    """base_dir起点でドット区切りのモジュール名に対応するローカルファイルを探す
+
+    Returns:
+        読み込まれるファイルのリスト（パッケージの__init__.pyを含む）。
+        先頭の名前がローカルに存在しなければNone
+    """
+    files = []
+    current = base_dir
+    for index, part in enumerate(dotted.split('.')):
+        package_dir = current / part
+        module_file = current / f"{part}.py"
+        if (package_dir / "__init__.py").is_file():
+            files.append(package_dir / "__init__.py")
+            current = package_dir
+        elif module_file.is_file():
+            files.append(module_file)
+            return files  # 残りはモジュール内の属性
+        elif package_dir.is_dir() and not (top_level and index == 0 and is_installed(part)):
+            # 名前空間パッケージ（インストール済みの同名パッケージが優先される）
+            current = package_dir
+        else:
+            return files if index else None
+    return files
+
+
+def resolve_import(file_path, module, level, names, search_roots):
+    """import文を解決
+
+    Returns:
+        (ローカルファイルのリスト, サードパーティ候補のトップレベル名またはNone)
+    """
+    if level:
+        # 相対import
+        base = file_path.parent
+        for _ in range(level - 1):
+            base = base.parent
+        files = (find_local_module(base, module) or []) if module else []
+        target = base.joinpath(*module.split('.')) if module else base
+        if target.is_dir():
+            for name in names:
+                files += find_local_module(target, name) or []
+        return files, None
+
+    for root in search_roots:
+        files = find_local_module(root, module, top_level=True)
+        if files is not None:
+            target = root.joinpath(*module.split('.'))
+            if target.is_dir():
+                # from pkg import submodule
+                for name in names:
+                    files += find_local_module(target, name) or []
+            return files, None
+    return [], module.split('.')[0]
+
+
+def collect_imports(script_path, source_root, cancelled=None, parse_files=None):
+    """スクリプトとそこからimportされるローカルモジュールを解析
+
+    ローカルモジュールはスクリプトのフォルダとsource_rootから探し、推移的にたどる。
+    各サードパーティライブラリには、それを読み込むまでのimportの経路（chains）を付ける。
+    中断された場合はNone。
+
+    Args:
+        parse_files: ファイルのリストを受け取り {ファイル: parse_imports の結果} を返す関数
+            （省略時はこのプロセスで1件ずつ解析）
+    """
+    cancelled = cancelled or (lambda: False)
+    parse_files = parse_files or (lambda files: {file_path: parse_imports(file_path) for file_path in files})
+    search_roots = [script_path.parent]
+    if source_root != script_path.parent:
+        search_roots.append(source_root)
+
+    def relative(file_path):
+        for root in (source_root, script_path.parent):
+            try:
+                return str(file_path.relative_to(root))
+            except ValueError:
+                continue
+        return str(file_path)
+
+    stdlib_modules = set(sys.stdlib_module_names)
+    file_chains = {script_path: [relative(script_path)]}
+    module_chains = {}
+    imports = set()
+    parse_errors = {}
+
+    # 幅優先でたどるので、各ライブラリには最短の経路が記録される
+    frontier = [script_path]
+    while frontier:
+        if cancelled():
+            return None
+        parsed = parse_files(frontier)
+        next_frontier = []
+        for file_path in frontier:
+            file_imports, error = parsed[file_path]
+            if error:
+                if file_path == script_path:
+                    return {
+                        'error': error,
+                        'all_imports': [],
+                        'third_party': [],
+                        'installed': [],
+                        'missing': [],
+                        'versions': {}
+                    }
+                parse_errors[relative(file_path)] = error
+            for module, level, names in file_imports:
+                local_files, top_level = resolve_import(file_path, module, level, names, search_roots)
+                for local_file in local_files:
+                    if local_file not in file_chains:
+                        file_chains[local_file] = file_chains[file_path] + [relative(local_file)]
+                        next_frontier.append(local_file)
+                if not level and module:
+                    imports.add(module.split('.')[0])
+                if top_level and top_level not in stdlib_modules and top_level not in module_chains:
+                    module_chains[top_level] = file_chains[file_path]
+        frontier = next_frontier
+
+    local_files = {}
+    for file_path in file_chains:
+        if file_path != script_path:
+            try:
+                local_files[str(file_path)] = file_signature(file_path)
+            except OSError:
+                pass
+
+    return {
+        'all_imports': sorted(imports),
+        'third_party': sorted(module_chains),
+        'chains': module_chains,
+        'local_modules': sorted(file_chains[file_path][-1] for file_path in file_chains if file_path != script_path),
+        'local_files': local_files,
+        'parse_errors': parse_errors
+    }
+
+
+def collect_cassette_imports(script_path, source_root):
+    """1カセット分のimportを解析（パスは文字列で受け取る）"""
+    return collect_imports(Path(script_path), Path(source_root))
+
+
+# ワーカーが受け付ける関数
+WORKER_FUNCTIONS = {
+    'parse_imports': parse_imports,
+    'collect_cassette_imports': collect_cassette_imports,
+}
+
+
+class ScanPool:
+    """解析用のワーカープロセスのプール
+
+    スレッドごとに1つのワーカープロセスを持ち、要求を1件ずつ渡す。
+    ワーカーが落ちた場合は、次の要求で起動し直す。
+    """
+    def __init__(self, max_workers):
+        if getattr(sys, 'frozen', False):
+            # 実行ファイルにまとめた環境では sys.executable がアプリ本体になる
+            raise RuntimeError("ワーカープロセスを起動できない環境です")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dependency-scan")
+        self.local = threading.local()
+        self.processes = []
+        self.lock = threading.Lock()
+
+    def _get_process(self):
+        """このスレッドのワーカープロセス（なければ起動）"""
+        process = getattr(self.local, 'process', None)
+        if process is None or process.poll() is not None:
+            process = subprocess.Popen(
+                [sys.executable, str(Path(__file__).resolve()), '--worker'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding='utf-8'
+            )
+            self.local.process = process
+            with self.lock:
+                self.processes.append(process)
+        return process
+
+    def call(self, function_name, *args):
+        """ワーカーで関数を実行して結果を返す（このスレッドで完了を待つ）"""
+        process = self._get_process()
+        try:
+            process.stdin.write(json.dumps([function_name, args]) + "\n")
+            process.stdin.flush()
+            line = process.stdout.readline()
+        except OSError:
+            line = ""
+        if not line:
+            self.local.process = None
+            raise RuntimeError("解析ワーカーが終了しました")
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def submit(self, function_name, *args):
+        """ワーカーで関数を実行する（Futureを返す）"""
+        return self.executor.submit(self.call, function_name, *args)
+
+    def map(self, function_name, items):
+        """各要素についてワーカーで関数を実行し、結果を順に返す"""
+        return self.executor.map(lambda item: self.call(function_name, item), items)
+
+    def shutdown(self):
+        """ワーカープロセスを終了"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.lock:
+            processes, self.processes = self.processes, []
+        for process in processes:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+
+
+def run_worker():
+    """標準入力の要求（1行1件）を処理し、結果を1行ずつ標準出力に書く"""
+    for line in sys.stdin:
+        try:
+            function_name, args = json.loads(line)
+            response = {'result': WORKER_FUNCTIONS[function_name](*args)}
+        except Exception as e:
+            response = {'error': f"{type(e).__name__}: {e}"}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    if '--worker' in sys.argv[1:]:
+        run_worker()
@@ -1,10 +1,27 @@
 import sys
 import json
+import argparse
+import base64
+import csv
+import heapq
+import re
 import subprocess
 import hashlib
-import ast
+import getpass
+import os
+import site
+import threading
+import time
+import unicodedata
+import uuid
+import importlib.metadata
 import shutil
-from datetime import datetime
+import tempfile
+from array import array
+from collections import Counter
+from concurrent.futures import as_completed
+from itertools import compress
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QGridLayout, QDialog,
@@ -12,10 +29,23 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QTextEdit, QListWidget, QListWidgetItem, QFrame,
                                QScrollArea, QColorDialog, QInputDialog, QCheckBox,
                                QComboBox, QTableWidget, QTableWidgetItem, QHeaderView,
-                               QProgressDialog, QTabWidget, QTreeWidget, QTreeWidgetItem)
-from PySide6.QtCore import Qt, QSize, QMimeData, QPoint, Signal
+                               QProgressDialog, QTabWidget, QTreeWidget, QTreeWidgetItem,
+                               QTableView, QDateEdit, QProgressBar, QTreeView,
+                               QFileSystemModel)
+from PySide6.QtCore import (Qt, QSize, QMimeData, QPoint, Signal, QTimer, QDate,
+                            QAbstractTableModel, QModelIndex, QObject, QRunnable,
+                            QThreadPool, QDir, QSortFilterProxyModel, QFileSystemWatcher,
+                            QBuffer, QIODevice, QLockFile)
 from PySide6.QtGui import (QIcon, QPixmap, QFont, QColor, QPalette, QPainter,
-                          QDrag, QPen, QBrush)
+                          QDrag, QPen, QBrush, QKeySequence, QShortcut)
+from PySide6.QtNetwork import QLocalServer, QLocalSocket, QTcpServer, QHostAddress
+
+import dependency_scan
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # 管理者パスワードのハッシュ（yamabuki）
 ADMIN_PASSWORD_HASH = hashlib.sha256("yamabuki".encode()).hexdigest()
@@ -36,6 +66,236 @@ COLORS = {
     "hover": "#f5f5f5"  # ホバー時の背景
 }
 
+# config.json の既定値（ファイルにない項目はこの値を使う）
+DEFAULT_CONFIG = {
+    # フォルダスキャンの除外パターン（.gitignore形式。隠しファイル・フォルダは常に除外）
+    'scan_ignore': ['__pycache__/', 'venv/', 'env/', 'node_modules/', 'build/', 'dist/',
+                    'site-packages/', '*.egg-info/'],
+    'scan_max_depth': 12,      # ルートから何階層下まで探すか
+    'scan_max_files': 50000,   # 1回のスキャンで列挙するファイル数の上限
+    # スロットの配置（1バンク = 行数 × 列数。バンクを切り替えて使う）
+    'slot_rows': 2,
+    'slot_columns': 5,
+    'slot_banks': 10,          # 最低限用意するバンク数（セーブにそれ以上のスロットがあれば増やす）
+    'autosave_delay': 2.0,     # 配置を変えてから自動保存するまでの秒数（続けて変えると待ち直す）
+    'rpc_http_port': 0,        # JSON-RPC を localhost の HTTP でも受け付けるポート（0なら無効）
+}
+
+_config_cache = {}  # 設定ファイルのパス -> (更新時刻, 読み込んだ内容)
+
+def load_config(config_file=None):
+    """config.json を読み込み、既定値とマージして返す（ファイルが変わるまで内容をキャッシュ）"""
+    config = {key: list(value) if isinstance(value, list) else value for key, value in DEFAULT_CONFIG.items()}
+    config_file = Path(config_file) if config_file else Path(__file__).parent / "config.json"
+    try:
+        mtime = config_file.stat().st_mtime_ns
+    except OSError:
+        return config
+    
+    cached = _config_cache.get(str(config_file))
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                cached = (mtime, json.load(f))
+        except Exception as e:
+            print(f"設定ファイル読み込みエラー: {e}")
+            cached = (mtime, {})
+        _config_cache[str(config_file)] = cached
+    config.update(cached[1])
+    return config
+
+def write_json_atomic(path, data, **dump_options):
+    """JSONを一時ファイルに書いてから置き換える（途中で落ちても書きかけのファイルが残らない）"""
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_options)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+class ScanPolicy:
+    """フォルダスキャンの共通ルール
+    
+    スクリプト選択ダイアログ、メインスクリプトの検索、アイコンの検索がすべて
+    同じルールでフォルダを走査する。
+    
+    - 除外パターンは .gitignore 形式（config.json の scan_ignore と、
+      カセットの info.json の scan_ignore を合わせて使う。後のパターンが優先され、
+      ! で始まるパターンは除外を取り消す）
+    - 隠しファイル・隠しフォルダ（.で始まる名前）は常に除外
+    - max_depth より深いフォルダには入らない（ルート直下が深さ0）
+    - max_files 件のファイルを列挙したら打ち切る
+    - シンボリックリンクのフォルダはたどるが、同じ実体のフォルダには2度入らない
+    """
+    
+    def __init__(self, patterns=(), max_depth=None, max_files=None):
+        self.patterns = list(patterns)
+        self.rules = [rule for rule in (self.compile_pattern(p) for p in self.patterns) if rule]
+        self.max_depth = DEFAULT_CONFIG['scan_max_depth'] if max_depth is None else max_depth
+        self.max_files = DEFAULT_CONFIG['scan_max_files'] if max_files is None else max_files
+    
+    @classmethod
+    def from_config(cls, config=None, extra_patterns=()):
+        """config.json（と追加のパターン）からポリシーを作成"""
+        config = config or load_config()
+        return cls(list(config.get('scan_ignore', [])) + list(extra_patterns),
+                   config.get('scan_max_depth'), config.get('scan_max_files'))
+    
+    @classmethod
+    def for_folder(cls, folder_path, config=None):
+        """フォルダに info.json があれば、その scan_ignore も加えたポリシーを作成"""
+        extra = []
+        info_file = Path(folder_path) / "info.json"
+        if info_file.exists():
+            try:
+                with open(info_file, 'r', encoding='utf-8') as f:
+                    extra = json.load(f).get('scan_ignore', [])
+            except Exception as e:
+                print(f"カセット情報の読み込みエラー: {e}")
+        return cls.from_config(config, extra)
+    
+    @staticmethod
+    def compile_pattern(pattern):
+        """.gitignore形式のパターンを (正規表現, 否定か, フォルダのみか) に変換"""
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#'):
+            return None
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        if pattern.startswith('\\'):  # \# や \! で始まる名前
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern  # 途中に/があればルートからの相対パスとして扱う
+        pattern = pattern.lstrip('/')
+        if not pattern:
+            return None
+        
+        regex = ''
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                regex += '(?:.*/)?'
+                i += 3
+            elif pattern.startswith('**', i):
+                regex += '.*'
+                i += 2
+            elif pattern[i] == '*':
+                regex += '[^/]*'
+                i += 1
+            elif pattern[i] == '?':
+                regex += '[^/]'
+                i += 1
+            elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+                close = pattern.index(']', i + 2)
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = close + 1
+            else:
+                regex += re.escape(pattern[i])
+                i += 1
+        
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        return re.compile(regex), negate, dir_only
+    
+    def is_ignored(self, relative_path, is_dir):
+        """ルートからの相対パス（/区切り）が除外対象か"""
+        name = relative_path.rsplit('/', 1)[-1]
+        if name.startswith('.'):
+            return True
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(relative_path):
+                ignored = not negate
+        return ignored
+    
+    def walk(self, root, extensions=None, cancelled=None, max_depth=None):
+        """フォルダを幅優先で走査し、フォルダごとに (相対フォルダのタプル, [ファイルパス]) を返す
+        
+        Args:
+            extensions: 列挙するファイルの拡張子（Noneならすべて）
+            cancelled: 中断を判定する関数
+            max_depth: この走査だけ深さの上限を変える場合に指定
+        """
+        max_depth = self.max_depth if max_depth is None else max_depth
+        root = str(root)
+        visited = set()
+        file_count = 0
+        queue = [(root, ())]
+        
+        while queue:
+            next_queue = []
+            for directory, relative in queue:
+                if cancelled and cancelled():
+                    return
+                try:
+                    stat = os.stat(directory)
+                except OSError:
+                    continue
+                if (stat.st_dev, stat.st_ino) in visited:  # シンボリックリンクのループ
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                
+                files = []
+                subdirs = []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            try:
+                                is_dir = entry.is_dir()
+                            except OSError:
+                                continue
+                            relative_path = '/'.join(relative + (entry.name,))
+                            if self.is_ignored(relative_path, is_dir):
+                                continue
+                            if is_dir:
+                                if len(relative) < max_depth:
+                                    subdirs.append((entry.path, relative + (entry.name,)))
+                            elif extensions is None or os.path.splitext(entry.name)[1].lower() in extensions:
+                                files.append(entry.path)
+                except OSError:
+                    continue
+                
+                files.sort(key=str.lower)
+                if file_count + len(files) >= self.max_files:
+                    yield relative, files[:self.max_files - file_count]
+                    return
+                file_count += len(files)
+                yield relative, files
+                
+                subdirs.sort(key=lambda item: item[0].lower())
+                next_queue.extend(subdirs)
+            queue = next_queue
+    
+    def find_first(self, root, extensions):
+        """拡張子の優先順で最初のファイルを探す（ルート直下を優先し、次にサブフォルダ全体）"""
+        priority = {ext: i for i, ext in enumerate(extensions)}
+        best = None
+        for relative, files in self.walk(root, set(extensions)):
+            if best and best[0][1] == 0 and len(relative) > best[0][2]:
+                break  # 幅優先なので、これより浅い最優先の拡張子は見つかっている
+            for file_path in files:
+                key = (bool(relative), priority[os.path.splitext(file_path)[1].lower()], len(relative))
+                if best is None or key < best[0]:
+                    best = (key, file_path)
+            if best and not relative:  # ルート直下で見つかった
+                break
+        return Path(best[1]) if best else None
+
 class CustomMessageBox(QDialog):
     """カスタムメッセージボックス（適切なスタイリング付き）"""
     
@@ -208,100 +468,1565 @@ class CustomMessageBox(QDialog):
         result = CustomMessageBox.show_message(parent, title, message, "question", ["はい", "いいえ"])
         return result == "はい"
 
+WEEKDAY_NAMES = ["月", "火", "水", "木", "金", "土", "日"]
+
+class UsageRollup:
+    """実行ログの集計（ロールアップ）管理クラス
+    
+    カセットごとの日別件数と曜日×時間帯のヒートマップを保持し、
+    ログ追加のたびに差分だけ更新する。統計画面は生ログを走査せずに表示できる。
+    
+    フレセンシー（頻度×時間減衰）はフォルダごとに [スコア, 最終実行秒] を持ち、
+    実行のたびに前回からの経過時間ぶん減衰させてから1を加える。
+    """
+    VERSION = 2
+    FRECENCY_HALF_LIFE = 14 * 24 * 3600  # フレセンシーの半減期（秒）
+    DAILY_DAYS = 90  # 日別件数を残す日数（最新の記録日から数える）
+    
+    def __init__(self, rollup_file):
+        self.rollup_file = Path(rollup_file)
+        self.reset()
+        self.loaded = self.load()
+    
+    def reset(self):
+        """集計を初期化"""
+        self.entry_count = 0
+        self.names = {}       # フォルダ名 -> 最後に記録されたカセット名
+        self.totals = {}      # フォルダ名 -> 実行回数
+        self.daily = {}       # "YYYY-MM-DD" -> {フォルダ名: 実行回数}
+        self.heatmap = [0] * (7 * 24)  # 曜日×時間帯（全カセット）
+        self.cassette_heatmaps = {}    # フォルダ名 -> 曜日×時間帯
+        self.frecency = {}             # フォルダ名 -> [スコア, 最終実行秒]
+    
+    def load(self):
+        """集計ファイルを読み込み（成功時True）"""
+        if not self.rollup_file.exists():
+            return False
+        try:
+            with open(self.rollup_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != self.VERSION:
+                return False
+            self.entry_count = data.get('entry_count', 0)
+            self.names = data.get('names', {})
+            self.totals = data.get('totals', {})
+            self.daily = data.get('daily', {})
+            self.heatmap = data.get('heatmap', [0] * (7 * 24))
+            self.cassette_heatmaps = data.get('cassette_heatmaps', {})
+            self.frecency = data.get('frecency', {})
+            self.prune_daily()
+            return True
+        except Exception as e:
+            print(f"集計読み込みエラー: {e}")
+            self.reset()
+            return False
+    
+    def save(self):
+        """集計ファイルを保存"""
+        data = {
+            'version': self.VERSION,
+            'entry_count': self.entry_count,
+            'names': self.names,
+            'totals': self.totals,
+            'daily': self.daily,
+            'heatmap': self.heatmap,
+            'cassette_heatmaps': self.cassette_heatmaps,
+            'frecency': self.frecency
+        }
+        try:
+            write_json_atomic(self.rollup_file, data, ensure_ascii=False)
+        except Exception as e:
+            print(f"集計保存エラー: {e}")
+    
+    def prune_daily(self):
+        """最新の記録日から DAILY_DAYS 日より前の日別件数を捨てる"""
+        if len(self.daily) <= self.DAILY_DAYS:
+            return
+        newest = datetime.strptime(max(self.daily), "%Y-%m-%d")
+        cutoff = (newest - timedelta(days=self.DAILY_DAYS - 1)).strftime("%Y-%m-%d")
+        for day in [day for day in self.daily if day < cutoff]:
+            del self.daily[day]
+    
+    def add(self, cassette_name, cassette_folder, timestamp):
+        """1件の実行を集計に加算"""
+        self.entry_count += 1
+        self.names[cassette_folder] = cassette_name
+        self.totals[cassette_folder] = self.totals.get(cassette_folder, 0) + 1
+        
+        day_label = timestamp.strftime("%Y-%m-%d")
+        day = self.daily.get(day_label)
+        if day is None:
+            day = self.daily[day_label] = {}
+            self.prune_daily()
+        day[cassette_folder] = day.get(cassette_folder, 0) + 1
+        
+        cell = timestamp.weekday() * 24 + timestamp.hour
+        self.heatmap[cell] += 1
+        if cassette_folder not in self.cassette_heatmaps:
+            self.cassette_heatmaps[cassette_folder] = [0] * (7 * 24)
+        self.cassette_heatmaps[cassette_folder][cell] += 1
+        
+        seconds = (timestamp - ExecutionLog.EPOCH).total_seconds()
+        score, last_seconds = self.frecency.get(cassette_folder, (0.0, seconds))
+        if seconds >= last_seconds:
+            score = score * 2 ** (-(seconds - last_seconds) / self.FRECENCY_HALF_LIFE) + 1.0
+            last_seconds = seconds
+        else:
+            score += 2 ** (-(last_seconds - seconds) / self.FRECENCY_HALF_LIFE)
+        self.frecency[cassette_folder] = [score, last_seconds]
+    
+    def rebuild(self, execution_log):
+        """生ログから集計を作り直す"""
+        self.reset()
+        if np is not None:
+            self._rebuild_vectorized(execution_log)
+        else:
+            for index in range(execution_log.count()):
+                name, folder = execution_log.get_cassette(index)
+                timestamp = execution_log.get_datetime(index)
+                if timestamp is not None:
+                    self.add(name, folder, timestamp)
+        # 解析できなかった行も件数には含め、再集計の要否判定をずらさない
+        self.entry_count = execution_log.count()
+    
+    def _rebuild_vectorized(self, execution_log):
+        """NumPyで一括集計"""
+        cassette_ids, timestamps = execution_log.as_arrays()
+        valid = ~np.isnan(timestamps)
+        cassette_ids = cassette_ids[valid]
+        timestamps = timestamps[valid]
+        if not len(timestamps):
+            return
+        
+        # カセットID -> フォルダ番号（同じフォルダで名前違いのIDをまとめる）
+        folders = []
+        folder_numbers = {}
+        id_to_folder = np.empty(len(execution_log.cassettes), dtype=np.int64)
+        for cassette_id, (name, folder) in enumerate(execution_log.cassettes):
+            id_to_folder[cassette_id] = folder_numbers.setdefault(folder, len(folders))
+            if folder_numbers[folder] == len(folders):
+                folders.append(folder)
+        folder_index = id_to_folder[cassette_ids]
+        folder_count = len(folders)
+        
+        days = np.floor(timestamps / 86400).astype(np.int64)
+        hours = ((timestamps - days * 86400) // 3600).astype(np.int64)
+        cells = ((days + 3) % 7) * 24 + hours  # 1970-01-01は木曜日
+        
+        totals = np.bincount(folder_index, minlength=folder_count)
+        self.totals = {folders[i]: int(count) for i, count in enumerate(totals) if count}
+        self.heatmap = np.bincount(cells, minlength=7 * 24).tolist()
+        per_cassette = np.bincount(folder_index * (7 * 24) + cells, minlength=folder_count * 7 * 24)
+        per_cassette = per_cassette.reshape(folder_count, 7 * 24)
+        self.cassette_heatmaps = {folders[i]: per_cassette[i].tolist() for i in range(folder_count) if totals[i]}
+        
+        # フレセンシー: 各フォルダの最終実行時点まで減衰させた重みの合計
+        last_seconds = np.full(folder_count, -np.inf)
+        np.maximum.at(last_seconds, folder_index, timestamps)
+        weights = np.exp2(-(last_seconds[folder_index] - timestamps) / self.FRECENCY_HALF_LIFE)
+        scores = np.bincount(folder_index, weights=weights, minlength=folder_count)
+        self.frecency = {
+            folders[i]: [float(scores[i]), float(last_seconds[i])]
+            for i in range(folder_count) if totals[i]
+        }
+        
+        keys, counts = np.unique(days * folder_count + folder_index, return_counts=True)
+        epoch = datetime(1970, 1, 1)
+        day_labels = {}
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            day, folder_number = divmod(key, folder_count)
+            if day not in day_labels:
+                day_labels[day] = (epoch + timedelta(days=day)).strftime("%Y-%m-%d")
+            self.daily.setdefault(day_labels[day], {})[folders[folder_number]] = count
+        self.prune_daily()
+        
+        # 各フォルダで最後に使われたカセット名を採用
+        last_positions = {}
+        reversed_ids = cassette_ids[::-1]
+        unique_ids, first_in_reversed = np.unique(reversed_ids, return_index=True)
+        for cassette_id, position in zip(unique_ids.tolist(), first_in_reversed.tolist()):
+            name, folder = execution_log.cassettes[cassette_id]
+            if folder not in last_positions or position < last_positions[folder]:
+                last_positions[folder] = position
+                self.names[folder] = name
+    
+    def get_ranking(self):
+        """カセット別の実行回数（多い順）"""
+        return sorted(
+            ((folder, self.names.get(folder, folder), count) for folder, count in self.totals.items()),
+            key=lambda item: (-item[2], item[1])
+        )
+    
+    def get_heatmap(self, cassette_folder=None):
+        """曜日×時間帯のヒートマップ（7行×24列）"""
+        cells = self.heatmap if cassette_folder is None else self.cassette_heatmaps.get(cassette_folder, [0] * (7 * 24))
+        return [cells[day * 24:(day + 1) * 24] for day in range(7)]
+    
+    def get_busiest_slots(self, limit=5, cassette_folder=None):
+        """最も実行の多い時間帯 [(曜日, 時, 件数), ...]"""
+        cells = self.heatmap if cassette_folder is None else self.cassette_heatmaps.get(cassette_folder, [])
+        ranked = sorted((count, cell) for cell, count in enumerate(cells) if count)
+        return [(cell // 24, cell % 24, count) for count, cell in reversed(ranked[-limit:])]
+    
+    def get_frecency(self, now=None):
+        """現在時点のフレセンシー {フォルダ名: スコア}"""
+        if now is None:
+            now = (datetime.now() - ExecutionLog.EPOCH).total_seconds()
+        return {
+            folder: score * 2 ** (-max(0.0, now - last_seconds) / self.FRECENCY_HALF_LIFE)
+            for folder, (score, last_seconds) in self.frecency.items()
+        }
+    
+    def get_daily_counts(self, days=30, cassette_folder=None, today=None):
+        """今日までの days 日間の日別実行回数 [("YYYY-MM-DD", 件数), ...]（実行のない日は0件）"""
+        today = today or date.today()
+        result = []
+        for offset in range(days - 1, -1, -1):
+            day = (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+            buckets = self.daily.get(day, {})
+            count = sum(buckets.values()) if cassette_folder is None else buckets.get(cassette_folder, 0)
+            result.append((day, count))
+        return result
+
 class ExecutionLog:
-    """実行ログ管理クラス"""
+    """実行ログ管理クラス
+    
+    履歴は列指向で保持する。エントリごとにカセットID（名前とフォルダの組を
+    インターンしたもの）と日時だけを配列に持ち、名前は別表にまとめる。
+    日時はローカル時刻をそのまま1970-01-01起点の秒数にした値（タイムゾーン変換なし）。
+    """
+    EPOCH = datetime(1970, 1, 1)
+    
     def __init__(self, log_file):
         self.log_file = Path(log_file)
-        self.logs = []
+        self.cassettes = []          # カセットID -> (カセット名, フォルダ名)
+        self.cassette_ids = {}       # (カセット名, フォルダ名) -> カセットID
+        self.entry_ids = array('I')  # エントリごとのカセットID
+        self.timestamps = array('d') # エントリごとの日時（秒）
         self.load_logs()
+        
+        # 集計はログの隣に保存し、件数が食い違う場合のみ作り直す
+        self.rollup = UsageRollup(self.log_file.with_name(f"{self.log_file.stem}_rollup.json"))
+        if not self.rollup.loaded or self.rollup.entry_count != self.count():
+            self.rebuild_rollup()
+    
+    @classmethod
+    def to_seconds(cls, timestamp):
+        """ISO形式の日時を秒に変換（解析できない場合はNaN）"""
+        try:
+            dt = datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            return float('nan')
+        if dt.tzinfo is not None:
+            dt = dt.astimezone().replace(tzinfo=None)
+        return (dt - cls.EPOCH).total_seconds()
+    
+    @classmethod
+    def to_datetime(cls, seconds):
+        """秒をdatetimeに変換（NaNの場合はNone）"""
+        if seconds != seconds:
+            return None
+        return cls.EPOCH + timedelta(seconds=seconds)
+    
+    @classmethod
+    def parse_date_prefix(cls, text):
+        """日時の前方一致（例: "2025", "2025-10-28 09"）を秒の範囲 [開始, 終了) に変換
+        
+        日時として解釈できない場合はNone
+        """
+        match = re.fullmatch(r'(\d{4})(?:[-/](\d{1,2})(?:[-/](\d{1,2})(?:[ t](\d{1,2})(?::(\d{1,2}))?)?)?)?', text.strip().lower())
+        if not match:
+            return None
+        year, month, day, hour, minute = (int(part) if part else None for part in match.groups())
+        try:
+            if month is None:
+                start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+            elif day is None:
+                start = datetime(year, month, 1)
+                end = datetime(year + month // 12, month % 12 + 1, 1)
+            elif hour is None:
+                start = datetime(year, month, day)
+                end = start + timedelta(days=1)
+            elif minute is None:
+                start = datetime(year, month, day, hour)
+                end = start + timedelta(hours=1)
+            else:
+                start = datetime(year, month, day, hour, minute)
+                end = start + timedelta(minutes=1)
+        except ValueError:
+            return None
+        return ((start - cls.EPOCH).total_seconds(), (end - cls.EPOCH).total_seconds())
+    
+    def _intern(self, cassette_name, cassette_folder):
+        """カセット名とフォルダの組をIDに変換"""
+        key = (cassette_name, cassette_folder)
+        cassette_id = self.cassette_ids.get(key)
+        if cassette_id is None:
+            cassette_id = len(self.cassettes)
+            self.cassettes.append(key)
+            self.cassette_ids[key] = cassette_id
+        return cassette_id
+    
+    def _reset_entries(self):
+        """保持しているエントリをすべて破棄"""
+        self.cassettes = []
+        self.cassette_ids = {}
+        self.entry_ids = array('I')
+        self.timestamps = array('d')
     
     def load_logs(self):
         """ログを読み込み"""
+        self._reset_entries()
         if self.log_file.exists():
             try:
                 with open(self.log_file, 'r', encoding='utf-8') as f:
-                    self.logs = json.load(f)
+                    logs = json.load(f)
+                for log in logs:
+                    self.entry_ids.append(self._intern(log.get('cassette_name', ''), log.get('cassette_folder', '')))
+                    self.timestamps.append(self.to_seconds(log.get('timestamp')))
             except Exception as e:
                 print(f"ログ読み込みエラー: {e}")
-                self.logs = []
+                self._reset_entries()
     
     def add_log(self, cassette_name, cassette_folder):
         """ログを追加"""
-        log_entry = {
-            'cassette_name': cassette_name,
-            'cassette_folder': cassette_folder,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.logs.append(log_entry)
-        self.save_logs()
+        now = datetime.now()
+        self.entry_ids.append(self._intern(cassette_name, cassette_folder))
+        self.timestamps.append((now - self.EPOCH).total_seconds())
+        if not self._append_last_entry():
+            self.save_logs()
+        
+        self.rollup.add(cassette_name, cassette_folder, now)
+        self.rollup.save()
+    
+    def _format_entry(self, index):
+        """1件をファイル書き出し用のJSON断片にする（json.dump(indent=2)と同じ体裁）"""
+        body = json.dumps(self.get_entry(index), indent=2, ensure_ascii=False)
+        return "  " + body.replace("\n", "\n  ")
+    
+    def _append_last_entry(self):
+        """最後の1件だけをファイル末尾に追記（全体を書き直さない）"""
+        try:
+            if self.count() < 2 or not self.log_file.exists():
+                return False
+            with open(self.log_file, 'r+b') as f:
+                f.seek(0, 2)
+                size = f.tell()
+                if size < 2:
+                    return False
+                f.seek(size - 2)
+                if f.read(2) != b"\n]":
+                    return False
+                f.seek(size - 2)
+                f.write((",\n" + self._format_entry(self.count() - 1) + "\n]").encode('utf-8'))
+                f.truncate()
+            return True
+        except Exception as e:
+            print(f"ログ追記エラー: {e}")
+            return False
     
     def save_logs(self):
-        """ログを保存"""
+        """ログを保存（1件ずつ書き出し、全件の辞書を作らない）"""
         try:
             with open(self.log_file, 'w', encoding='utf-8') as f:
-                json.dump(self.logs, f, indent=2, ensure_ascii=False)
+                if not self.count():
+                    f.write("[]")
+                    return
+                f.write("[\n")
+                for index in range(self.count()):
+                    if index:
+                        f.write(",\n")
+                    f.write(self._format_entry(index))
+                f.write("\n]")
         except Exception as e:
             print(f"ログ保存エラー: {e}")
     
+    def clear(self):
+        """ログと集計をすべて削除"""
+        self._reset_entries()
+        self.save_logs()
+        self.rollup.reset()
+        self.rollup.save()
+    
+    def rebuild_rollup(self):
+        """生ログから集計を作り直して保存"""
+        self.rollup.rebuild(self)
+        self.rollup.save()
+        return self.rollup
+    
+    def count(self):
+        """ログ件数"""
+        return len(self.entry_ids)
+    
+    def get_cassette(self, index):
+        """指定インデックスの (カセット名, フォルダ名)"""
+        return self.cassettes[self.entry_ids[index]]
+    
+    def get_datetime(self, index):
+        """指定インデックスの実行日時（datetime）"""
+        return self.to_datetime(self.timestamps[index])
+    
+    def get_entry(self, index):
+        """指定インデックスのログを辞書で取得"""
+        index = int(index)
+        name, folder = self.cassettes[self.entry_ids[index]]
+        timestamp = self.to_datetime(self.timestamps[index])
+        return {
+            'cassette_name': name,
+            'cassette_folder': folder,
+            'timestamp': timestamp.isoformat() if timestamp else ''
+        }
+    
     def get_recent_logs(self, limit=50):
         """最近のログを取得"""
-        return self.logs[-limit:][::-1]
+        start = max(0, self.count() - limit)
+        return [self.get_entry(index) for index in range(self.count() - 1, start - 1, -1)]
+    
+    def iter_records(self, start=None, end=None, cassette=None):
+        """条件に合うログを1件ずつ返すジェネレータ（古い順）
+        
+        Args:
+            start: この日時以降（datetime、Noneなら制限なし）
+            end: この日時より前（datetime、Noneなら制限なし）
+            cassette: カセットのフォルダ名またはカセット名（Noneならすべて）
+        
+        日時を解析できなかった行（NaN）は、期間を指定しないときだけ日時を空にして返す。
+        """
+        check_range = start is not None or end is not None
+        start_seconds = (start - self.EPOCH).total_seconds() if start else float('-inf')
+        end_seconds = (end - self.EPOCH).total_seconds() if end else float('inf')
+        cassette_ids = None
+        if cassette:
+            cassette_ids = {i for i, (name, folder) in enumerate(self.cassettes) if cassette in (name, folder)}
+        
+        for index in range(self.count()):
+            if check_range and not start_seconds <= self.timestamps[index] < end_seconds:
+                continue
+            if cassette_ids is not None and self.entry_ids[index] not in cassette_ids:
+                continue
+            yield self.get_entry(index)
+    
+    def export(self, f, fmt='csv', start=None, end=None, cassette=None):
+        """ログをCSVまたはNDJSONで書き出し、書き出した件数を返す
+        
+        1件ずつ書き出すため、件数が多くてもメモリ使用量は一定
+        """
+        count = 0
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'cassette_name', 'cassette_folder'])
+            for record in self.iter_records(start, end, cassette):
+                writer.writerow([record['timestamp'], record['cassette_name'], record['cassette_folder']])
+                count += 1
+        elif fmt == 'ndjson':
+            for record in self.iter_records(start, end, cassette):
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        else:
+            raise ValueError(f"未対応の形式です: {fmt}")
+        return count
+    
+    def as_arrays(self):
+        """(カセットID, 日時秒) をNumPy配列のコピーとして取得（保持していても add_log できる）"""
+        cassette_ids, timestamps = self._array_views()
+        return np.array(cassette_ids, copy=True), np.array(timestamps, copy=True)
+    
+    def _array_views(self):
+        """(カセットID, 日時秒) をコピーせずにNumPy配列として参照する
+        
+        配列がバッファを参照している間は add_log で array を伸ばせない（BufferError）ため、
+        呼び出したメソッドの中だけで使い、ビューを戻り値などで外に出さないこと。
+        """
+        return (np.frombuffer(self.entry_ids, dtype=np.uintc) if self.count() else np.zeros(0, dtype=np.uintc),
+                np.frombuffer(self.timestamps, dtype=np.float64) if self.count() else np.zeros(0))
+    
+    def query(self, text="", sort_column=1, descending=True):
+        """表示用の行（ログのインデックス列）を取得
+        
+        Args:
+            text: 絞り込み文字列（カセット名・フォルダの部分一致、または日時の前方一致）
+            sort_column: 0=カセット名, 1=実行日時, 2=フォルダ
+            descending: 降順ならTrue
+        
+        Returns:
+            ログのインデックスのシーケンス（range、list、またはNumPy配列）
+        """
+        if np is None:
+            return self._query_python(text, sort_column, descending)
+        
+        cassette_ids, timestamps = self._array_views()
+        text = text.strip().lower()
+        if text:
+            # 名前とフォルダは別表で判定し、該当IDを持つ行だけを拾う
+            matched = np.array([
+                text in name.lower() or text in folder.lower()
+                for name, folder in self.cassettes
+            ], dtype=bool)
+            mask = matched[cassette_ids] if len(self.cassettes) else np.zeros(0, dtype=bool)
+            date_range = self.parse_date_prefix(text)
+            if date_range:
+                mask |= (timestamps >= date_range[0]) & (timestamps < date_range[1])
+            rows = np.flatnonzero(mask)
+        else:
+            rows = range(self.count())
+        
+        # ログは追記順＝時系列順なので、日時の並べ替えは向きを変えるだけでよい
+        if sort_column == 1:
+            return rows[::-1] if descending else rows
+        
+        position = 0 if sort_column == 0 else 1
+        order = sorted(range(len(self.cassettes)), key=lambda i: self.cassettes[i][position])
+        rank = np.empty(len(self.cassettes), dtype=np.int64)
+        rank[order] = np.arange(len(self.cassettes))
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[np.argsort(rank[cassette_ids[rows]], kind='stable')]
+        return rows[::-1] if descending else rows
+    
+    def _query_python(self, text, sort_column, descending):
+        """NumPyがない環境向けのquery"""
+        text = text.strip().lower()
+        if text:
+            date_range = self.parse_date_prefix(text)
+            rows = []
+            for index in range(self.count()):
+                name, folder = self.get_cassette(index)
+                if text in name.lower() or text in folder.lower():
+                    rows.append(index)
+                elif date_range and date_range[0] <= self.timestamps[index] < date_range[1]:
+                    rows.append(index)
+        else:
+            rows = range(self.count())
+        
+        if sort_column == 1:
+            return rows[::-1] if descending else rows
+        
+        position = 0 if sort_column == 0 else 1
+        return sorted(rows, key=lambda i: self.get_cassette(i)[position], reverse=descending)
+
+# import名とディストリビューション名（pip install に指定する名前）が異なる主なパッケージ。
+# 未インストールのパッケージはメタデータから引けないため、この表で補う。
+KNOWN_DISTRIBUTIONS = {
+    'PIL': 'Pillow',
+    'fitz': 'PyMuPDF',
+    'pymupdf': 'PyMuPDF',
+    'docx': 'python-docx',
+    'pptx': 'python-pptx',
+    'yaml': 'PyYAML',
+    'bs4': 'beautifulsoup4',
+    'serial': 'pyserial',
+    'cv2': 'opencv-python',
+    'sklearn': 'scikit-learn',
+    'skimage': 'scikit-image',
+    'dateutil': 'python-dateutil',
+    'dotenv': 'python-dotenv',
+    'barcode': 'python-barcode',
+    'sqlalchemy': 'SQLAlchemy',
+    'pytest_cov': 'pytest-cov',
+    'pytestqt': 'pytest-qt',
+    'PyInstaller': 'pyinstaller',
+    'sphinx': 'Sphinx',
+    'win32api': 'pywin32',
+    'win32com': 'pywin32',
+    'win32con': 'pywin32',
+    'pythoncom': 'pywin32',
+    'pywintypes': 'pywin32',
+    'Crypto': 'pycryptodome',
+    'jwt': 'PyJWT',
+    'magic': 'python-magic',
+    'usb': 'pyusb',
+    'zmq': 'pyzmq',
+    'OpenSSL': 'pyOpenSSL',
+    'attr': 'attrs',
+    'gi': 'PyGObject',
+    'wx': 'wxPython',
+    'Levenshtein': 'python-Levenshtein',
+    'telegram': 'python-telegram-bot',
+    'discord': 'discord.py',
+    'jose': 'python-jose',
+    'multipart': 'python-multipart',
+    'pkg_resources': 'setuptools',
+}
+
+class DistributionIndex:
+    """import名 -> ディストリビューション名の索引
+    
+    インストール済みのものは importlib.metadata.packages_distributions() から、
+    未インストールのものは KNOWN_DISTRIBUTIONS から引く。索引は初回利用時に
+    一度だけ作成し、環境が変わったとき（DependencyCache.check_environment）に破棄する。
+    """
+    
+    def __init__(self, known=None):
+        self.known = dict(KNOWN_DISTRIBUTIONS if known is None else known)
+        self.installed = None  # import名 -> [ディストリビューション名]
+        self.versions = {}     # ディストリビューション名 -> バージョン（None: 見つからない）
+        self.lock = threading.Lock()
+    
+    def invalidate(self):
+        """索引を破棄（次回利用時に作り直す）"""
+        with self.lock:
+            self.installed = None
+            self.versions = {}
+    
+    def _installed_index(self):
+        with self.lock:
+            if self.installed is None:
+                try:
+                    self.installed = importlib.metadata.packages_distributions()
+                except Exception as e:
+                    print(f"ディストリビューション索引作成エラー: {e}")
+                    self.installed = {}
+            return self.installed
+    
+    def distributions(self, module):
+        """モジュールを提供するインストール済みディストリビューション名のリスト"""
+        return self._installed_index().get(module, [])
+    
+    def distribution_name(self, module):
+        """pip install に指定する名前（不明ならimport名のまま）"""
+        installed = self.distributions(module)
+        if installed:
+            return installed[0]
+        return self.known.get(module, module)
+    
+    def version(self, module):
+        """モジュールを提供するディストリビューションのバージョン（不明ならNone）"""
+        for distribution in self.distributions(module):
+            if distribution not in self.versions:
+                try:
+                    self.versions[distribution] = importlib.metadata.version(distribution)
+                except importlib.metadata.PackageNotFoundError:
+                    self.versions[distribution] = None
+            if self.versions[distribution]:
+                return self.versions[distribution]
+        return None
+    
+    def pip_command(self, modules):
+        """モジュール一覧から pip install コマンドを作成（同じディストリビューションは1つにまとめる）"""
+        names = sorted({self.distribution_name(module) for module in modules}, key=str.lower)
+        return f"pip install {' '.join(names)}" if names else ""
+
+class DependencyCache:
+    """依存関係チェック結果のディスクキャッシュ
+    
+    スクリプト内容のハッシュをキーに結果を保存する。インタプリタと
+    site-packagesの状態（フィンガープリント）が変わったエントリは無効とする。
+    """
+    # 依存監査はカセット1つにつき1件を使う。ライブラリ全体の結果を残せないと、
+    # 毎回の監査で古いカセットから追い出されて解析し直しになるため多めに持つ
+    MAX_ENTRIES = 5000
+    
+    def __init__(self, cache_file):
+        self.cache_file = Path(cache_file)
+        self.entries = None  # 初回アクセス時に読み込む
+        self.last_fingerprint = None
+        self.lock = threading.Lock()  # バックグラウンドのチェックと同時に書き込まないように
+    
+    @staticmethod
+    def hash_file(file_path):
+        """ファイル内容のハッシュ"""
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    
+    @staticmethod
+    def environment_fingerprint():
+        """インタプリタとsite-packagesの状態を表す文字列
+        
+        パッケージの追加・削除でsite-packagesの更新時刻が変わるため、
+        ディレクトリのstatだけで環境の変化を検出できる
+        """
+        parts = [sys.executable, sys.version, sys.prefix]
+        try:
+            site_dirs = site.getsitepackages() + [site.getusersitepackages()]
+        except AttributeError:
+            site_dirs = [path for path in sys.path if 'site-packages' in path]
+        for site_dir in site_dirs:
+            try:
+                parts.append(f"{site_dir}:{os.stat(site_dir).st_mtime_ns}")
+            except OSError:
+                parts.append(f"{site_dir}:-")
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+    
+    def load(self):
+        """キャッシュファイルを読み込み"""
+        self.entries = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"依存関係キャッシュ読み込みエラー: {e}")
+    
+    def save(self):
+        """キャッシュファイルを保存（古いエントリから間引く）"""
+        if len(self.entries) > self.MAX_ENTRIES:
+            recent = sorted(self.entries.items(), key=lambda item: item[1].get('used', 0))[-self.MAX_ENTRIES:]
+            self.entries = dict(recent)
+        try:
+            # 別プロセス（--audit-deps など）と同じファイルを使うので、書きかけを読ませない
+            write_json_atomic(self.cache_file, self.entries, ensure_ascii=False)
+        except Exception as e:
+            print(f"依存関係キャッシュ保存エラー: {e}")
+    
+    def check_environment(self):
+        """環境のフィンガープリントを取得（変化していればimportlibのキャッシュも破棄）"""
+        fingerprint = self.environment_fingerprint()
+        if self.last_fingerprint is not None and fingerprint != self.last_fingerprint:
+            importlib.invalidate_caches()
+            DependencyChecker.distributions.invalidate()
+        self.last_fingerprint = fingerprint
+        return fingerprint
+    
+    def get(self, key, fingerprint):
+        """キャッシュ済みの結果（なければNone）"""
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            entry = self.entries.get(key)
+            if not entry or entry.get('fingerprint') != fingerprint:
+                return None
+            entry['used'] = time.time()
+            return entry['result']
+    
+    def put(self, key, fingerprint, result, save=True):
+        """結果を保存（save=Falseならメモリ上のみ。後でflushする）"""
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            self.entries[key] = {'fingerprint': fingerprint, 'result': result, 'used': time.time()}
+            if save:
+                self.save()
+    
+    def flush(self):
+        """メモリ上の内容をファイルに保存"""
+        with self.lock:
+            if self.entries is not None:
+                self.save()
 
 class DependencyChecker:
-    """依存ライブラリチェッカー"""
+    """依存ライブラリチェッカー
+    
+    モジュールを実際にimportせず、importlibの検索機構とインストール済み
+    ディストリビューションのメタデータだけで判定する。
+    """
+    distributions = DistributionIndex()  # import名 -> ディストリビューション名
+    _parse_memo = {}       # ファイルパス -> (シグネチャ, 解析結果)
+    _pool = None
+    _pool_lock = threading.Lock()
+    PARALLEL_THRESHOLD = 4  # これ以上のファイルを一度に解析するときだけワーカープロセスを使う
+    cache = DependencyCache(Path(__file__).parent / "dependency_cache.json")
+    
     @staticmethod
-    def check_python_script(script_path):
-        """Pythonスクリプトの依存関係をチェック"""
+    def is_installed(module):
+        """モジュールがインストールされているか（importはしない）"""
+        return dependency_scan.is_installed(module)
+    
+    @classmethod
+    def get_version(cls, module):
+        """モジュールを提供するディストリビューションのバージョン（不明ならNone）"""
+        return cls.distributions.version(module)
+    
+    @classmethod
+    def check_python_script(cls, script_path, source_root=None, use_cache=True):
+        """Pythonスクリプトの依存関係をチェック（結果はディスクにキャッシュ）
+        
+        Args:
+            script_path: メインスクリプト
+            source_root: ローカルモジュールを探すフォルダ（省略時はスクリプトのフォルダ）
+            use_cache: キャッシュを使うか
+        """
+        result = None
+        for event in cls.iter_check(script_path, source_root, use_cache):
+            if event[0] == 'result':
+                result = event[1]
+        return result
+    
+    @classmethod
+    def iter_check(cls, script_path, source_root=None, use_cache=True, cancelled=None):
+        """依存関係チェックを段階的に進めるジェネレータ
+        
+        Yields:
+            ライブラリごとに ('module', 名前, インストール済みか, バージョン, importの経路)、
+            最後に ('result', 結果の辞書)。cancelled() がTrueを返した時点で打ち切る
+        """
+        cancelled = cancelled or (lambda: False)
+        script_path = Path(script_path).resolve()
+        source_root = Path(source_root).resolve() if source_root else script_path.parent
+        
+        key = fingerprint = None
+        if use_cache:
+            key = cls.cache_key(script_path, source_root)
+        if key:
+            fingerprint = cls.cache.check_environment()
+            result = cls.get_cached(key, fingerprint)
+            if result is not None:
+                chains = result.get('chains', {})
+                for lib in result['third_party']:
+                    yield ('module', lib, lib in result['installed'], result['versions'].get(lib), chains.get(lib, []))
+                yield ('result', result)
+                return
+        
+        collected = cls._collect_imports(script_path, source_root, cancelled)
+        if collected is None:
+            return
+        for event in cls.iter_install_status(collected, cancelled):
+            if event[0] == 'result' and key and 'error' not in event[1]:
+                cls.cache.put(key, fingerprint, event[1])
+            yield event
+    
+    @classmethod
+    def cache_key(cls, script_path, source_root):
+        """キャッシュのキー（スクリプト内容のハッシュと探索フォルダ）。読めない場合はNone"""
         try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read())
-            
-            imports = set()
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.add(alias.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.add(node.module.split('.')[0])
-            
-            # 標準ライブラリを除外
-            stdlib_modules = set(sys.stdlib_module_names)
-            third_party = imports - stdlib_modules
-            
-            # インストール状況をチェック
-            missing = []
-            installed = []
-            
-            for module in third_party:
-                try:
-                    __import__(module)
-                    installed.append(module)
-                except ImportError:
-                    missing.append(module)
+            return f"{DependencyCache.hash_file(script_path)}|{Path(script_path).parent}|{source_root}"
+        except OSError:
+            return None
+    
+    @classmethod
+    def get_cached(cls, key, fingerprint):
+        """有効なキャッシュ済みの結果（ローカルモジュールが変わっていればNone）"""
+        result = cls.cache.get(key, fingerprint)
+        if result is not None and cls._local_files_unchanged(result):
+            return result
+        return None
+    
+    @classmethod
+    def iter_install_status(cls, collected, cancelled=None):
+        """解析済みのimportについてインストール状況を1件ずつ確認するジェネレータ
+        
+        Yields:
+            iter_check と同じ形式のイベント
+        """
+        cancelled = cancelled or (lambda: False)
+        if 'error' in collected:
+            yield ('result', collected)
+            return
+        
+        # インストール状況をチェック
+        module_chains = collected['chains']
+        missing = []
+        installed = []
+        versions = {}
+        
+        for module in sorted(module_chains):
+            if cancelled():
+                return
+            is_installed = cls.is_installed(module)
+            version = cls.get_version(module) if is_installed else None
+            if is_installed:
+                installed.append(module)
+                if version:
+                    versions[module] = version
+            else:
+                missing.append(module)
+            yield ('module', module, is_installed, version, module_chains[module])
+        
+        yield ('result', dict(collected, installed=installed, missing=missing, versions=versions))
+    
+    @classmethod
+    def _local_files_unchanged(cls, result):
+        """キャッシュされた結果が参照するローカルモジュールが変わっていないか"""
+        for file_path, signature in result.get('local_files', {}).items():
+            try:
+                if dependency_scan.file_signature(file_path) != signature:
+                    return False
+            except OSError:
+                return False
+        return True
+    
+    @classmethod
+    def _get_pool(cls):
+        """解析用のワーカープロセスのプール（初回のみ作成）
+        
+        ワーカーは dependency_scan.py だけを実行するので、PySide6 や NumPy は読み込まない
+        """
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = dependency_scan.ScanPool(max_workers=min(4, os.cpu_count() or 1))
+            return cls._pool
+    
+    @classmethod
+    def _parse_files(cls, files, parallel=True):
+        """複数ファイルを解析（変更のないファイルは前回の結果を使う）"""
+        results = {}
+        pending = []
+        for file_path in files:
+            try:
+                signature = dependency_scan.file_signature(file_path)
+            except OSError as e:
+                results[file_path] = ([], str(e))
+                continue
+            memo = cls._parse_memo.get(file_path)
+            if memo and memo[0] == signature:
+                results[file_path] = memo[1]
+            else:
+                pending.append((file_path, signature))
+        
+        paths = [file_path for file_path, _signature in pending]
+        parsed = None
+        if parallel and len(paths) >= cls.PARALLEL_THRESHOLD:
+            try:
+                parsed = list(cls._get_pool().map('parse_imports', [str(file_path) for file_path in paths]))
+            except Exception as e:
+                print(f"並列解析エラー（逐次解析に切り替えます）: {e}")
+        if parsed is None:
+            parsed = [dependency_scan.parse_imports(file_path) for file_path in paths]
+        
+        for (file_path, signature), result in zip(pending, parsed):
+            cls._parse_memo[file_path] = (signature, result)
+            results[file_path] = result
+        return results
+    
+    @classmethod
+    def _collect_imports(cls, script_path, source_root, cancelled, parallel=True):
+        """スクリプトとそこからimportされるローカルモジュールを解析（dependency_scan.collect_imports）
+        
+        解析結果はファイルごとにメモし、変更のないファイルは解析し直さない。
+        中断された場合はNone。parallel=Falseならワーカープロセスを使わない
+        """
+        return dependency_scan.collect_imports(
+            script_path, source_root, cancelled,
+            parse_files=lambda files: cls._parse_files(files, parallel)
+        )
+    
+    @staticmethod
+    def format_module_line(lib, is_installed, version, chain):
+        """ライブラリ1件分の表示行"""
+        if is_installed:
+            status = f"✅ インストール済み ({version})" if version else "✅ インストール済み"
+        else:
+            status = "❌ 未インストール"
+            distribution = DependencyChecker.distributions.distribution_name(lib)
+            if distribution != lib:
+                status += f" [pip: {distribution}]"
+        via = f"（{' → '.join(chain)}）" if len(chain) > 1 else ""
+        return f"  • {lib}: {status}{via}"
+    
+    @staticmethod
+    def format_result(result):
+        """チェック結果を表示用テキストに整形"""
+        if 'error' in result:
+            return f"エラー: {result['error']}"
+        
+        text = "📦 依存ライブラリチェック結果:\n\n"
+        
+        if result['third_party']:
+            text += "サードパーティライブラリ:\n"
+            chains = result.get('chains', {})
+            for lib in result['third_party']:
+                text += DependencyChecker.format_module_line(
+                    lib, lib in result['installed'], result['versions'].get(lib), chains.get(lib, [])
+                ) + "\n"
             
-            return {
-                'all_imports': list(imports),
-                'third_party': list(third_party),
-                'installed': installed,
-                'missing': missing
-            }
+            if result['missing']:
+                text += f"\n⚠️ 不足しているライブラリ: {', '.join(result['missing'])}\n"
+                text += f"\nインストールコマンド:\n"
+                text += DependencyChecker.distributions.pip_command(result['missing'])
+        else:
+            text += "✅ 標準ライブラリのみ使用（追加インストール不要）"
+        
+        if result.get('local_modules'):
+            text += f"\n\n📁 ローカルモジュール: {', '.join(result['local_modules'])}"
+        if result.get('parse_errors'):
+            text += f"\n⚠️ 解析できなかったファイル: {', '.join(result['parse_errors'])}"
+        
+        return text
+
+class DependencyCheckSignals(QObject):
+    """DependencyCheckTaskからGUIスレッドへ通知するシグナル"""
+    module_checked = Signal(int, str)   # リクエストID, 表示行
+    finished = Signal(int, object)      # リクエストID, 結果（中断時はNone）
+
+class DependencyCheckTask(QRunnable):
+    """依存関係チェックをワーカースレッドで実行するタスク"""
+    def __init__(self, request_id, script_path, source_root=None):
+        super().__init__()
+        self.request_id = request_id
+        self.script_path = script_path
+        self.source_root = source_root
+        self.signals = DependencyCheckSignals()
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """中断を要求（次の区切りで打ち切られる）"""
+        self.cancel_event.set()
+    
+    def run(self):
+        result = None
+        try:
+            for event in DependencyChecker.iter_check(self.script_path, self.source_root,
+                                                      cancelled=self.cancel_event.is_set):
+                if event[0] == 'module':
+                    _kind, lib, is_installed, version, chain = event
+                    line = DependencyChecker.format_module_line(lib, is_installed, version, chain)
+                    self.signals.module_checked.emit(self.request_id, line)
+                else:
+                    result = event[1]
+        except Exception as e:
+            result = {'error': str(e)}
+        self.signals.finished.emit(self.request_id, None if self.cancel_event.is_set() else result)
+
+class DependencyCheckRunner(QObject):
+    """依存関係チェックをバックグラウンドで実行し、結果を順次テキスト欄に表示する
+    
+    新しいチェックを開始すると実行中のチェックは中断され、古い結果は破棄される
+    """
+    def __init__(self, text_edit, parent=None):
+        super().__init__(parent)
+        self.text_edit = text_edit
+        self.request_id = 0
+        self.current_task = None
+        self.tasks = {}  # 完了通知が届くまでタスク（とシグナル）を保持する
+    
+    def start(self, script_path, source_root=None):
+        """チェックを開始"""
+        self.cancel()
+        self.request_id += 1
+        self.text_edit.setPlainText("🔍 依存ライブラリを確認中...\n")
+        
+        task = DependencyCheckTask(self.request_id, script_path, source_root)
+        task.setAutoDelete(False)
+        task.signals.module_checked.connect(self.on_module_checked)
+        task.signals.finished.connect(self.on_finished)
+        self.tasks[self.request_id] = task
+        self.current_task = task
+        QThreadPool.globalInstance().start(task)
+    
+    def cancel(self):
+        """実行中のチェックを中断"""
+        if self.current_task:
+            self.current_task.cancel()
+            self.current_task = None
+    
+    def on_module_checked(self, request_id, line):
+        """ライブラリ1件の結果が届いたとき"""
+        if request_id == self.request_id:
+            self.text_edit.append(line)
+    
+    def on_finished(self, request_id, result):
+        """チェック完了時"""
+        self.tasks.pop(request_id, None)
+        if request_id != self.request_id or result is None:
+            return
+        self.current_task = None
+        self.text_edit.setPlainText(DependencyChecker.format_result(result))
+
+class DependencyAudit:
+    """カセットライブラリ全体の依存関係監査
+    
+    前回から変更のないカセットはキャッシュの結果を使い、変更のあったものだけを
+    ワーカープロセス（dependency_scan.py）で並列に解析する。
+    """
+    def __init__(self, cassettes_dir):
+        self.cassettes_dir = Path(cassettes_dir)
+    
+    @staticmethod
+    def collect_cassette_imports(script_path, source_root):
+        """1カセット分のimportを解析（ワーカープロセスと同じ処理をこのプロセスで行う）"""
+        return dependency_scan.collect_cassette_imports(script_path, source_root)
+    
+    def find_targets(self):
+        """監査対象のカセット一覧 (Pythonカセット, Python以外のカセット名)"""
+        targets = []
+        skipped = []
+        if not self.cassettes_dir.exists():
+            return targets, skipped
+        for folder in sorted(self.cassettes_dir.iterdir()):
+            if not folder.is_dir():
+                continue
+            cassette = CassetteInfo(folder)
+            if not cassette.script_path or not cassette.script_path.exists():
+                continue
+            if cassette.script_path.suffix.lower() == '.py':
+                targets.append(cassette)
+            else:
+                skipped.append(cassette.name)
+        return targets, skipped
+    
+    def run(self, progress=None, cancelled=None):
+        """監査を実行してレポートを返す（中断された場合はNone）
+        
+        Args:
+            progress: progress(完了数, 総数) を受け取るコールバック
+            cancelled: Trueを返すと中断する関数
+        """
+        cancelled = cancelled or (lambda: False)
+        start = time.perf_counter()
+        targets, skipped = self.find_targets()
+        fingerprint = DependencyChecker.cache.check_environment()
+        
+        results = []
+        pending = []
+        for cassette in targets:
+            script_path = cassette.script_path.resolve()
+            source_root = (cassette.source_folder or cassette.folder_path).resolve()
+            key = DependencyChecker.cache_key(script_path, source_root)
+            cached = DependencyChecker.get_cached(key, fingerprint) if key else None
+            if cached is not None:
+                results.append((cassette, cached))
+            else:
+                pending.append((cassette, script_path, source_root, key))
+        
+        cached_count = len(results)
+        if progress:
+            progress(len(results), len(targets))
+        
+        def finish(cassette, key, collected):
+            result = None
+            for event in DependencyChecker.iter_install_status(collected):
+                if event[0] == 'result':
+                    result = event[1]
+            if key and 'error' not in result:
+                DependencyChecker.cache.put(key, fingerprint, result, save=False)
+            results.append((cassette, result))
+            if progress:
+                progress(len(results), len(targets))
+        
+        try:
+            pool = DependencyChecker._get_pool() if len(pending) > 1 else None
         except Exception as e:
-            return {
-                'error': str(e),
-                'all_imports': [],
-                'third_party': [],
-                'installed': [],
-                'missing': []
+            print(f"ワーカープロセスを使えません（逐次解析に切り替えます）: {e}")
+            pool = None
+        
+        if pool:
+            futures = {
+                pool.submit('collect_cassette_imports', str(script_path), str(source_root)): (cassette, key)
+                for cassette, script_path, source_root, key in pending
             }
+            for future in as_completed(futures):
+                if cancelled():
+                    for other in futures:
+                        other.cancel()
+                    DependencyChecker.cache.flush()
+                    return None
+                cassette, key = futures[future]
+                try:
+                    collected = future.result()
+                except Exception as e:
+                    collected = {'error': str(e)}
+                finish(cassette, key, collected)
+        else:
+            for cassette, script_path, source_root, key in pending:
+                if cancelled():
+                    DependencyChecker.cache.flush()
+                    return None
+                finish(cassette, key, self.collect_cassette_imports(script_path, source_root))
+        
+        DependencyChecker.cache.flush()
+        elapsed = time.perf_counter() - start
+        
+        missing = {}
+        errors = {}
+        for cassette, result in results:
+            if 'error' in result:
+                errors[cassette.name] = result['error']
+                continue
+            for module in result['missing']:
+                missing.setdefault(module, []).append(cassette.name)
+        
+        return {
+            'total': len(targets),
+            'analyzed': len(pending),
+            'cached': cached_count,
+            'skipped': skipped,
+            'elapsed': elapsed,
+            'throughput': len(targets) / elapsed if elapsed > 0 else 0.0,
+            'missing': {module: sorted(names) for module, names in sorted(missing.items())},
+            'errors': errors,
+            'pip_command': DependencyChecker.distributions.pip_command(missing)
+        }
+    
+    @staticmethod
+    def format_report(report):
+        """監査レポートを表示用テキストに整形"""
+        text = "🩺 依存ライブラリ監査レポート\n\n"
+        text += (f"対象: {report['total']}カセット（解析 {report['analyzed']} / キャッシュ {report['cached']}）"
+                 f"  所要時間: {report['elapsed']:.2f}秒  処理速度: {report['throughput']:.1f}カセット/秒\n")
+        if report['skipped']:
+            text += f"Python以外のためスキップ: {len(report['skipped'])}カセット\n"
+        
+        if report['missing']:
+            text += f"\n⚠️ 不足しているライブラリ: {len(report['missing'])}件\n"
+            for module, names in report['missing'].items():
+                shown = ', '.join(names[:10])
+                if len(names) > 10:
+                    shown += f" 他{len(names) - 10}件"
+                distribution = DependencyChecker.distributions.distribution_name(module)
+                label = f"{module} [pip: {distribution}]" if distribution != module else module
+                text += f"  • {label}（{len(names)}カセット）: {shown}\n"
+            text += f"\nインストールコマンド:\n{report['pip_command']}\n"
+        else:
+            text += "\n✅ 不足しているライブラリはありません\n"
+        
+        if report['errors']:
+            text += "\n❌ 解析できなかったカセット:\n"
+            for name, error in report['errors'].items():
+                text += f"  • {name}: {error}\n"
+        
+        return text
+
+class DependencyAuditSignals(QObject):
+    """DependencyAuditTaskからGUIスレッドへ通知するシグナル"""
+    progress = Signal(int, int)   # 完了数, 総数
+    finished = Signal(object)     # レポート（中断時はNone）
+
+class DependencyAuditTask(QRunnable):
+    """依存関係監査をワーカースレッドで実行するタスク"""
+    def __init__(self, cassettes_dir):
+        super().__init__()
+        self.cassettes_dir = cassettes_dir
+        self.signals = DependencyAuditSignals()
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """中断を要求"""
+        self.cancel_event.set()
+    
+    def run(self):
+        try:
+            report = DependencyAudit(self.cassettes_dir).run(self.signals.progress.emit, self.cancel_event.is_set)
+        except Exception as e:
+            print(f"依存関係監査エラー: {e}")
+            report = None
+        self.signals.finished.emit(report)
+
+SCRIPT_EXTENSIONS = {'.py', '.bat', '.exe', '.sh', '.command'}
+
+class ScriptFileFilterProxy(QSortFilterProxyModel):
+    """QFileSystemModel用のフィルタ：ScanPolicyで除外されるものを隠し、ファイルはスクリプトのみ表示
+    
+    子の読み込みはQFileSystemModelが展開時に行うため、ここでは1行ずつ判定するだけ。
+    """
+    
+    def __init__(self, root, policy, parent=None):
+        super().__init__(parent)
+        self.root = QDir.fromNativeSeparators(str(root)).rstrip('/') + '/'
+        self.policy = policy
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        index = model.index(source_row, 0, source_parent)
+        path = model.filePath(index)
+        if not path.startswith(self.root):  # ルートフォルダ自身とその親
+            return True
+        
+        relative_path = path[len(self.root):]
+        is_dir = model.isDir(index)
+        if self.policy.is_ignored(relative_path, is_dir):
+            return False
+        if is_dir:
+            if relative_path.count('/') > self.policy.max_depth:
+                return False
+            if model.fileInfo(index).isSymLink():
+                # 親フォルダを指すリンクは展開し続けられてしまうため表示しない
+                target = os.path.realpath(path)
+                parent = os.path.realpath(os.path.dirname(path))
+                if parent == target or parent.startswith(target.rstrip(os.sep) + os.sep):
+                    return False
+            return True
+        return os.path.splitext(relative_path)[1].lower() in SCRIPT_EXTENSIONS
+    
+    def lessThan(self, left, right):
+        """フォルダを先に、名前は大文字小文字を区別せずに並べる"""
+        model = self.sourceModel()
+        left_key = (not model.isDir(left), model.fileName(left).lower())
+        right_key = (not model.isDir(right), model.fileName(right).lower())
+        return left_key < right_key
+
+class ScriptScanSignals(QObject):
+    """ScriptScanTaskからGUIスレッドへ通知するシグナル"""
+    batch = Signal(int, object)        # スキャンID, [(相対フォルダのタプル, ファイルパス)]
+    progress = Signal(int, int, int)   # スキャンID, 走査済みフォルダ数, 見つかったファイル数
+    finished = Signal(int, bool)       # スキャンID, 中断されたか
+
+class ScriptScanTask(QRunnable):
+    """フォルダ以下のスクリプトファイルをワーカースレッドで探すタスク
+    
+    ScanPolicy.walk で1フォルダずつ走査し、見つかったファイルは一定件数・一定時間ごとに
+    まとめて送る（GUIスレッドは受け取った分だけツリーに追加する）。
+    """
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.1  # 秒
+    
+    def __init__(self, scan_id, root, policy):
+        super().__init__()
+        self.scan_id = scan_id
+        self.root = root
+        self.policy = policy
+        self.signals = ScriptScanSignals()
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """中断を要求（次のフォルダで打ち切られる）"""
+        self.cancel_event.set()
+    
+    def run(self):
+        batch = []
+        dir_count = 0
+        file_count = 0
+        last_emit = time.perf_counter()
+        
+        try:
+            for relative, files in self.policy.walk(self.root, SCRIPT_EXTENSIONS, self.cancel_event.is_set):
+                dir_count += 1
+                file_count += len(files)
+                batch.extend((relative, file_path) for file_path in files)
+                
+                now = time.perf_counter()
+                if len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL:
+                    if batch:
+                        self.signals.batch.emit(self.scan_id, batch)
+                        batch = []
+                    self.signals.progress.emit(self.scan_id, dir_count, file_count)
+                    last_emit = now
+        except Exception as e:
+            print(f"フォルダスキャンエラー: {e}")
+        
+        if batch:
+            self.signals.batch.emit(self.scan_id, batch)
+        self.signals.progress.emit(self.scan_id, dir_count, file_count)
+        self.signals.finished.emit(self.scan_id, self.cancel_event.is_set())
+
+class PathIndex:
+    """ファイル名検索用のパス索引（あいまい検索：検索語の文字が順番どおりに含まれるパス）
+    
+    スキャン中に見つかったファイルを追加していき、検索時は次の順で絞り込む。
+    - パスごとに記録した文字の種類ごとの最初と最後の位置から、文字の順序を満たし得ない
+      パスをNumPyでまとめて除外する
+    - 直前の検索語が今の検索語の先頭部分なら、その候補の中だけを調べる
+    - 候補が多いときは表示する分だけ正規表現で確認する
+    結果はファイル名の前方一致 → ファイル名の部分一致 → パスの短い順に並べる。
+    """
+    SEPARATORS = '/_-. '  # パスによく出る記号（それぞれ専用の種類にする）
+    CLASS_COUNT = 45      # a-z, 0-9, SEPARATORS と、それ以外の文字をまとめた4種類
+    SHARED_CLASS = 41     # これ以降の種類は複数の文字が共有する
+    MISSING = 0xFFFF      # その文字がないときの「最初の位置」
+    MAX_RESULTS = 200
+    VERIFY_LIMIT = 5000   # 候補がこれ以下なら全件を確認して正確な件数を出す
+    CACHE_SIZE = 64
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        """索引を空にする"""
+        self.paths = []      # ファイルのパス（追加順）
+        self.relative = []   # 表示用の相対パス（/区切り）
+        self.keys = []       # 検索用の小文字の相対パス
+        self.first = array('H')  # パスごとに CLASS_COUNT 個ずつ
+        self.last = array('H')
+        self.view = None     # パスの短い順に並べた検索用データ（検索時に作成）
+        self.cache = {}      # 検索語 -> (候補, 確認済みか)
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    @classmethod
+    def char_class(cls, char):
+        """文字の種類（0〜CLASS_COUNT-1）"""
+        code = ord(char)
+        if 97 <= code <= 122:
+            return code - 97
+        if 48 <= code <= 57:
+            return code - 48 + 26
+        index = cls.SEPARATORS.find(char)
+        if index >= 0:
+            return 36 + index
+        return cls.SHARED_CLASS + code % (cls.CLASS_COUNT - cls.SHARED_CLASS)
+    
+    @staticmethod
+    def normalize(query):
+        """検索語を正規化（小文字にし、空白を除き、区切りを/に統一）"""
+        return ''.join(query.lower().split()).replace('\\', '/')
+    
+    @staticmethod
+    def subsequence_pattern(query):
+        """検索語の文字を順番どおりに含むかを調べる正規表現（後戻りしない形）"""
+        return re.compile(''.join(f'[^{re.escape(char)}]*{re.escape(char)}' for char in query))
+    
+    def add(self, items):
+        """(相対パス, パス) の組を追加"""
+        for relative_path, path in items:
+            key = relative_path.lower()
+            self.paths.append(path)
+            self.relative.append(relative_path)
+            self.keys.append(key)
+            if np is None:
+                continue
+            first = [self.MISSING] * self.CLASS_COUNT
+            last = [0] * self.CLASS_COUNT
+            for char in set(key):
+                c = self.char_class(char)
+                first[c] = min(first[c], key.find(char), self.MISSING - 1)
+                last[c] = max(last[c], min(key.rfind(char), self.MISSING - 1))
+            self.first.extend(first)
+            self.last.extend(last)
+        self.view = None
+        self.cache = {}
+    
+    def _build_view(self):
+        """パスの短い順に並べた検索用データを作成"""
+        count = len(self.keys)
+        if np is None:
+            order = sorted(range(count), key=lambda i: len(self.keys[i]))
+            keys = [self.keys[i] for i in order]
+            names = [key.rsplit('/', 1)[-1] for key in keys]
+            self.view = {'order': order, 'keys': keys, 'names': names}
+            return
+        
+        lengths = np.fromiter(map(len, self.keys), dtype=np.int32, count=count)
+        order = np.argsort(lengths, kind='stable')
+        first = np.frombuffer(self.first, dtype=np.uint16).reshape(count, self.CLASS_COUNT)[order]
+        last = np.frombuffer(self.last, dtype=np.uint16).reshape(count, self.CLASS_COUNT)[order]
+        keys = [self.keys[i] for i in order.tolist()]
+        names = [key.rsplit('/', 1)[-1] for key in keys]
+        self.view = {
+            'order': order.tolist(),
+            'keys': keys,
+            'names': names,
+            # 文字の種類ごとに連続した配列にしておく（列の取り出しを速くする）
+            'first': np.ascontiguousarray(first.T),
+            'last': np.ascontiguousarray(last.T),
+            'name_start': np.fromiter((len(key) - len(name) for key, name in zip(keys, names)),
+                                      dtype=np.int32, count=count),
+            'name_first': np.fromiter((self.char_class(name[0]) if name else 255 for name in names),
+                                      dtype=np.uint8, count=count),
+        }
+    
+    def _cached_prefix(self, query):
+        """検索語の先頭部分で最も長いキャッシュ済みの候補（なければNone）"""
+        for length in range(len(query) - 1, 0, -1):
+            cached = self.cache.get(query[:length])
+            if cached is not None:
+                return cached[0]
+        return None
+    
+    def match(self, query):
+        """候補と、全件を確認済みかを返す（確認済みでなければ候補は一致するものを含む上位集合）"""
+        cached = self.cache.get(query)
+        if cached is not None:
+            return cached
+        if self.view is None:
+            self._build_view()
+        if len(self.cache) >= self.CACHE_SIZE:
+            self.cache = {}
+        if np is None:
+            return self._match_python(query)
+        
+        first = self.view['first']
+        last = self.view['last']
+        candidates = self._cached_prefix(query)
+        if candidates is None:
+            candidates = np.arange(len(self.keys))
+        
+        # 各文字が前の文字より後ろに現れ得るか（現れる位置の下限と最後の位置を比べる）
+        bound = None
+        for c in map(self.char_class, query):
+            position = first[c][candidates].astype(np.int32)
+            bound = position if bound is None else np.maximum(position, bound + 1)
+            possible = bound <= last[c][candidates]
+            candidates = candidates[possible]
+            bound = bound[possible]
+        
+        # 専用の種類の1文字なら位置の判定だけで正確。それ以外は正規表現で確認する
+        verified = len(candidates) <= self.VERIFY_LIMIT
+        if verified and (len(query) > 1 or self.char_class(query) >= self.SHARED_CLASS):
+            keys = self.view['keys']
+            positions = candidates.tolist()
+            pattern = self.subsequence_pattern(query).match
+            candidates = np.array(list(compress(positions, map(pattern, map(keys.__getitem__, positions)))),
+                                  dtype=np.intp)
+        self.cache[query] = (candidates, verified)
+        return self.cache[query]
+    
+    def _match_python(self, query):
+        """NumPyがない環境向けのmatch（候補はすべて正規表現で確認する）"""
+        keys = self.view['keys']
+        candidates = self._cached_prefix(query)
+        if candidates is None:
+            candidates = range(len(keys))
+        pattern = self.subsequence_pattern(query).match
+        self.cache[query] = (list(compress(candidates, map(pattern, map(keys.__getitem__, candidates)))), True)
+        return self.cache[query]
+    
+    def search(self, query, limit=None):
+        """あいまい検索
+        
+        Returns:
+            ([(相対パス, パス)], 件数, 件数が正確か)
+        """
+        limit = limit or self.MAX_RESULTS
+        query = self.normalize(query)
+        if not query or not self.keys:
+            return [], 0, True
+        
+        candidates, verified = self.match(query)
+        keys = self.view['keys']
+        names = self.view['names']
+        literal = re.compile(re.escape(query))
+        
+        # (対象, 判定, 判定する文字列) の順に上位から埋める
+        if '/' in query:
+            tiers = [(candidates, literal.search, keys)]
+        elif np is None:
+            tiers = [(candidates, literal.match, names), (candidates, literal.search, names)]
+        else:
+            name_start = self.view['name_start']
+            in_name = candidates
+            for c in set(map(self.char_class, query)):
+                in_name = in_name[self.view['last'][c][in_name] >= name_start[in_name]]
+            tiers = [(candidates[self.view['name_first'][candidates] == self.char_class(query[0])],
+                      literal.match, names),
+                     (in_name, literal.search, names)]
+        rest = candidates if np is None else candidates.tolist()
+        if not verified:
+            pattern = self.subsequence_pattern(query).match
+            rest = compress(rest, map(pattern, map(keys.__getitem__, rest)))
+        tiers.append((rest, None, None))
+        
+        ranked = []
+        seen = set()
+        for subset, test, texts in tiers:
+            if test is not None:
+                subset = subset if np is None else subset.tolist()
+                subset = compress(subset, map(test, map(texts.__getitem__, subset)))
+            for position in subset:
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+                    if len(ranked) >= limit:
+                        break
+            if len(ranked) >= limit:
+                break
+        
+        order = self.view['order']
+        results = [(self.relative[order[p]], self.paths[order[p]]) for p in ranked[:limit]]
+        return results, len(candidates), verified
 
 class ScriptFileSelector(QDialog):
-    """スクリプトファイル選択ダイアログ"""
-    def __init__(self, folder_path, current_script=None, parent=None):
+    """スクリプトファイル選択ダイアログ
+    
+    フォルダの中身は展開したときに初めて読み込むため、
+    フォルダの大きさに関係なくすぐに開く。「すべて展開」ではワーカースレッドで
+    フォルダ全体をスキャンし、見つかったファイルを順次一覧に追加する。
+    検索欄に入力すると、同じスキャンで作った PathIndex からあいまい検索する。
+    """
+    SEARCH_LIMIT = 100  # 検索結果の表示件数
+    
+    def __init__(self, folder_path, current_script=None, parent=None, scan_policy=None):
         super().__init__(parent)
         self.folder_path = Path(folder_path)
         self.current_script = current_script
         self.selected_script = None
+        self.scan_policy = scan_policy or ScanPolicy.for_folder(self.folder_path)
+        self.scan_task = None
+        self.scan_id = 0
+        self.scan_folders = {}  # 相対フォルダのタプル -> QTreeWidgetItem
+        self.scan_file_count = 0
+        self.scan_current_item = None  # スキャン完了時に選択する項目（途中で選ぶとレイアウト計算が重い）
+        self.scan_complete = False
+        self.full_view = False  # すべて展開した一覧を表示中か
+        self.path_index = PathIndex()
         self.setWindowTitle("実行ファイルを選択")
         self.setMinimumSize(600, 500)
         self.setup_ui()
@@ -321,18 +2046,87 @@ class ScriptFileSelector(QDialog):
         path_label.setStyleSheet("color: #616161; font-style: italic; padding: 5px;")
         layout.addWidget(path_label)
         
-        # ツリービュー
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["ファイル名", "相対パス", "種類"])
-        self.tree.setColumnWidth(0, 250)
-        self.tree.setColumnWidth(1, 200)
-        self.tree.itemDoubleClicked.connect(self.on_item_double_clicked)
-        
-        # フォルダ内のスクリプトファイルを再帰的に検索
+        # 検索欄
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 ファイル名で検索（例: srcmain → src/main.py）")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setStyleSheet("padding: 6px; border: 1px solid #bdbdbd; border-radius: 4px; background-color: white;")
+        self.search_input.textChanged.connect(self.on_search_changed)
+        self.search_input.returnPressed.connect(self.on_search_return)
+        search_layout.addWidget(self.search_input, 1)
+        self.search_label = QLabel("")
+        self.search_label.setStyleSheet("color: #616161;")
+        search_layout.addWidget(self.search_label)
+        layout.addLayout(search_layout)
+        
+        # 検索結果（スキャン中は結果が届くたびにまとめて更新）
+        self.search_list = QListWidget()
+        self.search_list.itemDoubleClicked.connect(lambda item: self.on_item_double_clicked())
+        self.search_list.hide()
+        layout.addWidget(self.search_list)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.refresh_search)
+        
+        # ツリービュー（展開されたフォルダだけを読み込む）
+        self.fs_model = QFileSystemModel(self)
+        self.fs_model.setFilter(QDir.AllDirs | QDir.Files | QDir.NoDotAndDotDot)
+        self.fs_model.setRootPath(str(self.folder_path))
+        self.fs_model.directoryLoaded.connect(self.on_directory_loaded)
+        
+        self.proxy_model = ScriptFileFilterProxy(self.folder_path, self.scan_policy, self)
+        self.proxy_model.setSourceModel(self.fs_model)
+        self.proxy_model.setDynamicSortFilter(True)
+        self.proxy_model.sort(0)
+        
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy_model)
+        self.tree.setRootIndex(self.proxy_model.mapFromSource(self.fs_model.index(str(self.folder_path))))
+        self.tree.setColumnHidden(1, True)  # サイズ
+        self.tree.setColumnHidden(3, True)  # 更新日時
+        self.tree.setColumnWidth(0, 400)
+        self.tree.doubleClicked.connect(self.on_item_double_clicked)
+        
+        # 現在のスクリプトまでのフォルダを読み込んで選択
+        self.pending_current_script = None
         self.populate_tree()
         
         layout.addWidget(self.tree)
         
+        # すべて展開した一覧（スキャン結果を順次追加）
+        self.scan_tree = QTreeWidget()
+        self.scan_tree.setHeaderLabels(["ファイル名", "相対パス", "種類"])
+        self.scan_tree.setColumnWidth(0, 250)
+        self.scan_tree.setColumnWidth(1, 200)
+        self.scan_tree.itemDoubleClicked.connect(lambda item, column: self.on_item_double_clicked())
+        self.scan_tree.hide()
+        layout.addWidget(self.scan_tree)
+        
+        # スキャンの進捗
+        scan_layout = QHBoxLayout()
+        self.expand_btn = QPushButton("📂 すべて展開")
+        self.expand_btn.setToolTip("フォルダ全体をスキャンして、すべてのスクリプトを一覧表示します")
+        self.expand_btn.clicked.connect(self.toggle_full_scan)
+        scan_layout.addWidget(self.expand_btn)
+        
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setRange(0, 0)
+        self.scan_progress.setMaximumHeight(16)
+        self.scan_progress.hide()
+        scan_layout.addWidget(self.scan_progress)
+        
+        self.scan_label = QLabel("")
+        self.scan_label.setStyleSheet("color: #616161;")
+        scan_layout.addWidget(self.scan_label, 1)
+        
+        self.scan_cancel_btn = QPushButton("⏹ 中止")
+        self.scan_cancel_btn.clicked.connect(self.cancel_scan)
+        self.scan_cancel_btn.hide()
+        scan_layout.addWidget(self.scan_cancel_btn)
+        layout.addLayout(scan_layout)
+        
         # 依存関係チェック結果
         layout.addWidget(QLabel("依存ライブラリ情報:"))
         self.dependency_text = QTextEdit()
@@ -341,8 +2135,11 @@ class ScriptFileSelector(QDialog):
         self.dependency_text.setPlaceholderText("Pythonファイルを選択すると依存ライブラリ情報が表示されます")
         layout.addWidget(self.dependency_text)
         
-        # ツリーの選択変更時に依存関係をチェック
-        self.tree.itemSelectionChanged.connect(self.check_dependencies)
+        # ツリーの選択変更時に依存関係をチェック（ワーカースレッドで実行）
+        self.dependency_runner = DependencyCheckRunner(self.dependency_text, self)
+        self.tree.selectionModel().currentChanged.connect(self.check_dependencies)
+        self.scan_tree.itemSelectionChanged.connect(self.check_dependencies)
+        self.search_list.itemSelectionChanged.connect(self.check_dependencies)
         
         # ボタン
         button_layout = QHBoxLayout()
@@ -384,96 +2181,241 @@ class ScriptFileSelector(QDialog):
         self.setStyleSheet("QDialog { background-color: #fafafa; border: 1px solid #bdbdbd; } QLabel { color: #212121; }")
     
     def populate_tree(self):
-        """ツリーにファイルを追加"""
-        script_extensions = {'.py', '.bat', '.exe', '.sh', '.command'}
-        
-        def add_directory(parent_item, directory, base_path):
-            """ディレクトリを再帰的に追加"""
-            try:
-                items = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-                
-                for item in items:
-                    if item.is_dir():
-                        # サブディレクトリ
-                        if not item.name.startswith('.'):  # 隠しフォルダは除外
-                            folder_item = QTreeWidgetItem(parent_item)
-                            folder_item.setText(0, f"📁 {item.name}")
-                            folder_item.setText(1, str(item.relative_to(base_path)))
-                            folder_item.setText(2, "フォルダ")
-                            folder_item.setData(0, Qt.UserRole, None)  # フォルダは選択不可
-                            add_directory(folder_item, item, base_path)
-                    elif item.suffix.lower() in script_extensions:
-                        # スクリプトファイル
-                        file_item = QTreeWidgetItem(parent_item)
-                        
-                        # アイコン
-                        icon = "🐍" if item.suffix == '.py' else "📜"
-                        file_item.setText(0, f"{icon} {item.name}")
-                        file_item.setText(1, str(item.relative_to(base_path)))
-                        file_item.setText(2, item.suffix[1:].upper())
-                        file_item.setData(0, Qt.UserRole, str(item))
-                        
-                        # 現在のスクリプトをハイライト
-                        if self.current_script and item == Path(self.current_script):
-                            file_item.setBackground(0, QColor("#3498db"))
-                            file_item.setBackground(1, QColor("#3498db"))
-                            file_item.setBackground(2, QColor("#3498db"))
-                            self.tree.setCurrentItem(file_item)
-            
-            except PermissionError:
-                pass
+        """現在のスクリプトがあれば、その位置までツリーを展開して選択する
         
-        # ルートから追加
-        add_directory(self.tree.invisibleRootItem(), self.folder_path, self.folder_path)
+        QFileSystemModelはフォルダを非同期に読み込むため、
+        まだ読み込まれていなければ directoryLoaded を待ってから選択し直す。
+        """
+        if not self.current_script:
+            return
+        current = Path(self.current_script)
+        if current.exists() and self.folder_path in current.parents:
+            self.pending_current_script = current
+            self.select_current_script()
+    
+    def select_current_script(self):
+        """保留中の現在スクリプトを選択（選択できたらTrue）"""
+        current = self.pending_current_script
+        if current is None:
+            return True
+        
+        source_index = self.fs_model.index(str(current))
+        proxy_index = self.proxy_model.mapFromSource(source_index)
+        if not proxy_index.isValid():
+            return False
+        
+        self.pending_current_script = None
+        self.tree.setCurrentIndex(proxy_index)
+        self.tree.scrollTo(proxy_index)
+        return True
+    
+    def on_directory_loaded(self, path):
+        """フォルダの読み込み完了時（現在スクリプトの選択待ちなら再試行）"""
+        if self.pending_current_script is not None:
+            self.select_current_script()
+    
+    def script_path_at(self, proxy_index):
+        """ツリーの位置に対応するスクリプトのパス（フォルダならNone）"""
+        if not proxy_index.isValid():
+            return None
+        source_index = self.proxy_model.mapToSource(proxy_index)
+        if self.fs_model.isDir(source_index):
+            return None
+        return self.fs_model.filePath(source_index)
+    
+    def current_script_path(self):
+        """表示中の一覧で選ばれているスクリプトのパス（フォルダ・未選択ならNone）"""
+        if not self.search_list.isHidden():
+            current_item = self.search_list.currentItem()
+            return current_item.data(Qt.UserRole) if current_item else None
+        if not self.scan_tree.isHidden():
+            current_item = self.scan_tree.currentItem()
+            return current_item.data(0, Qt.UserRole) if current_item else None
+        return self.script_path_at(self.tree.currentIndex())
+    
+    def update_view(self):
+        """検索中なら検索結果、そうでなければツリーか展開した一覧を表示"""
+        searching = bool(self.search_input.text().strip())
+        self.search_list.setHidden(not searching)
+        self.tree.setHidden(searching or self.full_view)
+        self.scan_tree.setHidden(searching or not self.full_view)
+    
+    def toggle_full_scan(self):
+        """遅延読み込みのツリーと、すべて展開した一覧を切り替え"""
+        self.full_view = not self.full_view
+        if self.full_view:
+            self.expand_btn.setText("🌲 フォルダ表示")
+            self.ensure_scan()
+        else:
+            self.expand_btn.setText("📂 すべて展開")
+            if not self.search_input.text().strip():
+                self.cancel_scan()
+        self.update_view()
+    
+    def ensure_scan(self):
+        """まだスキャンしていなければ開始（完了済みの結果と索引は使い回す）"""
+        if self.scan_task is None and not self.scan_complete:
+            self.start_scan()
+    
+    def start_scan(self):
+        """フォルダ全体のスキャンを開始"""
+        self.cancel_scan()
+        self.scan_id += 1
+        self.scan_tree.clear()
+        self.scan_folders = {}
+        self.scan_file_count = 0
+        self.scan_current_item = None
+        self.scan_complete = False
+        self.path_index.clear()
+        
+        self.scan_task = ScriptScanTask(self.scan_id, self.folder_path, self.scan_policy)
+        self.scan_task.setAutoDelete(False)
+        self.scan_task.signals.batch.connect(self.on_scan_batch)
+        self.scan_task.signals.progress.connect(self.on_scan_progress)
+        self.scan_task.signals.finished.connect(self.on_scan_finished)
+        
+        self.scan_progress.show()
+        self.scan_cancel_btn.show()
+        self.scan_label.setText("🔍 スキャン中...")
+        QThreadPool.globalInstance().start(self.scan_task)
+    
+    def cancel_scan(self):
+        """実行中のスキャンを中断"""
+        if self.scan_task:
+            self.scan_task.cancel()
+    
+    def scan_folder_item(self, relative):
+        """相対フォルダに対応するツリー項目（なければ親から順に作成。ルートはツリー自体）"""
+        if not relative:
+            return self.scan_tree
+        item = self.scan_folders.get(relative)
+        if item is None:
+            item = QTreeWidgetItem(self.scan_folder_item(relative[:-1]))
+            item.setText(0, f"📁 {relative[-1]}")
+            item.setText(1, str(Path(*relative)))
+            item.setText(2, "フォルダ")
+            item.setExpanded(True)
+            self.scan_folders[relative] = item
+        return item
+    
+    def on_scan_batch(self, scan_id, batch):
+        """スキャン結果の一部をツリーに追加"""
+        if scan_id != self.scan_id:
+            return
         
-        # ツリーを展開
-        self.tree.expandAll()
+        current = Path(self.current_script) if self.current_script else None
+        self.scan_tree.setUpdatesEnabled(False)
+        for relative, file_path in batch:
+            item_path = Path(file_path)
+            file_item = QTreeWidgetItem(self.scan_folder_item(relative))
+            icon = "🐍" if item_path.suffix == '.py' else "📜"
+            file_item.setText(0, f"{icon} {item_path.name}")
+            file_item.setText(1, str(Path(*relative, item_path.name)))
+            file_item.setText(2, item_path.suffix[1:].upper())
+            file_item.setData(0, Qt.UserRole, file_path)
+            self.scan_file_count += 1
+            
+            # 現在のスクリプトをハイライト
+            if current and item_path == current:
+                for column in range(3):
+                    file_item.setBackground(column, QColor("#3498db"))
+                self.scan_current_item = file_item
+        self.scan_tree.setUpdatesEnabled(True)
+        
+        self.path_index.add(('/'.join(relative + (os.path.basename(file_path),)), file_path)
+                            for relative, file_path in batch)
+        if not self.search_list.isHidden() and not self.search_timer.isActive():
+            self.search_timer.start()
+    
+    def on_scan_progress(self, scan_id, dir_count, file_count):
+        """スキャンの進捗表示を更新"""
+        if scan_id == self.scan_id:
+            self.scan_label.setText(f"🔍 スキャン中... {dir_count}フォルダ / {file_count}ファイル")
+    
+    def on_scan_finished(self, scan_id, cancelled):
+        """スキャン完了時"""
+        if scan_id != self.scan_id:
+            return
+        file_count = self.scan_file_count
+        self.scan_task = None
+        self.scan_complete = not cancelled
+        self.scan_progress.hide()
+        self.scan_cancel_btn.hide()
+        if self.scan_current_item is not None and self.scan_tree.currentItem() is None:
+            self.scan_tree.setCurrentItem(self.scan_current_item)
+            self.scan_tree.scrollToItem(self.scan_current_item)
+        if cancelled:
+            self.scan_label.setText(f"⏹ 中止しました（{file_count}ファイルまで表示）")
+        elif file_count >= self.scan_policy.max_files:
+            self.scan_label.setText(f"⚠️ 上限の{self.scan_policy.max_files}ファイルで打ち切りました")
+        else:
+            self.scan_label.setText(f"✅ {file_count}ファイル")
+        if not self.search_list.isHidden():
+            self.refresh_search()
+    
+    def on_search_changed(self, text):
+        """検索語の変更時（索引がなければスキャンを開始）"""
+        if text.strip():
+            self.ensure_scan()
+        self.update_view()
+        if text.strip():
+            self.refresh_search()
+        else:
+            self.search_label.setText("")
+    
+    def refresh_search(self):
+        """現在の検索語で検索結果を更新"""
+        self.search_timer.stop()
+        query = self.search_input.text()
+        if not query.strip():
+            return
+        results, count, exact = self.path_index.search(query, self.SEARCH_LIMIT)
+        
+        # 項目の入れ替え中は選択変更を通知しない（依存関係チェックは最後に1回だけ）
+        self.search_list.blockSignals(True)
+        self.search_list.setUpdatesEnabled(False)
+        self.search_list.clear()
+        for relative_path, file_path in results:
+            icon = "🐍" if relative_path.endswith('.py') else "📜"
+            item = QListWidgetItem(f"{icon} {relative_path}")
+            item.setData(Qt.UserRole, file_path)
+            self.search_list.addItem(item)
+        if results:
+            self.search_list.setCurrentRow(0)
+        self.search_list.setUpdatesEnabled(True)
+        self.search_list.blockSignals(False)
+        self.check_dependencies()
+        
+        if not exact and count > len(results):
+            text = f"{len(results)}件以上"
+        else:
+            text = f"{count}件"
+        if self.scan_task:
+            text += f"（スキャン中: {len(self.path_index)}ファイル）"
+        self.search_label.setText(text)
+    
+    def on_search_return(self):
+        """検索欄でEnter：先頭（選択中）の結果を選ぶ"""
+        if self.current_script_path():
+            self.select_file()
     
     def check_dependencies(self):
         """依存関係をチェック"""
-        current_item = self.tree.currentItem()
-        if not current_item:
-            return
-        
-        script_path = current_item.data(0, Qt.UserRole)
+        script_path = self.current_script_path()
         if script_path and script_path.endswith('.py'):
-            result = DependencyChecker.check_python_script(script_path)
-            
-            if 'error' in result:
-                self.dependency_text.setPlainText(f"エラー: {result['error']}")
-            else:
-                text = "📦 依存ライブラリチェック結果:\n\n"
-                
-                if result['third_party']:
-                    text += "サードパーティライブラリ:\n"
-                    for lib in result['third_party']:
-                        status = "✅ インストール済み" if lib in result['installed'] else "❌ 未インストール"
-                        text += f"  • {lib}: {status}\n"
-                    
-                    if result['missing']:
-                        text += f"\n⚠️ 不足しているライブラリ: {', '.join(result['missing'])}\n"
-                        text += f"\nインストールコマンド:\n"
-                        text += f"pip install {' '.join(result['missing'])}"
-                else:
-                    text += "✅ 標準ライブラリのみ使用（追加インストール不要）"
-                
-                self.dependency_text.setPlainText(text)
+            self.dependency_runner.start(script_path, self.folder_path)
         else:
+            self.dependency_runner.cancel()
             self.dependency_text.setPlainText("Pythonスクリプト以外は依存関係チェックをスキップします。")
     
-    def on_item_double_clicked(self, item, column):
+    def on_item_double_clicked(self, index=None):
         """アイテムダブルクリック時"""
-        if item.data(0, Qt.UserRole):  # ファイルの場合
+        if self.current_script_path():  # ファイルの場合
             self.select_file()
     
     def select_file(self):
         """ファイルを選択"""
-        current_item = self.tree.currentItem()
-        if not current_item:
-            CustomMessageBox.warning(self, "警告", "ファイルを選択してください。")
-            return
-        
-        script_path = current_item.data(0, Qt.UserRole)
+        script_path = self.current_script_path()
         if not script_path:
             CustomMessageBox.warning(self, "警告", "実行可能なファイルを選択してください。")
             return
@@ -484,18 +2426,32 @@ class ScriptFileSelector(QDialog):
     def get_selected_script(self):
         """選択されたスクリプトを取得"""
         return self.selected_script
+    
+    def done(self, result):
+        """ダイアログを閉じるときは実行中のチェック・スキャンを中断"""
+        self.dependency_runner.cancel()
+        self.cancel_scan()
+        super().done(result)
 
 class CassetteInfo:
     """カセット（スクリプト）情報を管理するクラス"""
     def __init__(self, folder_path):
         self.folder_path = Path(folder_path)
         self.name = self.folder_path.name
+        self.cassette_id = None  # フォルダ名が変わっても同じカセットだと分かる固定ID（info.json の id）
         self.script_path = None
         self.icon_path = None
         self.description = ""
         self.icon_color = "#4CAF50"
         self.tags = []
         self.is_favorite = False
+        self.source_folder = None  # 参照方式の場合の参照元フォルダ
+        self.source_setting = None  # info.json の source_folder（参照元が見つからなくても保持）
+        self.script_setting = None  # info.json の script / icon（書き戻すときにそのまま使う）
+        self.icon_setting = None
+        self.saved_data = None  # 最後に読み書きした info.json の内容（変更がなければ書き込まない）
+        self.scan_ignore = []  # info.json の除外パターン（config.json のパターンに追加）
+        self.scan_policy = None
         self.load_info()
     
     def load_info(self):
@@ -510,12 +2466,19 @@ class CassetteInfo:
                     self.icon_color = data.get('icon_color', '#4CAF50')
                     self.tags = data.get('tags', [])
                     self.is_favorite = data.get('is_favorite', False)
+                    self.scan_ignore = data.get('scan_ignore', [])
+                    self.cassette_id = data.get('id')
+                    self.script_setting = data.get('script')
+                    self.icon_setting = data.get('icon')
                     
                     # 参照方式の場合
                     source_folder = data.get('source_folder')
                     if source_folder:
+                        self.source_setting = source_folder
                         source_path = Path(source_folder)
                         if source_path.exists():
+                            self.source_folder = source_path
+                            
                             # スクリプトパス
                             script_name = data.get('script', 'main.py')
                             self.script_path = source_path / script_name
@@ -537,79 +2500,88 @@ class CassetteInfo:
             except Exception as e:
                 print(f"カセット情報の読み込みエラー: {e}")
         
+        self.scan_policy = ScanPolicy.from_config(extra_patterns=self.scan_ignore)
+        
         # スクリプトが存在しない場合は再帰的に検索
         if not self.script_path or not self.script_path.exists():
             self.script_path = self.find_main_script()
         
-        # デフォルトのアイコンを探す
+        # デフォルトのアイコンを探す（参照方式の場合は元のフォルダの直下）
         if not self.icon_path or not self.icon_path.exists():
-            search_path = self.folder_path
-            # 参照方式の場合は元のフォルダを検索
-            if info_file.exists():
-                try:
-                    with open(info_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        source_folder = data.get('source_folder')
-                        if source_folder:
-                            source_path = Path(source_folder)
-                            if source_path.exists():
-                                search_path = source_path
-                except:
-                    pass
-            
-            for ext in ['.png', '.jpg', '.ico']:
-                icons = list(search_path.glob(f'*{ext}'))
-                if icons:
-                    self.icon_path = icons[0]
+            search_path = self.source_folder or self.folder_path
+            icon_extensions = ['.png', '.jpg', '.ico']
+            icons = [file_path
+                     for _relative, files in self.scan_policy.walk(search_path, set(icon_extensions), max_depth=0)
+                     for file_path in files]
+            for ext in icon_extensions:
+                matches = [file_path for file_path in icons if file_path.lower().endswith(ext)]
+                if matches:
+                    self.icon_path = Path(matches[0])
                     break
-    
-    def find_main_script(self):
-        """メインスクリプトを再帰的に検索"""
-        script_extensions = ['.py', '.bat', '.exe', '.sh']
         
-        # まずルートディレクトリを検索
-        for ext in script_extensions:
-            scripts = list(self.folder_path.glob(f'*{ext}'))
-            if scripts:
-                return scripts[0]
-        
-        # 次にサブディレクトリを検索
-        for ext in script_extensions:
-            scripts = list(self.folder_path.rglob(f'*{ext}'))
-            if scripts:
-                return scripts[0]
-        
-        return None
+        try:
+            self.saved_data = self.build_info_data()
+        except Exception as e:
+            print(f"カセット情報の読み込みエラー: {e}")
     
-    def save_info(self):
-        """カセット情報を保存"""
-        info_file = self.folder_path / "info.json"
+    def assign_id(self):
+        """IDのないカセットにIDを割り当て、info.json に追記する（他の項目はそのまま）
         
-        # 参照方式かどうかを判定
-        is_reference = False
-        source_folder_path = None
+        読み込み（コンストラクタ）では書き込まない。監査やログの書き出しなど読むだけの処理で
+        ユーザーのファイルを書き換えないよう、アプリ本体がカセットを読み込んだときだけ呼ぶ。
+        """
+        info_file = self.folder_path / "info.json"
+        if self.cassette_id or not info_file.exists():
+            return
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['id'] = uuid.uuid4().hex
+            write_json_atomic(info_file, data, indent=2, ensure_ascii=False)
+            self.cassette_id = data['id']
+            self.saved_data = self.build_info_data()
+        except Exception as e:
+            print(f"カセットIDの保存エラー: {e}")
+    
+    def find_main_script(self):
+        """メインスクリプトを検索（ルート直下を優先し、次にサブフォルダを検索）"""
+        return self.scan_policy.find_first(self.folder_path, ['.py', '.bat', '.exe', '.sh'])
+    
+    def is_dirty(self):
+        """最後に読み書きしてから内容が変わったか"""
+        return self.build_info_data() != self.saved_data
+    
+    @staticmethod
+    def info_path(path, base, setting, default):
+        """info.json に書くパス
         
-        if info_file.exists():
-            try:
-                with open(info_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-                    source_folder_path = existing_data.get('source_folder')
-                    if source_folder_path:
-                        is_reference = True
-            except:
-                pass
+        base の中なら base からの相対パス。外（"icon": "/tmp/shared_icon.png" など）なら、
+        読み込んだ値から変わっていなければその値のまま、変わっていれば絶対パス
+        """
+        if path and base in path.parents:
+            return path.relative_to(base)
+        if setting and (not path or base / setting == path):
+            return setting
+        return path or default
+    
+    def build_info_data(self):
+        """info.json に書き込む内容を作成"""
+        # 参照方式かどうかは読み込み時の source_folder で判定（ファイルを読み直さない）
+        source_folder_path = self.source_folder or self.source_setting
         
-        if is_reference and source_folder_path:
+        if source_folder_path:
             # 参照方式の場合
+            # 参照元が見つからないときのパスはカセットフォルダ内の代わりなので、読み込んだ値を残す
             source_path = Path(source_folder_path)
-            script_relative = self.script_path.relative_to(source_path) if self.script_path and source_path in self.script_path.parents else Path('main.py')
-            icon_relative = self.icon_path.relative_to(source_path) if self.icon_path and source_path in self.icon_path.parents else Path('icon.png')
+            found = self.source_folder is not None
+            script_relative = self.info_path(self.script_path if found else None, source_path, self.script_setting, 'main.py')
+            icon_relative = self.info_path(self.icon_path if found else None, source_path, self.icon_setting, 'icon.png')
             
             data = {
                 'name': self.name,
                 'description': self.description,
                 'icon_color': self.icon_color,
-                'tags': self.tags,
+                'tags': list(self.tags),
                 'is_favorite': self.is_favorite,
                 'source_folder': str(source_path),
                 'script': str(script_relative),
@@ -617,24 +2589,278 @@ class CassetteInfo:
             }
         else:
             # コピー方式（従来通り）
-            script_relative = self.script_path.relative_to(self.folder_path) if self.script_path else Path('main.py')
-            icon_relative = self.icon_path.relative_to(self.folder_path) if self.icon_path else Path('icon.png')
+            script_relative = self.info_path(self.script_path, self.folder_path, self.script_setting, 'main.py')
+            icon_relative = self.info_path(self.icon_path, self.folder_path, self.icon_setting, 'icon.png')
             
             data = {
                 'name': self.name,
                 'description': self.description,
                 'icon_color': self.icon_color,
-                'tags': self.tags,
+                'tags': list(self.tags),
                 'is_favorite': self.is_favorite,
                 'script': str(script_relative),
                 'icon': str(icon_relative)
             }
         
+        if self.scan_ignore:
+            data['scan_ignore'] = list(self.scan_ignore)
+        if self.cassette_id:
+            data['id'] = self.cassette_id
+        return data
+    
+    def save_info(self):
+        """カセット情報を保存（変更がなければ書き込まない）"""
+        data = self.build_info_data()
+        if data == self.saved_data:
+            return
+        
         try:
-            with open(info_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.folder_path / "info.json", data, indent=2, ensure_ascii=False)
+            self.saved_data = data
         except Exception as e:
             print(f"カセット情報の保存エラー: {e}")
+    
+    @classmethod
+    def load_all(cls, cassettes_dir):
+        """フォルダ内のカセットをすべて読み込む（スクリプトが見つからないものは除く）"""
+        cassettes = []
+        for folder in Path(cassettes_dir).iterdir():
+            if folder.is_dir():
+                cassette = cls(folder)
+                if cassette.script_path and cassette.script_path.exists():
+                    cassettes.append(cassette)
+        return cassettes
+
+class CassetteLoadSignals(QObject):
+    """カセット読み込みタスクのシグナル"""
+    finished = Signal(object)  # 読み込んだカセットのリスト
+
+class CassetteLoadTask(QRunnable):
+    """カセットの読み込みをワーカースレッドで実行するタスク（起動直後に使う）"""
+    def __init__(self, cassettes_dir):
+        super().__init__()
+        self.cassettes_dir = cassettes_dir
+        self.signals = CassetteLoadSignals()
+    
+    def run(self):
+        try:
+            cassettes = CassetteInfo.load_all(self.cassettes_dir)
+        except Exception as e:
+            print(f"カセット読み込みエラー: {e}")
+            cassettes = []
+        self.signals.finished.emit(cassettes)
+
+class CassetteIndex:
+    """カセットの索引（カセットID・フォルダ名から O(1) で引く）
+    
+    フォルダを手でコピーして作ったカセットは info.json のIDも同じになるため、
+    IDだけで引くとコピーの一方に化けてしまう。IDとフォルダ名が両方一致するものを
+    優先し、IDだけで引くのはそのフォルダがないとき（フォルダ名を変えたとき）に限る。
+    """
+    def __init__(self, cassettes=()):
+        self.rebuild(cassettes)
+    
+    def rebuild(self, cassettes):
+        """カセット一覧から索引を作り直す（IDが重複していればフォルダ名順で最初のものを登録）"""
+        self.by_folder = {c.folder_path.name: c for c in cassettes}
+        self.by_id = {}
+        self.duplicate_ids = {}  # ID -> そのIDを持つフォルダ名（2つ以上あるもの）
+        for cassette in sorted(cassettes, key=lambda c: c.folder_path.name):
+            if not cassette.cassette_id:
+                continue
+            first = self.by_id.setdefault(cassette.cassette_id, cassette)
+            if first is not cassette:
+                self.duplicate_ids.setdefault(cassette.cassette_id, [first.folder_path.name]).append(cassette.folder_path.name)
+        for cassette_id, folders in self.duplicate_ids.items():
+            print(f"警告: カセットIDが重複しています（{cassette_id}）: {', '.join(folders)}")
+    
+    def __len__(self):
+        return len(self.by_folder)
+    
+    def find(self, cassette_id=None, folder=None):
+        """IDとフォルダ名が一致するものを優先し、なければIDで、それもなければフォルダ名で探す"""
+        by_folder = self.by_folder.get(folder) if folder else None
+        if by_folder is not None and (not cassette_id or by_folder.cassette_id == cassette_id):
+            return by_folder
+        by_id = self.by_id.get(cassette_id) if cassette_id else None
+        return by_id or by_folder
+    
+    def resolve(self, cassette):
+        """読み込み直す前のカセット情報を最新のものに置き換える（見つからなければそのまま）"""
+        if cassette is None:
+            return None
+        return self.find(cassette.cassette_id, cassette.folder_path.name) or cassette
+
+class CassetteSearchIndex:
+    """カセットのあいまい検索（名前・タグの3文字組インデックスと、説明を含む部分一致）
+    
+    sync() で変わったカセットだけを索引し直す。検索語は空白区切りのAND。
+    - 名前・タグは3文字組の6割以上が一致すれば候補にする（打ち間違いを許す）
+    - 名前・タグ・説明のどこかに語がそのまま含まれていれば候補にする
+    """
+    NGRAM = 3
+    MIN_OVERLAP = 0.6
+    
+    def __init__(self):
+        self.entries = {}   # フォルダ名 -> (署名, カセット, 名前, タグ, 説明)（正規化済み）
+        self.grams = {}     # フォルダ名 -> 名前・タグの3文字組
+        self.postings = {}  # 3文字組 -> フォルダ名の集合
+        self.view = None    # 部分一致用の並列リスト（フォルダ名, 名前, タグ, 説明, 3つをつないだ文字列）
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @staticmethod
+    def normalize(text):
+        """全角・半角と大文字・小文字の違いをなくす"""
+        return unicodedata.normalize('NFKC', text).casefold()
+    
+    @classmethod
+    def ngrams(cls, text):
+        """文字列の3文字組（短い文字列はそれ自体）"""
+        if len(text) < cls.NGRAM:
+            return {text} if text else set()
+        return {text[i:i + cls.NGRAM] for i in range(len(text) - cls.NGRAM + 1)}
+    
+    def sync(self, cassettes):
+        """カセット一覧に合わせて索引を更新（名前・タグ・説明が変わったものだけ索引し直す）"""
+        seen = set()
+        for cassette in cassettes:
+            key = cassette.folder_path.name
+            seen.add(key)
+            signature = (cassette.name, tuple(cassette.tags), cassette.description)
+            entry = self.entries.get(key)
+            if entry and entry[0] == signature:
+                if entry[1] is not cassette:
+                    self.entries[key] = (signature, cassette) + entry[2:]
+                continue
+            if entry:
+                self.remove(key)
+            self.add(key, signature, cassette)
+        
+        for key in [key for key in self.entries if key not in seen]:
+            self.remove(key)
+    
+    def add(self, key, signature, cassette):
+        """1件を索引に加える"""
+        name = self.normalize(cassette.name)
+        tags = self.normalize(" ".join(cassette.tags))
+        grams = set()
+        for word in name.split() + tags.split():
+            grams |= self.ngrams(word)
+        self.entries[key] = (signature, cassette, name, tags, self.normalize(cassette.description))
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+        self.view = None
+    
+    def remove(self, key):
+        """1件を索引から外す"""
+        del self.entries[key]
+        for gram in self.grams.pop(key):
+            keys = self.postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self.postings[gram]
+        self.view = None
+    
+    def get_view(self):
+        """部分一致用の並列リスト（索引が変わったときだけ作り直す）"""
+        if self.view is None:
+            keys = list(self.entries)
+            rows = [self.entries[key][2:] for key in keys]
+            self.view = (keys, [row[0] for row in rows], [row[1] for row in rows],
+                         [row[2] for row in rows], ["\n".join(row) for row in rows])
+        return self.view
+    
+    def substring_matches(self, term):
+        """名前・タグ・説明のどこかに語を含むカセット"""
+        keys, _names, _tags, _descriptions, texts = self.get_view()
+        return {key for key, text in zip(keys, texts) if term in text}
+    
+    def fuzzy_matches(self, term):
+        """名前・タグの3文字組が十分に一致するカセット {フォルダ名: 一致した割合}"""
+        grams = self.ngrams(term)
+        counts = Counter()
+        for gram in grams:
+            keys = self.postings.get(gram)
+            if keys:
+                counts.update(keys)
+        need = max(1, int(len(grams) * self.MIN_OVERLAP + 0.999))
+        return {key: count / len(grams) for key, count in counts.items() if count >= need}
+    
+    def search(self, query, limit=50, boost=None):
+        """検索語に合うカセットを関連度順に返す（boost: フォルダ名 -> 同点時に優先する値）"""
+        terms = self.normalize(query).split()
+        if not terms:
+            return []
+        boost = boost or {}
+        if len(terms) == 1:
+            return [self.entries[key][1] for key in self.rank_term(terms[0], limit, boost)]
+        
+        # 長い語ほど候補が少ないので先に絞る
+        terms.sort(key=len, reverse=True)
+        candidates = None
+        overlaps = []
+        for term in terms:
+            matched = self.substring_matches(term)
+            overlap = self.fuzzy_matches(term) if len(term) >= self.NGRAM else {}
+            matched.update(overlap)
+            overlaps.append(overlap)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+        
+        entries = self.entries
+        scored = []
+        for key in candidates:
+            _signature, _cassette, name, tags, description = entries[key]
+            score = 0
+            for term, overlap in zip(terms, overlaps):
+                if name.startswith(term):
+                    score += 10
+                elif term in name:
+                    score += 6
+                elif term in tags:
+                    score += 4
+                elif term in description:
+                    score += 2
+                else:
+                    score += 3 * overlap.get(key, 0.0)
+            scored.append((-score, -boost.get(key, 0.0), len(name), name, key))
+        
+        return [entries[item[-1]][1] for item in heapq.nsmallest(limit, scored)]
+    
+    def rank_term(self, term, limit, boost):
+        """1語の検索（一致の強い順に段階的に集め、上位 limit 件がそろえばそこで止める）
+        
+        名前の前方一致 → 名前の部分一致 → タグ → 説明 → 3文字組のあいまい一致 の順。
+        同じ段階の中では boost の大きい順、名前の短い順。
+        """
+        keys, names, tags, descriptions, _texts = self.get_view()
+        entries = self.entries
+        tiers = (
+            lambda: [key for key, name in zip(keys, names) if name.startswith(term)],
+            lambda: [key for key, name in zip(keys, names) if term in name],
+            lambda: [key for key, tag in zip(keys, tags) if term in tag],
+            lambda: [key for key, description in zip(keys, descriptions) if term in description],
+        )
+        results = []
+        taken = set()
+        for tier in tiers:
+            members = [key for key in tier() if key not in taken]
+            taken.update(members)
+            results += heapq.nsmallest(limit - len(results), members,
+                                       key=lambda key: (-boost.get(key, 0.0), len(entries[key][2]), entries[key][2]))
+            if len(results) >= limit:
+                return results
+        
+        if len(term) >= self.NGRAM:
+            overlap = self.fuzzy_matches(term)
+            fuzzy = [key for key in overlap if key not in taken]
+            results += heapq.nsmallest(limit - len(results), fuzzy,
+                                       key=lambda key: (-overlap[key], -boost.get(key, 0.0), len(entries[key][2])))
+        return results
 
 class NewCassetteWizard(QDialog):
     """新規カセット作成ウィザード"""
@@ -733,6 +2959,7 @@ class NewCassetteWizard(QDialog):
         self.dependency_text.setMaximumHeight(90)
         self.dependency_text.setPlaceholderText("Pythonスクリプトの依存ライブラリ情報")
         step2_layout.addWidget(self.dependency_text)
+        self.dependency_runner = DependencyCheckRunner(self.dependency_text, self)
         
         step2_frame.setLayout(step2_layout)
         layout.addWidget(step2_frame)
@@ -890,30 +3117,16 @@ class NewCassetteWizard(QDialog):
     def check_dependencies(self):
         """依存関係をチェック"""
         if self.script_file and self.script_file.endswith('.py'):
-            result = DependencyChecker.check_python_script(self.script_file)
-            
-            if 'error' in result:
-                self.dependency_text.setPlainText(f"エラー: {result['error']}")
-            else:
-                text = "📦 依存ライブラリチェック結果:\n\n"
-                
-                if result['third_party']:
-                    text += "サードパーティライブラリ:\n"
-                    for lib in result['third_party']:
-                        status = "✅ インストール済み" if lib in result['installed'] else "❌ 未インストール"
-                        text += f"  • {lib}: {status}\n"
-                    
-                    if result['missing']:
-                        text += f"\n⚠️ 不足しているライブラリ: {', '.join(result['missing'])}\n"
-                        text += f"\nインストールコマンド:\n"
-                        text += f"pip install {' '.join(result['missing'])}"
-                else:
-                    text += "✅ 標準ライブラリのみ使用（追加インストール不要）"
-                
-                self.dependency_text.setPlainText(text)
+            self.dependency_runner.start(self.script_file, self.source_folder)
         else:
+            self.dependency_runner.cancel()
             self.dependency_text.setPlainText("Pythonスクリプト以外は依存関係チェックをスキップします。")
     
+    def done(self, result):
+        """ダイアログを閉じるときは実行中のチェックを中断"""
+        self.dependency_runner.cancel()
+        super().done(result)
+    
     def select_icon(self):
         """アイコンを選択"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -995,6 +3208,7 @@ class NewCassetteWizard(QDialog):
             tags = [tag.strip() for tag in self.tag_input.text().split(',') if tag.strip()]
             
             info_data = {
+                'id': uuid.uuid4().hex,
                 'name': title,
                 'description': self.description_input.toPlainText(),
                 'icon_color': self.current_color,
@@ -1005,9 +3219,7 @@ class NewCassetteWizard(QDialog):
                 'icon': str(icon_relative) if icon_relative else 'icon.png'
             }
             
-            info_file = cassette_folder / "info.json"
-            with open(info_file, 'w', encoding='utf-8') as f:
-                json.dump(info_data, f, indent=2, ensure_ascii=False)
+            write_json_atomic(cassette_folder / "info.json", info_data, indent=2, ensure_ascii=False)
             
             progress.setValue(100)
             
@@ -1023,15 +3235,37 @@ class NewCassetteWizard(QDialog):
             CustomMessageBox.critical(self, "エラー", f"カセットの作成に失敗しました:\n{str(e)}")
 
 class CassetteCard(QFrame):
-    """カセットカード（Switch風）"""
+    """カセットカード（Switch風）。別のカセットを表示し直して使い回せる"""
     clicked = Signal()
+    ICON_SIZE = 180
+    NORMAL_STYLE = """
+        CassetteCard {
+            background-color: #ffffff;
+            border-radius: 15px;
+            border: 2px solid #e0e0e0;
+        }
+        CassetteCard:hover {
+            border: 2px solid #3498db;
+            background-color: #f5f5f5;
+        }
+    """
+    CURRENT_STYLE = """
+        CassetteCard {
+            background-color: #e3f2fd;
+            border-radius: 15px;
+            border: 3px solid #e74c3c;
+        }
+    """
+    _pixmap_cache = {}  # (アイコンのパス, 更新時刻) -> 縮小済みのピクスマップ
     
     def __init__(self, cassette, parent=None):
         super().__init__(parent)
-        self.cassette = cassette
+        self.cassette = None
+        self.signature = None
         self.setMinimumSize(200, 280)
         self.setMaximumSize(200, 280)
         self.setup_ui()
+        self.set_cassette(cassette)
     
     def setup_ui(self):
         """UIのセットアップ"""
@@ -1039,40 +3273,22 @@ class CassetteCard(QFrame):
         layout.setContentsMargins(10, 10, 10, 10)
         
         # お気に入りバッジ
-        if self.cassette.is_favorite:
-            fav_label = QLabel("⭐")
-            fav_label.setAlignment(Qt.AlignRight)
-            fav_label.setStyleSheet("font-size: 20px;")
-            layout.addWidget(fav_label)
+        self.fav_label = QLabel("⭐")
+        self.fav_label.setAlignment(Qt.AlignRight)
+        self.fav_label.setStyleSheet("font-size: 20px;")
+        layout.addWidget(self.fav_label)
         
         # アイコン表示
-        icon_label = QLabel()
-        icon_label.setAlignment(Qt.AlignCenter)
-        icon_label.setFixedSize(180, 180)
-        
-        if self.cassette.icon_path and self.cassette.icon_path.exists():
-            pixmap = QPixmap(str(self.cassette.icon_path))
-            pixmap = pixmap.scaled(180, 180, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon_label.setPixmap(pixmap)
-        else:
-            icon_label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {self.cassette.icon_color};
-                    border-radius: 10px;
-                    color: white;
-                    font-size: 48px;
-                    font-weight: bold;
-                }}
-            """)
-            icon_label.setText(self.cassette.name[0].upper() if self.cassette.name else "?")
-        
-        layout.addWidget(icon_label)
+        self.icon_label = QLabel()
+        self.icon_label.setAlignment(Qt.AlignCenter)
+        self.icon_label.setFixedSize(self.ICON_SIZE, self.ICON_SIZE)
+        layout.addWidget(self.icon_label)
         
         # タイトル
-        title_label = QLabel(self.cassette.name)
-        title_label.setAlignment(Qt.AlignCenter)
-        title_label.setWordWrap(True)
-        title_label.setStyleSheet("""
+        self.title_label = QLabel()
+        self.title_label.setAlignment(Qt.AlignCenter)
+        self.title_label.setWordWrap(True)
+        self.title_label.setStyleSheet("""
             QLabel {
                 color: #212121;
                 font-size: 14px;
@@ -1080,32 +3296,77 @@ class CassetteCard(QFrame):
                 padding: 5px;
             }
         """)
-        layout.addWidget(title_label)
+        layout.addWidget(self.title_label)
         
         # タグ表示
-        if self.cassette.tags:
-            tags_label = QLabel(" ".join([f"#{tag}" for tag in self.cassette.tags[:3]]))
-            tags_label.setAlignment(Qt.AlignCenter)
-            tags_label.setStyleSheet("""
-                QLabel {
-                    color: #616161;
-                    font-size: 10px;
-                }
-            """)
-            layout.addWidget(tags_label)
-        
-        self.setLayout(layout)
-        self.setStyleSheet("""
-            CassetteCard {
-                background-color: #ffffff;
-                border-radius: 15px;
-                border: 2px solid #e0e0e0;
-            }
-            CassetteCard:hover {
-                border: 2px solid #3498db;
-                background-color: #f5f5f5;
+        self.tags_label = QLabel()
+        self.tags_label.setAlignment(Qt.AlignCenter)
+        self.tags_label.setStyleSheet("""
+            QLabel {
+                color: #616161;
+                font-size: 10px;
             }
         """)
+        layout.addWidget(self.tags_label)
+        
+        self.setLayout(layout)
+        self.setStyleSheet(self.NORMAL_STYLE)
+    
+    @staticmethod
+    def signature_of(cassette):
+        """カードの見た目を決める値（これが変わったときだけ描き直す）"""
+        icon_mtime = None
+        if cassette.icon_path:
+            try:
+                icon_mtime = cassette.icon_path.stat().st_mtime_ns
+            except OSError:
+                pass
+        return (id(cassette), cassette.name, str(cassette.icon_path), icon_mtime,
+                cassette.icon_color, tuple(cassette.tags[:3]), cassette.is_favorite)
+    
+    def set_cassette(self, cassette):
+        """表示するカセットを設定（前回と見た目が同じなら何もしない）"""
+        signature = self.signature_of(cassette)
+        self.cassette = cassette
+        if signature == self.signature:
+            return
+        self.signature = signature
+        
+        self.fav_label.setVisible(cassette.is_favorite)
+        
+        icon_mtime = signature[3]
+        if icon_mtime is not None:
+            key = (str(cassette.icon_path), icon_mtime)
+            pixmap = self._pixmap_cache.get(key)
+            if pixmap is None:
+                pixmap = QPixmap(str(cassette.icon_path)).scaled(
+                    self.ICON_SIZE, self.ICON_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                self._pixmap_cache[key] = pixmap
+            self.icon_label.setStyleSheet("")
+            self.icon_label.setText("")
+            self.icon_label.setPixmap(pixmap)
+        else:
+            self.icon_label.setPixmap(QPixmap())
+            self.icon_label.setStyleSheet(f"""
+                QLabel {{
+                    background-color: {cassette.icon_color};
+                    border-radius: 10px;
+                    color: white;
+                    font-size: 48px;
+                    font-weight: bold;
+                }}
+            """)
+            self.icon_label.setText(cassette.name[0].upper() if cassette.name else "?")
+        
+        self.title_label.setText(cassette.name)
+        self.tags_label.setText(" ".join([f"#{tag}" for tag in cassette.tags[:3]]))
+        self.tags_label.setVisible(bool(cassette.tags))
+    
+    def set_current(self, is_current):
+        """選択中のカードとして強調表示するか"""
+        style = self.CURRENT_STYLE if is_current else self.NORMAL_STYLE
+        if self.styleSheet() != style:
+            self.setStyleSheet(style)
     
     def mousePressEvent(self, event):
         """マウスクリックイベント"""
@@ -1116,12 +3377,14 @@ class CarouselWidget(QWidget):
     """カルーセル表示ウィジェット"""
     cassette_selected = Signal(object)
     
+    VISIBLE_CARDS = 3  # 現在のカードと前後1枚ずつ
+    
     def __init__(self, cassettes, parent=None):
         super().__init__(parent)
         self.all_cassettes = cassettes
         self.filtered_cassettes = cassettes.copy()
         self.current_index = 0
-        self.cards = []
+        self.cards = []  # 表示用のカード（作り直さず、表示するカセットを差し替える）
         self.setup_ui()
     
     def setup_ui(self):
@@ -1139,13 +3402,8 @@ class CarouselWidget(QWidget):
         filter_layout.addWidget(QLabel("タグ:"))
         self.tag_combo = QComboBox()
         self.tag_combo.addItem("すべて")
-        
-        # すべてのタグを収集
-        all_tags = set()
-        for cassette in self.all_cassettes:
-            all_tags.update(cassette.tags)
-        for tag in sorted(all_tags):
-            self.tag_combo.addItem(tag)
+        self.tags = []
+        self.update_tags()
         
         self.tag_combo.currentTextChanged.connect(self.apply_filters)
         filter_layout.addWidget(self.tag_combo)
@@ -1161,6 +3419,11 @@ class CarouselWidget(QWidget):
         self.card_layout.setAlignment(Qt.AlignCenter)
         card_container.setLayout(self.card_layout)
         
+        self.no_result = QLabel("該当するカセットがありません")
+        self.no_result.setStyleSheet("color: #616161; font-size: 16px;")
+        self.no_result.setAlignment(Qt.AlignCenter)
+        self.card_layout.addWidget(self.no_result)
+        
         scroll_area = QScrollArea()
         scroll_area.setWidget(card_container)
         scroll_area.setWidgetResizable(True)
@@ -1229,60 +3492,81 @@ class CarouselWidget(QWidget):
             }
         """
     
+    def update_tags(self):
+        """タグの選択肢を更新（タグの種類が変わったときだけ作り直す）"""
+        all_tags = set()
+        for cassette in self.all_cassettes:
+            all_tags.update(cassette.tags)
+        tags = sorted(all_tags)
+        if tags == self.tags:
+            return
+        
+        self.tags = tags
+        selected_tag = self.tag_combo.currentText()
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.clear()
+        self.tag_combo.addItem("すべて")
+        self.tag_combo.addItems(tags)
+        self.tag_combo.setCurrentIndex(max(0, self.tag_combo.findText(selected_tag)))
+        self.tag_combo.blockSignals(False)
+    
+    def filter_cassettes(self):
+        """フィルター条件に合うカセットの一覧"""
+        selected_tag = self.tag_combo.currentText()
+        favorites_only = self.favorite_filter.isChecked()
+        return [
+            cassette for cassette in self.all_cassettes
+            # お気に入りフィルター / タグフィルター
+            if not (favorites_only and not cassette.is_favorite)
+            and (selected_tag == "すべて" or selected_tag in cassette.tags)
+        ]
+    
     def apply_filters(self):
         """フィルターを適用"""
-        self.filtered_cassettes = []
-        
-        for cassette in self.all_cassettes:
-            # お気に入りフィルター
-            if self.favorite_filter.isChecked() and not cassette.is_favorite:
-                continue
-            
-            # タグフィルター
-            selected_tag = self.tag_combo.currentText()
-            if selected_tag != "すべて" and selected_tag not in cassette.tags:
-                continue
-            
-            self.filtered_cassettes.append(cassette)
+        self.filtered_cassettes = self.filter_cassettes()
+        self.current_index = 0
+        self.update_cards()
+    
+    def set_cassettes(self, cassettes):
+        """カセット一覧を差し替える（選択中のカセットはそのまま、変わったカードだけ描き直す）"""
+        current = self.filtered_cassettes[self.current_index] if self.filtered_cassettes else None
+        self.all_cassettes = cassettes
+        self.update_tags()
+        self.filtered_cassettes = self.filter_cassettes()
         
         self.current_index = 0
+        if current is not None:
+            for index, cassette in enumerate(self.filtered_cassettes):
+                if cassette is current or (current.cassette_id and cassette.cassette_id == current.cassette_id):
+                    self.current_index = index
+                    break
         self.update_cards()
     
     def update_cards(self):
-        """カード表示を更新"""
-        for card in self.cards:
-            card.deleteLater()
-        self.cards.clear()
-        
+        """カード表示を更新（カードは使い回し、内容が変わったものだけ描き直す）"""
+        self.no_result.setVisible(not self.filtered_cassettes)
         if not self.filtered_cassettes:
-            no_result = QLabel("該当するカセットがありません")
-            no_result.setStyleSheet("color: #616161; font-size: 16px;")
-            no_result.setAlignment(Qt.AlignCenter)
-            self.card_layout.addWidget(no_result)
-            self.cards.append(no_result)
+            for card in self.cards:
+                card.hide()
             return
         
         visible_indices = []
-        for i in range(-1, 2):
+        for i in range(-(self.VISIBLE_CARDS // 2), self.VISIBLE_CARDS // 2 + 1):
             index = (self.current_index + i) % len(self.filtered_cassettes)
             visible_indices.append(index)
         
-        for idx in visible_indices:
+        for position, idx in enumerate(visible_indices):
             cassette = self.filtered_cassettes[idx]
-            card = CassetteCard(cassette)
-            
-            if idx == self.current_index:
-                card.setStyleSheet("""
-                    CassetteCard {
-                        background-color: #e3f2fd;
-                        border-radius: 15px;
-                        border: 3px solid #e74c3c;
-                    }
-                """)
-            
-            card.clicked.connect(lambda c=cassette: self.cassette_selected.emit(c))
-            self.card_layout.addWidget(card)
-            self.cards.append(card)
+            if position < len(self.cards):
+                card = self.cards[position]
+                card.set_cassette(cassette)
+            else:
+                card = CassetteCard(cassette)
+                card.clicked.connect(lambda c=card: self.cassette_selected.emit(c.cassette))
+                self.card_layout.addWidget(card)
+                self.cards.append(card)
+            card.set_current(idx == self.current_index)
+            card.show()
     
     def next_cassette(self):
         """次のカセットへ"""
@@ -1391,7 +3675,8 @@ class CassetteEditDialog(QDialog):
     
     def browse_script(self):
         """スクリプトファイルを変更"""
-        dialog = ScriptFileSelector(self.cassette.folder_path, str(self.cassette.script_path), self)
+        dialog = ScriptFileSelector(self.cassette.folder_path, str(self.cassette.script_path), self,
+                                    scan_policy=self.cassette.scan_policy)
         if dialog.exec_() == QDialog.Accepted:
             selected_script = dialog.get_selected_script()
             if selected_script:
@@ -1432,7 +3717,7 @@ class CassetteEditDialog(QDialog):
         self.accept()
 
 class SlotAssignDialog(QDialog):
-    """スロット割り当てダイアログ"""
+    """スロット割り当てダイアログ（閉じても破棄せず、prepare で次のスロット用に使い回す）"""
     def __init__(self, slot_number, cassettes, parent=None):
         super().__init__(parent)
         self.slot_number = slot_number
@@ -1447,10 +3732,10 @@ class SlotAssignDialog(QDialog):
         layout = QVBoxLayout()
         
         # タイトル
-        title = QLabel(f"スロット {self.slot_number} に割り当てるカセットを選択")
-        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #212121;")
-        title.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title)
+        self.title_label = QLabel(f"スロット {self.slot_number} に割り当てるカセットを選択")
+        self.title_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #212121;")
+        self.title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.title_label)
         
         # カルーセル
         self.carousel = CarouselWidget(self.cassettes)
@@ -1505,6 +3790,16 @@ class SlotAssignDialog(QDialog):
             }}
         """
     
+    def prepare(self, slot_number, cassettes):
+        """別のスロット用に表示を切り替える（カルーセルは変わったカードだけ更新）"""
+        self.slot_number = slot_number
+        self.cassettes = cassettes
+        self.selected_cassette = None
+        self.setWindowTitle(f"スロット {slot_number} にカセットを割り当て")
+        self.title_label.setText(f"スロット {slot_number} に割り当てるカセットを選択")
+        self.description_text.clear()
+        self.carousel.set_cassettes(cassettes)
+    
     def on_cassette_selected(self, cassette):
         """カセット選択時"""
         self.selected_cassette = cassette
@@ -1534,6 +3829,7 @@ class GameButton(QPushButton):
         super().__init__(parent)
         self.slot_number = slot_number
         self.cassette = None
+        self.snapshot = None  # 前回終了時の見た目 (名前, 色, アイコンのパス, アイコン, (ID, フォルダ名))。カセットの読み込みが終わるまで表示する
         self.setMinimumSize(150, 150)
         self.setMaximumSize(150, 150)
         self.setAcceptDrops(True)
@@ -1543,44 +3839,60 @@ class GameButton(QPushButton):
     def set_cassette(self, cassette):
         """カセットを設定"""
         self.cassette = cassette
+        self.snapshot = None
         self.update_display()
     
     def clear_cassette(self):
         """カセットをクリア"""
         self.cassette = None
+        self.snapshot = None
+        self.update_display()
+    
+    def set_slot(self, slot_number, cassette):
+        """別のスロットの表示に切り替える（バンク切り替え時にボタンを使い回す）"""
+        self.slot_number = slot_number
+        self.cassette = cassette
+        self.snapshot = None
+        self.update_display()
+    
+    def set_snapshot(self, slot_number, name, color, icon_key, icon, cassette_key):
+        """前回終了時の見た目だけを表示する（カセットはまだ割り当てない）"""
+        self.slot_number = slot_number
+        self.cassette = None
+        self.snapshot = (name, color, icon_key, icon, cassette_key)
+        self.update_display()
+    
+    def take_over_snapshot(self, cassette):
+        """仮表示のボタンにカセットを割り当てる（見た目が変わらなければ描き直さない）
+        
+        Returns:
+            bool: 描き直したか
+        """
+        icon_path = cassette.icon_path if cassette and cassette.icon_path and cassette.icon_path.exists() else None
+        look = (cassette.name, cassette.icon_color, str(icon_path) if icon_path else None) if cassette else None
+        unchanged = self.snapshot is not None and self.snapshot[:3] == look
+        self.cassette = cassette
+        self.snapshot = None
+        if unchanged:
+            return False
         self.update_display()
+        return True
     
     def update_display(self):
         """表示を更新"""
         if self.cassette:
-            self.setText(self.cassette.name)
             if self.cassette.icon_path and self.cassette.icon_path.exists():
-                self.setIcon(QIcon(str(self.cassette.icon_path)))
-                self.setIconSize(QSize(64, 64))
+                icon = QIcon(str(self.cassette.icon_path))
             else:
-                self.setIcon(QIcon())
-            
-            self.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {self.cassette.icon_color};
-                    color: white;
-                    border: 3px solid {QColor(self.cassette.icon_color).darker(120).name()};
-                    border-radius: 10px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    padding: 5px;
-                }}
-                QPushButton:hover {{
-                    background-color: {QColor(self.cassette.icon_color).lighter(110).name()};
-                }}
-                QPushButton:pressed {{
-                    background-color: {QColor(self.cassette.icon_color).darker(120).name()};
-                }}
-            """)
+                icon = QIcon()
+            self.show_assigned(self.cassette.name, self.cassette.icon_color, icon)
+        elif self.snapshot:
+            name, color, _icon_key, icon, _cassette_key = self.snapshot
+            self.show_assigned(name, color, icon)
         else:
             self.setText(f"スロット {self.slot_number}")
             self.setIcon(QIcon())
-            self.setStyleSheet("""
+            self.set_style("""
                 QPushButton {
                     background-color: #f5f5f5;
                     color: #757575;
@@ -1596,6 +3908,36 @@ class GameButton(QPushButton):
                 }
             """)
     
+    def show_assigned(self, name, color, icon):
+        """割り当て済みのスロットとして表示"""
+        self.setText(name)
+        self.setIcon(icon)
+        if not icon.isNull():
+            self.setIconSize(QSize(64, 64))
+        
+        self.set_style(f"""
+            QPushButton {{
+                background-color: {color};
+                color: white;
+                border: 3px solid {QColor(color).darker(120).name()};
+                border-radius: 10px;
+                font-size: 12px;
+                font-weight: bold;
+                padding: 5px;
+            }}
+            QPushButton:hover {{
+                background-color: {QColor(color).lighter(110).name()};
+            }}
+            QPushButton:pressed {{
+                background-color: {QColor(color).darker(120).name()};
+            }}
+        """)
+    
+    def set_style(self, style):
+        """スタイルシートが変わるときだけ設定する（再ポリッシュの負荷を避ける）"""
+        if self.styleSheet() != style:
+            self.setStyleSheet(style)
+    
     def mousePressEvent(self, event):
         """マウス押下イベント"""
         if event.button() == Qt.LeftButton:
@@ -1664,6 +4006,204 @@ class GameButton(QPushButton):
         self.update_display()
         event.acceptProposedAction()
 
+class BankSwitchButton(QPushButton):
+    """バンク送りボタン（ドラッグ中に重ねると隣のバンクへ切り替わる）"""
+    def __init__(self, text, step, parent=None):
+        super().__init__(text, parent)
+        self.step = step
+        self.setAcceptDrops(True)
+    
+    def dragEnterEvent(self, event):
+        """ドラッグエンター（別バンクのスロットへドロップできるように切り替える）"""
+        main_window = self.window()
+        if event.mimeData().hasText() and hasattr(main_window, 'show_bank'):
+            main_window.show_bank(main_window.current_bank + self.step)
+        event.ignore()
+
+class ExecutionLogModel(QAbstractTableModel):
+    """実行ログのテーブルモデル（表示分だけを段階的に読み込む）"""
+    HEADERS = ["カセット名", "実行日時", "フォルダ"]
+    PAGE_SIZE = 200
+    
+    def __init__(self, execution_log, parent=None):
+        super().__init__(parent)
+        self.execution_log = execution_log
+        self.filter_text = ""
+        self.sort_column = 1
+        self.descending = True
+        self.rows = range(0)
+        self.loaded_count = 0
+        self.reload()
+    
+    def reload(self):
+        """現在の絞り込み・並べ替え条件で行を取り直す"""
+        self.beginResetModel()
+        self.rows = self.execution_log.query(self.filter_text, self.sort_column, self.descending)
+        self.loaded_count = min(self.PAGE_SIZE, len(self.rows))
+        self.endResetModel()
+    
+    def set_filter_text(self, text):
+        """絞り込み文字列を設定"""
+        if text != self.filter_text:
+            self.filter_text = text
+            self.reload()
+    
+    def total_count(self):
+        """条件に一致する件数"""
+        return len(self.rows)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.loaded_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        log = self.execution_log.get_entry(self.rows[index.row()])
+        column = index.column()
+        if column == 0:
+            return log['cassette_name']
+        if column == 1:
+            # ISO形式の先頭19文字が "YYYY-MM-DDTHH:MM:SS" なので解析せずに整形する
+            return log['timestamp'][:19].replace('T', ' ')
+        return log['cassette_folder']
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.loaded_count < len(self.rows)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, len(self.rows) - self.loaded_count)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded_count, self.loaded_count + count - 1)
+        self.loaded_count += count
+        self.endInsertRows()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """並べ替え（ログ側で行順を決め、モデルは先頭ページから読み直す）"""
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        self.reload()
+
+class LogExportDialog(QDialog):
+    """実行ログのエクスポート条件ダイアログ"""
+    def __init__(self, execution_log, parent=None):
+        super().__init__(parent)
+        self.execution_log = execution_log
+        self.setWindowTitle("実行ログのエクスポート")
+        self.setMinimumWidth(420)
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """UIのセットアップ"""
+        layout = QVBoxLayout()
+        
+        # 形式
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("形式:"))
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("CSV", 'csv')
+        self.format_combo.addItem("NDJSON（1行1件のJSON）", 'ndjson')
+        format_layout.addWidget(self.format_combo)
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+        
+        # 期間
+        today = QDate.currentDate()
+        start_layout = QHBoxLayout()
+        self.start_check = QCheckBox("開始日:")
+        self.start_edit = QDateEdit(today.addMonths(-1))
+        self.start_edit.setCalendarPopup(True)
+        self.start_edit.setDisplayFormat("yyyy-MM-dd")
+        self.start_edit.setEnabled(False)
+        self.start_check.toggled.connect(self.start_edit.setEnabled)
+        start_layout.addWidget(self.start_check)
+        start_layout.addWidget(self.start_edit)
+        start_layout.addStretch()
+        layout.addLayout(start_layout)
+        
+        end_layout = QHBoxLayout()
+        self.end_check = QCheckBox("終了日:")
+        self.end_edit = QDateEdit(today)
+        self.end_edit.setCalendarPopup(True)
+        self.end_edit.setDisplayFormat("yyyy-MM-dd")
+        self.end_edit.setEnabled(False)
+        self.end_check.toggled.connect(self.end_edit.setEnabled)
+        end_layout.addWidget(self.end_check)
+        end_layout.addWidget(self.end_edit)
+        end_layout.addStretch()
+        layout.addLayout(end_layout)
+        
+        # カセット
+        cassette_layout = QHBoxLayout()
+        cassette_layout.addWidget(QLabel("カセット:"))
+        self.cassette_combo = QComboBox()
+        self.cassette_combo.addItem("すべて", None)
+        for folder in sorted({folder for _name, folder in self.execution_log.cassettes}):
+            self.cassette_combo.addItem(folder, folder)
+        cassette_layout.addWidget(self.cassette_combo)
+        cassette_layout.addStretch()
+        layout.addLayout(cassette_layout)
+        
+        # ボタン
+        button_layout = QHBoxLayout()
+        export_btn = QPushButton("📤 エクスポート")
+        export_btn.clicked.connect(self.export)
+        cancel_btn = QPushButton("キャンセル")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(export_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        self.setStyleSheet("QDialog { background-color: #fafafa; border: 1px solid #bdbdbd; } QLabel { color: #212121; }")
+    
+    def export(self):
+        """保存先を選んで書き出し"""
+        fmt = self.format_combo.currentData()
+        default_name = f"execution_log_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+        file_filter = "CSV (*.csv)" if fmt == 'csv' else "NDJSON (*.ndjson *.jsonl)"
+        file_path, _ = QFileDialog.getSaveFileName(self, "エクスポート先を選択", default_name, file_filter)
+        if not file_path:
+            return
+        
+        start = None
+        if self.start_check.isChecked():
+            start = datetime.combine(self.start_edit.date().toPython(), datetime.min.time())
+        end = None
+        if self.end_check.isChecked():
+            # 終了日はその日の終わりまで含める
+            end = datetime.combine(self.end_edit.date().toPython(), datetime.min.time()) + timedelta(days=1)
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                count = self.execution_log.export(f, fmt, start, end, self.cassette_combo.currentData())
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            CustomMessageBox.critical(self, "エラー", f"エクスポートに失敗しました:\n{str(e)}")
+            return
+        QApplication.restoreOverrideCursor()
+        
+        CustomMessageBox.information(self, "完了", f"{count:,}件をエクスポートしました:\n{file_path}")
+        self.accept()
+
 class ExecutionLogDialog(QDialog):
     """実行ログダイアログ"""
     def __init__(self, execution_log, parent=None):
@@ -1683,22 +4223,35 @@ class ExecutionLogDialog(QDialog):
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
         
-        # テーブル
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["カセット名", "実行日時", "フォルダ"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 絞り込み
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("🔍 絞り込み:"))
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("カセット名・フォルダ・日付（例: 2025-10）")
+        self.filter_input.textChanged.connect(lambda: self.filter_timer.start())
+        filter_layout.addWidget(self.filter_input)
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: #616161;")
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
         
-        logs = self.execution_log.get_recent_logs()
-        self.table.setRowCount(len(logs))
+        # 入力のたびに全件を絞り込まないよう少し待ってから適用
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+        self.filter_timer.timeout.connect(self.apply_filter)
         
-        for row, log in enumerate(logs):
-            self.table.setItem(row, 0, QTableWidgetItem(log['cassette_name']))
-            
-            timestamp = datetime.fromisoformat(log['timestamp'])
-            self.table.setItem(row, 1, QTableWidgetItem(timestamp.strftime("%Y-%m-%d %H:%M:%S")))
-            
-            self.table.setItem(row, 2, QTableWidgetItem(log['cassette_folder']))
+        # テーブル
+        self.model = ExecutionLogModel(self.execution_log, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setDefaultSectionSize(24)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.model.modelReset.connect(self.update_count_label)
+        self.update_count_label()
         
         layout.addWidget(self.table)
         
@@ -1716,6 +4269,17 @@ class ExecutionLogDialog(QDialog):
             }
         """)
         
+        export_btn = QPushButton("📤 エクスポート")
+        export_btn.clicked.connect(self.export_logs)
+        export_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3498db;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+            }
+        """)
+        
         close_btn = QPushButton("閉じる")
         close_btn.clicked.connect(self.accept)
         close_btn.setStyleSheet("""
@@ -1728,6 +4292,7 @@ class ExecutionLogDialog(QDialog):
         """)
         
         button_layout.addWidget(clear_btn)
+        button_layout.addWidget(export_btn)
         button_layout.addStretch()
         button_layout.addWidget(close_btn)
         
@@ -1745,18 +4310,283 @@ class ExecutionLogDialog(QDialog):
         )
         
         if reply:
-            self.execution_log.logs = []
-            self.execution_log.save_logs()
-            self.table.setRowCount(0)
+            self.execution_log.clear()
+            self.model.reload()
             CustomMessageBox.information(self, "完了", "ログをクリアしました。")
+    
+    def export_logs(self):
+        """ログをエクスポート"""
+        dialog = LogExportDialog(self.execution_log, self)
+        dialog.exec_()
+    
+    def apply_filter(self):
+        """絞り込みを適用"""
+        self.model.set_filter_text(self.filter_input.text())
+    
+    def update_count_label(self):
+        """件数表示を更新"""
+        self.count_label.setText(f"{self.model.total_count():,} / {self.execution_log.count():,}件")
+
+class UsageStatsDialog(QDialog):
+    """利用統計ダイアログ（集計済みデータのみを表示）"""
+    def __init__(self, execution_log, parent=None):
+        super().__init__(parent)
+        self.execution_log = execution_log
+        self.setWindowTitle("利用統計")
+        self.setMinimumSize(900, 560)
+        self.setup_ui()
+        self.refresh()
+    
+    def setup_ui(self):
+        """UIのセットアップ"""
+        layout = QVBoxLayout()
+        
+        # タイトル
+        title = QLabel("📈 利用統計")
+        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #212121;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+        
+        # カセット絞り込み
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("カセット:"))
+        self.cassette_combo = QComboBox()
+        self.cassette_combo.currentIndexChanged.connect(self.update_time_views)
+        filter_layout.addWidget(self.cassette_combo)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
+        self.tabs = QTabWidget()
+        
+        # カセット別ランキング
+        self.ranking_table = QTableWidget()
+        self.ranking_table.setColumnCount(3)
+        self.ranking_table.setHorizontalHeaderLabels(["カセット名", "フォルダ", "実行回数"])
+        self.ranking_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.ranking_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabs.addTab(self.ranking_table, "カセット別")
+        
+        # 曜日×時間帯ヒートマップ
+        heatmap_widget = QWidget()
+        heatmap_layout = QVBoxLayout()
+        self.heatmap_table = QTableWidget(7, 24)
+        self.heatmap_table.setVerticalHeaderLabels(WEEKDAY_NAMES)
+        self.heatmap_table.setHorizontalHeaderLabels([str(hour) for hour in range(24)])
+        self.heatmap_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.heatmap_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        heatmap_layout.addWidget(self.heatmap_table)
+        self.busiest_label = QLabel()
+        self.busiest_label.setStyleSheet("color: #616161; padding: 5px;")
+        heatmap_layout.addWidget(self.busiest_label)
+        heatmap_widget.setLayout(heatmap_layout)
+        self.tabs.addTab(heatmap_widget, "時間帯ヒートマップ")
+        
+        # 日別推移
+        self.daily_table = QTableWidget()
+        self.daily_table.setColumnCount(2)
+        self.daily_table.setHorizontalHeaderLabels(["日付", "実行回数"])
+        self.daily_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.daily_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabs.addTab(self.daily_table, "日別（直近30日）")
+        
+        layout.addWidget(self.tabs)
+        
+        # ボタン
+        button_layout = QHBoxLayout()
+        
+        rebuild_btn = QPushButton("🔄 再集計")
+        rebuild_btn.clicked.connect(self.rebuild)
+        rebuild_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #f39c12;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+            }
+        """)
+        
+        close_btn = QPushButton("閉じる")
+        close_btn.clicked.connect(self.accept)
+        close_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+            }
+        """)
+        
+        button_layout.addWidget(rebuild_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        self.setStyleSheet("QDialog { background-color: #fafafa; border: 1px solid #bdbdbd; } QLabel { color: #212121; }")
+    
+    def refresh(self):
+        """集計内容を画面に反映"""
+        rollup = self.execution_log.rollup
+        ranking = rollup.get_ranking()
+        
+        self.ranking_table.setRowCount(len(ranking))
+        for row, (folder, name, count) in enumerate(ranking):
+            self.ranking_table.setItem(row, 0, QTableWidgetItem(name))
+            self.ranking_table.setItem(row, 1, QTableWidgetItem(folder))
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.DisplayRole, count)
+            self.ranking_table.setItem(row, 2, count_item)
+        
+        self.cassette_combo.blockSignals(True)
+        self.cassette_combo.clear()
+        self.cassette_combo.addItem("すべて", None)
+        for folder, name, _count in ranking:
+            self.cassette_combo.addItem(name, folder)
+        self.cassette_combo.blockSignals(False)
+        
+        self.update_time_views()
+    
+    def update_time_views(self):
+        """ヒートマップと日別推移を更新"""
+        rollup = self.execution_log.rollup
+        cassette_folder = self.cassette_combo.currentData()
+        
+        heatmap = rollup.get_heatmap(cassette_folder)
+        peak = max((max(row) for row in heatmap), default=0)
+        for day, row in enumerate(heatmap):
+            for hour, count in enumerate(row):
+                item = QTableWidgetItem(str(count) if count else "")
+                item.setTextAlignment(Qt.AlignCenter)
+                if count and peak:
+                    # 件数に応じて青の濃さを変える
+                    alpha = 40 + int(215 * count / peak)
+                    item.setBackground(QColor(52, 152, 219, alpha))
+                self.heatmap_table.setItem(day, hour, item)
+        
+        busiest = rollup.get_busiest_slots(5, cassette_folder)
+        if busiest:
+            slots = "、".join(f"{WEEKDAY_NAMES[day]}曜 {hour}時台（{count}回）" for day, hour, count in busiest)
+            self.busiest_label.setText(f"🔥 混雑する時間帯: {slots}")
+        else:
+            self.busiest_label.setText("実行履歴がありません")
+        
+        daily = rollup.get_daily_counts(30, cassette_folder)
+        self.daily_table.setRowCount(len(daily))
+        for row, (day, count) in enumerate(reversed(daily)):
+            self.daily_table.setItem(row, 0, QTableWidgetItem(day))
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.DisplayRole, count)
+            self.daily_table.setItem(row, 1, count_item)
+    
+    def rebuild(self):
+        """生ログから再集計"""
+        self.execution_log.rebuild_rollup()
+        self.refresh()
+        CustomMessageBox.information(self, "完了", "実行ログから集計を作り直しました。")
+
+class DependencyAuditDialog(QDialog):
+    """カセットライブラリの依存関係監査ダイアログ"""
+    def __init__(self, cassettes_dir, parent=None):
+        super().__init__(parent)
+        self.cassettes_dir = cassettes_dir
+        self.task = None
+        self.setWindowTitle("依存ライブラリ監査")
+        self.setMinimumSize(700, 500)
+        self.setup_ui()
+        self.start_audit()
+    
+    def setup_ui(self):
+        """UIのセットアップ"""
+        layout = QVBoxLayout()
+        
+        # タイトル
+        title = QLabel("🩺 依存ライブラリ監査")
+        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #212121;")
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+        
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+        
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        layout.addWidget(self.report_text)
+        
+        # ボタン
+        button_layout = QHBoxLayout()
+        
+        self.rerun_btn = QPushButton("🔄 再実行")
+        self.rerun_btn.clicked.connect(self.start_audit)
+        self.rerun_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #f39c12;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+            }
+        """)
+        
+        close_btn = QPushButton("閉じる")
+        close_btn.clicked.connect(self.accept)
+        close_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 5px;
+            }
+        """)
+        
+        button_layout.addWidget(self.rerun_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        self.setStyleSheet("QDialog { background-color: #fafafa; border: 1px solid #bdbdbd; } QLabel { color: #212121; }")
+    
+    def start_audit(self):
+        """監査を開始"""
+        self.rerun_btn.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.report_text.setPlainText("🔍 カセットを解析中...")
+        
+        self.task = DependencyAuditTask(self.cassettes_dir)
+        self.task.setAutoDelete(False)
+        self.task.signals.progress.connect(self.on_progress)
+        self.task.signals.finished.connect(self.on_finished)
+        QThreadPool.globalInstance().start(self.task)
+    
+    def on_progress(self, done, total):
+        """進捗表示を更新"""
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+    
+    def on_finished(self, report):
+        """監査完了時"""
+        self.task = None
+        self.rerun_btn.setEnabled(True)
+        if report is None:
+            self.report_text.setPlainText("監査を完了できませんでした。")
+            return
+        self.progress_bar.setRange(0, max(report['total'], 1))
+        self.progress_bar.setValue(report['total'])
+        self.report_text.setPlainText(DependencyAudit.format_report(report))
+    
+    def done(self, result):
+        """閉じるときは実行中の監査を中断"""
+        if self.task:
+            self.task.cancel()
+        super().done(result)
 
 class HelpDialog(QDialog):
     """ヘルプダイアログ"""
-    def __init__(self, buttons, parent=None):
+    def __init__(self, slot_assignments, bank_size, parent=None):
         super().__init__(parent)
         self.setWindowTitle("ヘルプ - ボタンの説明")
         self.setMinimumSize(700, 500)
-        self.buttons = buttons
+        self.slot_assignments = slot_assignments
+        self.bank_size = bank_size
         self.setup_ui()
     
     def setup_ui(self):
@@ -1819,27 +4649,27 @@ class HelpDialog(QDialog):
             <h3>📋 各ボタンの説明:</h3>
         """
         
-        for i, button in enumerate(self.buttons, 1):
-            if button.cassette:
-                fav = "<span class='favorite'>⭐</span> " if button.cassette.is_favorite else ""
-                content += f"<h4>スロット {i}: {fav}{button.cassette.name}</h4>"
-                
-                description = button.cassette.description if button.cassette.description else "<span class='empty-slot'>説明なし</span>"
-                content += f"<p>{description}</p>"
-                
-                if button.cassette.tags:
-                    tags_html = ", ".join([f"<span style='background-color: #e3f2fd; color: #1976d2; padding: 2px 8px; border-radius: 3px;'>#{tag}</span>" for tag in button.cassette.tags])
-                    content += f"<p>🏷️ タグ: {tags_html}</p>"
-                
-                if button.cassette.script_path:
-                    relative_path = button.cassette.script_path.relative_to(button.cassette.folder_path)
-                    content += f"<p><i>📄 スクリプト: {relative_path}</i></p>"
-                
-                content += "<hr>"
-            else:
-                content += f"<h4>スロット {i}: <span class='empty-slot'>空き</span></h4>"
-                content += "<p class='empty-slot'>カセットが割り当てられていません</p>"
-                content += "<hr>"
+        # 割り当て済みのスロットだけを並べる（バンクが多いと空きスロットは膨大になるため）
+        for slot, cassette in sorted(self.slot_assignments.items()):
+            bank = (slot - 1) // self.bank_size + 1
+            fav = "<span class='favorite'>⭐</span> " if cassette.is_favorite else ""
+            content += f"<h4>スロット {slot}（バンク {bank}）: {fav}{cassette.name}</h4>"
+            
+            description = cassette.description if cassette.description else "<span class='empty-slot'>説明なし</span>"
+            content += f"<p>{description}</p>"
+            
+            if cassette.tags:
+                tags_html = ", ".join([f"<span style='background-color: #e3f2fd; color: #1976d2; padding: 2px 8px; border-radius: 3px;'>#{tag}</span>" for tag in cassette.tags])
+                content += f"<p>🏷️ タグ: {tags_html}</p>"
+            
+            if cassette.script_path:
+                relative_path = cassette.script_path.relative_to(cassette.source_folder or cassette.folder_path)
+                content += f"<p><i>📄 スクリプト: {relative_path}</i></p>"
+            
+            content += "<hr>"
+        
+        if not self.slot_assignments:
+            content += "<p class='empty-slot'>カセットが割り当てられたスロットはありません</p>"
         
         content += """
         </body>
@@ -1955,8 +4785,612 @@ class SaveLoadDialog(QDialog):
         """選択されたファイルを取得"""
         return self.selected_file
 
+class ProfileStore(QObject):
+    """セーブデータ（プロファイル）を一度だけ読み込んでスロットマップとして保持する
+    
+    saves/ フォルダを監視し、追加・変更・削除されたファイルだけを読み直す。
+    スロットマップは スロット番号 -> (カセットID, フォルダ名)。
+    """
+    profiles_changed = Signal()
+    LAST_SAVE = "last_save"
+    REFRESH_DELAY = 200  # ミリ秒（保存中の連続した変更通知をまとめる）
+    
+    def __init__(self, saves_dir, parent=None):
+        super().__init__(parent)
+        self.saves_dir = Path(saves_dir)
+        self.cache = {}  # ファイルパス -> (更新時刻, スロットマップ)
+        
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_refresh)
+        self.watcher.fileChanged.connect(self.schedule_refresh)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+    
+    @staticmethod
+    def parse(config):
+        """セーブデータ（スロットのリスト）をスロットマップに変換（空きスロットは含めない）"""
+        slot_map = {}
+        for item in config:
+            slot = item.get('slot')
+            cassette_folder = item.get('cassette_folder')
+            cassette_id = item.get('cassette_id')
+            if isinstance(slot, int) and slot > 0 and (cassette_folder or cassette_id):
+                slot_map[slot] = (cassette_id, cassette_folder)
+        return slot_map
+    
+    def read(self, save_file):
+        """セーブファイルのスロットマップを取得（前回から更新されていなければ読み直さない）"""
+        key = str(save_file)
+        mtime = Path(save_file).stat().st_mtime_ns
+        cached = self.cache.get(key)
+        if cached is None or cached[0] != mtime:
+            with open(save_file, 'r', encoding='utf-8') as f:
+                cached = (mtime, self.parse(json.load(f)))
+            self.cache[key] = cached
+        return cached[1]
+    
+    def schedule_refresh(self, _path=None):
+        """変更通知を受けたら少し待ってから読み直す"""
+        self.refresh_timer.start()
+    
+    def refresh(self):
+        """saves/ を見直し、変わったファイルだけを読み込む"""
+        before = {key: cached[0] for key, cached in self.cache.items()}
+        paths = {str(path): path for path in self.saves_dir.glob("*.json")}
+        
+        for key in list(self.cache):
+            if key not in paths:
+                del self.cache[key]
+        for key, path in paths.items():
+            try:
+                self.read(path)
+            except Exception as e:
+                print(f"セーブデータ読み込みエラー: {path.name}: {e}")
+                self.cache.pop(key, None)
+        
+        # 監視対象を更新（上書き保存で置き換わったファイルも監視し直す）
+        if self.saves_dir.exists() and str(self.saves_dir) not in self.watcher.directories():
+            self.watcher.addPath(str(self.saves_dir))
+        watched = set(self.watcher.files())
+        missing = [key for key in self.cache if key not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+        
+        if before != {key: cached[0] for key, cached in self.cache.items()}:
+            self.profiles_changed.emit()
+    
+    def names(self):
+        """切り替え候補のプロファイル名（前回終了時の自動保存は除く）"""
+        return sorted((Path(key).stem for key in self.cache if Path(key).stem != self.LAST_SAVE),
+                      key=str.lower)
+    
+    def slot_map(self, name):
+        """プロファイル名からスロットマップを取得（ないときはNone）"""
+        cached = self.cache.get(str(self.saves_dir / f"{name}.json"))
+        return cached[1] if cached else None
+
+class CommandPalette(QDialog):
+    """コマンドパレット（Ctrl+K）：キーボードだけでカセットを探して起動する
+    
+    閉じても破棄せず、開くたびに検索インデックスを同期して使い回す。
+    """
+    cassette_launched = Signal(object)
+    RESULT_LIMIT = 50
+    
+    def __init__(self, search_index, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self.cassettes = []
+        self.boost = {}
+        self.results = []
+        self.setWindowTitle("コマンドパレット")
+        self.setMinimumSize(600, 420)
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """UIのセットアップ"""
+        layout = QVBoxLayout()
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("カセット名・タグ・説明で検索（↑↓で選択、Enterで起動、Escで閉じる）")
+        self.search_input.setStyleSheet("font-size: 16px; padding: 8px;")
+        self.search_input.textChanged.connect(self.refresh)
+        self.search_input.returnPressed.connect(self.launch_current)
+        layout.addWidget(self.search_input)
+        
+        self.result_list = QListWidget()
+        self.result_list.setStyleSheet("""
+            QListWidget {
+                font-size: 13px;
+            }
+            QListWidget::item {
+                padding: 6px;
+            }
+            QListWidget::item:selected {
+                background-color: #3498db;
+                color: white;
+            }
+        """)
+        self.result_list.itemActivated.connect(self.launch_current)
+        layout.addWidget(self.result_list)
+        
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: #757575; font-size: 11px;")
+        layout.addWidget(self.count_label)
+        
+        self.setLayout(layout)
+        self.setStyleSheet("QDialog { background-color: #fafafa; }")
+    
+    def open_palette(self, cassettes, boost=None):
+        """パレットを開く（カセット一覧の変更はここで索引に反映）"""
+        self.cassettes = cassettes
+        self.boost = boost or {}
+        self.search_index.sync(cassettes)
+        
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.refresh()
+        
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.search_input.setFocus()
+    
+    def refresh(self):
+        """検索結果を更新（空欄のときはよく使う順の先頭を出す）"""
+        query = self.search_input.text()
+        if query.strip():
+            self.results = self.search_index.search(query, self.RESULT_LIMIT, self.boost)
+        else:
+            self.results = self.cassettes[:self.RESULT_LIMIT]
+        
+        self.result_list.clear()
+        for cassette in self.results:
+            text = f"{'⭐ ' if cassette.is_favorite else ''}{cassette.name}"
+            if cassette.tags:
+                text += "   " + " ".join(f"#{tag}" for tag in cassette.tags[:3])
+            if cassette.description:
+                description = cassette.description.splitlines()[0]
+                text += f"\n    {description[:60]}{'…' if len(description) > 60 else ''}"
+            self.result_list.addItem(text)
+        if self.results:
+            self.result_list.setCurrentRow(0)
+        
+        if query.strip():
+            self.count_label.setText(f"{len(self.results)}件" + ("（上位のみ表示）" if len(self.results) >= self.RESULT_LIMIT else ""))
+        else:
+            self.count_label.setText(f"全 {len(self.cassettes)} カセット")
+    
+    def keyPressEvent(self, event):
+        """↑↓キーで検索欄から結果を選ぶ"""
+        if event.key() in (Qt.Key_Up, Qt.Key_Down) and self.results:
+            step = -1 if event.key() == Qt.Key_Up else 1
+            row = (self.result_list.currentRow() + step) % len(self.results)
+            self.result_list.setCurrentRow(row)
+            return
+        super().keyPressEvent(event)
+    
+    def launch_current(self, _item=None):
+        """選択中のカセットを起動"""
+        row = self.result_list.currentRow()
+        if 0 <= row < len(self.results):
+            cassette = self.results[row]
+            self.hide()
+            self.cassette_launched.emit(cassette)
+
+class ManagedProcess:
+    """起動したプロセス1つ分の記録（出力を記録する場合はログファイルのパスも持つ）"""
+    def __init__(self, process, cassette, log_file=None):
+        self.process = process
+        self.pid = process.pid
+        self.name = cassette.name
+        self.folder = cassette.folder_path.name
+        self.started = datetime.now()
+        self.ended = None
+        self.returncode = None
+        self.log_file = log_file
+    
+    @property
+    def running(self):
+        """実行中か（終了していたら終了コードと時刻を記録する）"""
+        if self.ended is None and self.process.poll() is not None:
+            self.returncode = self.process.returncode
+            self.ended = datetime.now()
+        return self.ended is None
+    
+    def tail(self, lines):
+        """出力の末尾 lines 行（出力を記録していなければ空）"""
+        if lines <= 0 or not self.log_file:
+            return []
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                data = b""
+                # 末尾からブロック単位で読み、必要な行数がそろったら止める
+                while position > 0 and data.count(b"\n") <= lines:
+                    step = min(8192, position)
+                    position -= step
+                    f.seek(position)
+                    data = f.read(step) + data
+        except OSError as e:
+            print(f"プロセス出力の読み込みエラー: {e}")
+            return []
+        return [line.decode('utf-8', errors='replace').rstrip('\r') for line in data.splitlines()[-lines:]]
+    
+    def to_dict(self):
+        """JSONにできる形にする"""
+        running = self.running
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'folder': self.folder,
+            'started': self.started.isoformat(timespec='seconds'),
+            'ended': self.ended.isoformat(timespec='seconds') if self.ended else None,
+            'running': running,
+            'returncode': self.returncode,
+            'log_file': str(self.log_file) if self.log_file else None,
+        }
+
+class ProcessRegistry:
+    """起動したプロセスの一覧
+    
+    標準入出力は従来どおり起動元から引き継ぐ（ランチャーを閉じてもスクリプトは動き続ける）。
+    capture_output を指定したときだけ、標準出力・標準エラーをプロセスごとのログファイルに
+    書き出し、process.output はそのファイルの末尾を読む。終了したプロセスは新しいものから
+    KEEP_FINISHED 件まで残し、それより古い記録はログファイルごと削除する。
+    """
+    MAX_TAIL_LINES = 1000
+    KEEP_FINISHED = 50
+    
+    def __init__(self, log_dir):
+        self.log_dir = Path(log_dir)
+        self.processes = {}  # pid -> ManagedProcess
+        self.lock = threading.Lock()
+    
+    def start(self, spec, capture_output=False):
+        """起動情報（MainWindow.build_launch_spec）からプロセスを起動して登録"""
+        args, shell, cwd, _script, cassette = spec
+        if not capture_output:
+            process = subprocess.Popen(args, shell=shell, cwd=cwd)
+            record = ManagedProcess(process, cassette)
+        else:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            log_file = self.log_dir / f"{cassette.folder_path.name}-{datetime.now():%Y%m%d-%H%M%S-%f}.log"
+            # ファイルはプロセスに渡したら閉じる（ランチャーが終了しても書き込み先は残る）
+            with open(log_file, 'wb') as output:
+                process = subprocess.Popen(args, shell=shell, cwd=cwd, stdout=output, stderr=subprocess.STDOUT,
+                                           env=dict(os.environ, PYTHONUNBUFFERED='1'))
+            record = ManagedProcess(process, cassette, log_file)
+        with self.lock:
+            self.processes[record.pid] = record
+            self.prune()
+        return record
+    
+    def prune(self):
+        """古い終了済みプロセスの記録を捨てる（lock を持った状態で呼ぶ）"""
+        finished = [record for record in self.processes.values() if not record.running]
+        if len(finished) > self.KEEP_FINISHED:
+            finished.sort(key=lambda record: record.ended)
+            for record in finished[:-self.KEEP_FINISHED]:
+                del self.processes[record.pid]
+                if record.log_file:
+                    try:
+                        record.log_file.unlink()
+                    except OSError as e:
+                        print(f"プロセス出力ログの削除エラー: {e}")
+    
+    def get(self, pid):
+        """pid の記録（なければNone）"""
+        with self.lock:
+            return self.processes.get(pid)
+    
+    def list(self, include_finished=True):
+        """プロセスの一覧（起動が新しい順）"""
+        with self.lock:
+            records = list(self.processes.values())
+        if not include_finished:
+            records = [record for record in records if record.running]
+        records.sort(key=lambda record: record.started, reverse=True)
+        return records
+
+def instance_server_name(base_dir):
+    """起動中のインスタンスを見つけるためのソケット名（インストール先・ユーザーごとに別）"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = ""
+    key = f"{Path(base_dir).resolve()}|{user}"
+    return f"scriptbutton-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+class RpcError(Exception):
+    """リモート要求のエラー（JSON-RPC のエラーコード付き）"""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def send_instance_request(server_name, method, params=None, timeout=1000):
+    """起動中のインスタンスに要求を送り、応答を返す（起動していなければNone）"""
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(timeout):
+        return None
+    
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or {}}
+    socket.write((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+    socket.flush()
+    data = b""
+    while not data.endswith(b"\n") and socket.waitForReadyRead(timeout):
+        data += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    try:
+        return json.loads(data) if data.strip() else {}
+    except ValueError:
+        return {}
+
+def forward_instance_requests(server_name, requests):
+    """起動中のインスタンスに要求を順に渡す
+    
+    Returns:
+        int | None: 終了コード（1件でもエラーなら1）。起動中のインスタンスがなければNone
+    """
+    response = send_instance_request(server_name, *requests[0])
+    if response is None:
+        return None
+    failed = False
+    for index, (method, params) in enumerate(requests):
+        if index:
+            response = send_instance_request(server_name, method, params) or {}
+        if 'error' in response:
+            print(f"エラー: {response['error'].get('message')}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+def dispatch_rpc(handler, payload):
+    """JSON-RPC 2.0 の要求1件を handler(method, params) で処理し、応答（JSONのバイト列）を返す"""
+    request_id = None
+    try:
+        request = json.loads(payload)
+        if not isinstance(request, dict):
+            raise RpcError(-32600, "要求の形式が正しくありません")
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        if not isinstance(method, str) or not isinstance(params, dict):
+            raise RpcError(-32600, "要求の形式が正しくありません")
+        response = {'jsonrpc': '2.0', 'id': request_id, 'result': handler(method, params)}
+    except RpcError as e:
+        response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': str(e)}}
+    except ValueError as e:
+        response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32700, 'message': f"JSONを解析できません: {e}"}}
+    except Exception as e:
+        print(f"リモート要求の処理エラー: {e}")
+        response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32603, 'message': str(e)}}
+    return json.dumps(response, ensure_ascii=False).encode('utf-8')
+
+class InstanceServer(QObject):
+    """単一インスタンス用のローカルソケットサーバー
+    
+    1行に1件の JSON-RPC 2.0 要求を受け取り、handler(method, params) の戻り値を
+    1行の応答として返す。Qtのイベントループ上で動くので、複数の接続を同時に扱える。
+    handler はウィンドウを作る前に待ち受けを始められるよう、後から設定してもよい。
+    """
+    MAX_REQUEST_SIZE = 1024 * 1024  # 改行が来ないまま受信途中のデータがこれを超えたら切断する
+    def __init__(self, server_name, handler, parent=None):
+        super().__init__(parent)
+        self.server_name = server_name
+        self.handler = handler
+        self.buffers = {}  # 接続 -> 受信途中のデータ
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+    
+    def listen(self):
+        """待ち受けを開始（同じユーザーからだけ接続できるようにする）
+        
+        先に同じ名前のソケットに接続してみる。接続できれば別のインスタンスが動いているので
+        消さずに False を返す。接続できなければ前回異常終了したときのソケットが残っている
+        だけなので、消してから待ち受ける。UserAccessOption 付きの listen は既存のソケットを
+        置き換えてしまうため、ほぼ同時に起動したインスタンス同士で取り合わないよう、
+        確認から待ち受けまではロックファイルを持って行う。
+        """
+        lock = QLockFile(str(Path(QDir.tempPath()) / f"{self.server_name}.lock"))
+        if not lock.tryLock(5000):
+            return False
+        try:
+            socket = QLocalSocket()
+            socket.connectToServer(self.server_name)
+            if socket.waitForConnected(500):
+                socket.disconnectFromServer()
+                return False
+            QLocalServer.removeServer(self.server_name)
+            self.server.setSocketOptions(QLocalServer.UserAccessOption)
+            return self.server.listen(self.server_name)
+        finally:
+            lock.unlock()
+    
+    def close(self):
+        """待ち受けを終了"""
+        self.server.close()
+    
+    def on_new_connection(self):
+        """新しい接続を受け付ける"""
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self.on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self.on_disconnected(s))
+    
+    def on_ready_read(self, socket):
+        """受信したデータから1行ずつ要求を取り出して応答する"""
+        data = self.buffers.get(socket, b"") + bytes(socket.readAll())
+        *lines, rest = data.split(b"\n")
+        if len(rest) > self.MAX_REQUEST_SIZE:
+            self.buffers[socket] = b""
+            socket.abort()
+            return
+        self.buffers[socket] = rest
+        for line in lines:
+            if line.strip():
+                socket.write(dispatch_rpc(self.handler, line) + b"\n")
+    
+    def on_disconnected(self, socket):
+        """切断された接続を片付ける"""
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+class RpcHttpServer(QObject):
+    """JSON-RPC を localhost の HTTP でも受け付ける（POST の本文が要求1件、Keep-Alive対応）
+    
+    ブラウザで開いたページからの要求（クロスオリジンの POST や DNS リバインディング）で
+    カセットを起動されないよう、Content-Type が application/json で、Origin ヘッダーがなく、
+    Host が 127.0.0.1 / localhost の待ち受けポートである要求だけを受け付ける。
+    """
+    MAX_REQUEST_SIZE = 1024 * 1024
+    
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.buffers = {}  # 接続 -> 受信途中のデータ
+        self.server = QTcpServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+    
+    def listen(self, port):
+        """localhost のポートで待ち受けを開始"""
+        return self.server.listen(QHostAddress(QHostAddress.LocalHost), port)
+    
+    def on_new_connection(self):
+        """新しい接続を受け付ける"""
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self.on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self.on_disconnected(s))
+    
+    def on_ready_read(self, socket):
+        """受信したデータからHTTP要求を取り出して応答する"""
+        data = self.buffers.get(socket, b"") + bytes(socket.readAll())
+        while True:
+            header_end = data.find(b"\r\n\r\n")
+            if header_end < 0:
+                if len(data) > self.MAX_REQUEST_SIZE:
+                    socket.abort()
+                    return
+                break
+            lines = data[:header_end].decode('latin-1').split("\r\n")
+            request_line = lines[0].split()
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get('content-length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0 or length > self.MAX_REQUEST_SIZE or len(request_line) < 3:
+                socket.abort()
+                return
+            body_start = header_end + 4
+            if len(data) < body_start + length:
+                break
+            body, data = data[body_start:body_start + length], data[body_start + length:]
+            
+            rejected = self.check_request(request_line[0], headers)
+            if rejected:
+                status, message = rejected
+                payload = json.dumps(
+                    {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': message}}, ensure_ascii=False
+                ).encode('utf-8')
+            else:
+                status, payload = "200 OK", dispatch_rpc(self.handler, body)
+            connection = headers.get('connection', '').lower()
+            keep_alive = connection == 'keep-alive' or (request_line[2] == 'HTTP/1.1' and connection != 'close')
+            socket.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                .encode('latin-1') + payload)
+            if not keep_alive:
+                self.buffers[socket] = b""
+                socket.disconnectFromHost()
+                return
+        self.buffers[socket] = data
+    
+    def check_request(self, method, headers):
+        """受け付けない要求なら (ステータス, メッセージ)、受け付けるならNone"""
+        if method != 'POST':
+            return "405 Method Not Allowed", "POSTで送ってください"
+        port = self.server.serverPort()
+        if 'origin' in headers or headers.get('host', '').lower() not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+            return "403 Forbidden", "ブラウザや外部のホスト名からの要求は受け付けません"
+        if headers.get('content-type', '').split(';')[0].strip().lower() != 'application/json':
+            return "415 Unsupported Media Type", "Content-Type: application/json で送ってください"
+        return None
+    
+    def on_disconnected(self, socket):
+        """切断された接続を片付ける"""
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+class UiSnapshot:
+    """終了時のボタングリッドの見た目（名前・色・アイコンの縮小画像）
+    
+    起動時はまずこれを描いてウィンドウを出し、カセットの読み込みは
+    バックグラウンドで行う。行数・列数が変わったときは使わない。
+    """
+    VERSION = 2
+    ICON_SIZE = 64
+    
+    def __init__(self, snapshot_file):
+        self.snapshot_file = Path(snapshot_file)
+    
+    def load(self, rows, columns):
+        """スナップショットを読み込み（使えなければNone）"""
+        if not self.snapshot_file.exists():
+            return None
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"UIスナップショット読み込みエラー: {e}")
+            return None
+        if data.get('version') != self.VERSION or data.get('grid') != [rows, columns]:
+            return None
+        return data
+    
+    def save(self, data):
+        """スナップショットを保存"""
+        data = dict(data, version=self.VERSION)
+        try:
+            write_json_atomic(self.snapshot_file, data, ensure_ascii=False)
+        except Exception as e:
+            print(f"UIスナップショット保存エラー: {e}")
+    
+    @classmethod
+    def encode_icon(cls, icon_path):
+        """アイコンを縮小したPNGのBase64文字列"""
+        pixmap = QIcon(str(icon_path)).pixmap(cls.ICON_SIZE, cls.ICON_SIZE)
+        if pixmap.isNull():
+            return None
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        pixmap.save(buffer, "PNG")
+        return base64.b64encode(bytes(buffer.data())).decode('ascii')
+    
+    @staticmethod
+    def decode_icon(encoded):
+        """encode_icon の文字列からアイコンを作る"""
+        pixmap = QPixmap()
+        if not encoded or not pixmap.loadFromData(base64.b64decode(encoded), "PNG"):
+            return QIcon()
+        return QIcon(pixmap)
+
 class MainWindow(QMainWindow):
     """メインウィンドウ"""
+    cassettes_loaded = Signal()  # 起動直後のバックグラウンド読み込みが終わった
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("スクリプトボタン")
@@ -1973,28 +5407,167 @@ class MainWindow(QMainWindow):
         self.cassettes_dir.mkdir(parents=True, exist_ok=True)
         self.saves_dir.mkdir(parents=True, exist_ok=True)
         
-        self.buttons = []
+        self.config = load_config(self.config_file)
+        self.slot_rows = max(1, int(self.config.get('slot_rows', DEFAULT_CONFIG['slot_rows'])))
+        self.slot_columns = max(1, int(self.config.get('slot_columns', DEFAULT_CONFIG['slot_columns'])))
+        self.bank_size = self.slot_rows * self.slot_columns
+        self.bank_count = max(1, int(self.config.get('slot_banks', DEFAULT_CONFIG['slot_banks'])))
+        self.current_bank = 0
+        
+        # 配置の変更を検知して、少し待ってから last_save.json に自動保存する
+        self.layout_dirty = False
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(int(float(self.config.get('autosave_delay', DEFAULT_CONFIG['autosave_delay'])) * 1000))
+        self.autosave_timer.timeout.connect(self.autosave)
+        
+        self.buttons = []  # 表示中のバンクのボタン（バンク切り替え時は使い回す）
+        self.launch_specs = []  # 表示中のバンクの位置 -> 起動情報（キー操作での起動用に事前に作っておく）
+        self.process_registry = ProcessRegistry(self.base_dir / "process_logs")
+        self.instance_server = None  # main() で設定（単一インスタンス・JSON-RPC用のローカルソケット）
+        self.http_server = None      # main() で設定（config.json の rpc_http_port が0以外のとき）
+        self.slot_assignments = {}  # スロット番号 -> カセット（割り当て済みのみ）
         self.cassettes = []
+        self.cassette_index = CassetteIndex()
+        self.slot_assign_dialog = None
+        self.search_index = CassetteSearchIndex()
+        self.command_palette = None
+        self.profile_store = ProfileStore(self.saves_dir, self)
         self.is_admin_mode = False
         self.execution_log = ExecutionLog(self.log_file)
         self.current_save_name = None  # 現在のセーブ名を保持
+        self.ui_snapshot = UiSnapshot(self.base_dir / "ui_snapshot.json")
+        self.cassette_load_task = None  # 起動直後のバックグラウンド読み込み（読み込み中だけ設定）
+        self.pending_launch = None      # 読み込み中に押された起動 (ボタン, スロット, 仮表示のカセット, 起動処理)。最後の1つだけ残す
+        self.snapshot_slots = {}        # 読み込み中に仮表示するスロット -> (名前, 色, アイコンのパス, アイコン, (ID, フォルダ名))
         
-        self.load_cassettes()
         self.setup_ui()
         self.apply_light_theme()
-        self.load_last_save()
+        
+        # 前回終了時のスナップショットがあれば先に描き、カセットはバックグラウンドで読み込む
+        snapshot = self.ui_snapshot.load(self.slot_rows, self.slot_columns)
+        if snapshot:
+            self.show_snapshot(snapshot)
+            self.start_cassette_loading()
+        else:
+            self.load_cassettes()
+            self.load_last_save()
     
     def load_cassettes(self):
         """カセットを読み込み"""
-        self.cassettes = []
-        for folder in self.cassettes_dir.iterdir():
-            if folder.is_dir():
-                cassette = CassetteInfo(folder)
-                if cassette.script_path and cassette.script_path.exists():
-                    self.cassettes.append(cassette)
-        
-        # お気に入りを優先してソート
-        self.cassettes.sort(key=lambda c: (not c.is_favorite, c.name))
+        self.apply_cassettes(CassetteInfo.load_all(self.cassettes_dir))
+    
+    def apply_cassettes(self, cassettes):
+        """読み込んだカセットに差し替える（索引と割り当て済みのスロットも更新）"""
+        for cassette in cassettes:
+            cassette.assign_id()
+        self.cassettes = cassettes
+        self.sort_cassettes()
+        self.cassette_index.rebuild(self.cassettes)
+        self.search_index.sync(self.cassettes)
+        
+        # 割り当て済みのスロットも読み込み直したカセット情報に差し替える
+        self.slot_assignments = {slot: self.cassette_index.resolve(cassette)
+                                 for slot, cassette in self.slot_assignments.items()}
+        if self.buttons:
+            self.show_bank(self.current_bank)
+    
+    def show_snapshot(self, snapshot):
+        """前回終了時の見た目でグリッドを描く（カセットの読み込みが終わるまでの仮表示）"""
+        if (self.saves_dir / "last_save.json").exists():
+            self.current_save_name = "last_save"
+            self.update_title()
+            self.update_profile_combo()
+        self.bank_count = max(self.bank_count, int(snapshot.get('bank_count', 1)))
+        self.update_bank_combo()
+        
+        # バンクを切り替えて戻ってきたときも、読み込みが終わるまでは同じ見た目で描く
+        icons = {key: UiSnapshot.decode_icon(encoded) for key, encoded in snapshot.get('icons', {}).items()}
+        self.snapshot_slots = {
+            entry['slot']: (entry['name'], entry['color'], entry.get('icon'),
+                            icons.get(entry.get('icon')) or QIcon(), (entry.get('id'), entry.get('folder')))
+            for entry in snapshot.get('slots', [])
+        }
+        self.show_bank(int(snapshot.get('bank', 0)))
+        self.bank_label.setText("カセットを読み込み中...")
+    
+    def save_snapshot(self):
+        """表示中のグリッドの見た目を保存（次回の起動時にすぐ描くため）"""
+        slots = []
+        icons = {}  # アイコンのパス -> 縮小画像（同じアイコンは1回だけ保存）
+        for button in self.buttons:
+            cassette = button.cassette
+            if not cassette:
+                continue
+            icon_key = None
+            if cassette.icon_path and cassette.icon_path.exists():
+                icon_key = str(cassette.icon_path)
+                if icon_key not in icons:
+                    icons[icon_key] = UiSnapshot.encode_icon(cassette.icon_path)
+                if icons[icon_key] is None:
+                    icon_key = None
+            slots.append({'slot': button.slot_number, 'name': cassette.name,
+                          'color': cassette.icon_color, 'icon': icon_key,
+                          'id': cassette.cassette_id, 'folder': cassette.folder_path.name})
+        self.ui_snapshot.save({
+            'grid': [self.slot_rows, self.slot_columns],
+            'bank': self.current_bank,
+            'bank_count': self.bank_count,
+            'slots': slots,
+            'icons': {key: encoded for key, encoded in icons.items() if encoded},
+        })
+    
+    def start_cassette_loading(self):
+        """カセットの読み込みをバックグラウンドで開始"""
+        self.cassette_load_task = CassetteLoadTask(self.cassettes_dir)
+        self.cassette_load_task.setAutoDelete(False)
+        self.cassette_load_task.signals.finished.connect(self.on_cassettes_loaded)
+        QThreadPool.globalInstance().start(self.cassette_load_task)
+    
+    def on_cassettes_loaded(self, cassettes):
+        """読み込みが終わったら配置を復元し、仮表示から変わったスロットだけ描き直す"""
+        self.apply_cassettes(cassettes)
+        self.load_last_save()
+        self.cassette_load_task = None
+        self.snapshot_slots = {}
+        
+        redrawn = sum(button.take_over_snapshot(self.slot_assignments.get(button.slot_number))
+                      for button in self.buttons if button.snapshot is not None)
+        self.show_bank(self.current_bank)
+        self.statusBar().showMessage(
+            f"カセットを読み込みました（{len(cassettes)}件、表示を更新したスロット {redrawn}個）", 3000)
+        self.cassettes_loaded.emit()
+        
+        if self.pending_launch:
+            (button, slot, (cassette_id, folder), launch), self.pending_launch = self.pending_launch, None
+            cassette = button.cassette
+            # 押したときに表示されていたカセットのままのときだけ起動する
+            if (button.slot_number == slot and cassette is not None
+                    and cassette.cassette_id == cassette_id and cassette.folder_path.name == folder):
+                launch()
+            else:
+                self.statusBar().showMessage(
+                    f"スロット {slot} の内容が前回終了時から変わったため、読み込み中に押された起動は取り消しました", 5000)
+    
+    def queue_pending_launch(self, button, launch):
+        """読み込み中に押されたボタンを、読み込み後に起動するよう予約する（仮表示のカセットがあるときだけ）"""
+        if button.snapshot is None:
+            return
+        name, _color, _icon_key, _icon, cassette_key = button.snapshot
+        self.pending_launch = (button, button.slot_number, cassette_key, launch)
+        self.statusBar().showMessage(f"カセットを読み込み中です。読み込みが終わると「{name}」を起動します", 3000)
+    
+    def is_loading_cassettes(self):
+        """起動直後のカセット読み込み中か（読み込み中ならステータスバーで知らせる）"""
+        if self.cassette_load_task is None:
+            return False
+        self.statusBar().showMessage("カセットを読み込み中です。少しお待ちください", 3000)
+        return True
+    
+    def sort_cassettes(self):
+        """お気に入り → よく使う順（フレセンシー） → 名前順でソート"""
+        frecency = self.execution_log.rollup.get_frecency()
+        self.cassettes.sort(key=lambda c: (not c.is_favorite, -frecency.get(c.folder_path.name, 0.0), c.name))
     
     def setup_ui(self):
         """UIのセットアップ"""
@@ -2015,21 +5588,77 @@ class MainWindow(QMainWindow):
         self.title_label.setStyleSheet("color: #212121; padding: 10px;")
         main_layout.addWidget(self.title_label)
         
-        # ボタングリッド
+        # バンク切り替え
+        bank_layout = QHBoxLayout()
+        bank_layout.addStretch()
+        
+        self.prev_bank_btn = BankSwitchButton("◀", -1)
+        self.prev_bank_btn.clicked.connect(lambda: self.show_bank(self.current_bank - 1))
+        self.prev_bank_btn.setStyleSheet(self.get_control_button_style("#7f8c8d"))
+        bank_layout.addWidget(self.prev_bank_btn)
+        
+        self.bank_combo = QComboBox()
+        self.bank_combo.setMinimumWidth(120)
+        self.bank_combo.currentIndexChanged.connect(self.show_bank)
+        bank_layout.addWidget(self.bank_combo)
+        
+        self.next_bank_btn = BankSwitchButton("▶", 1)
+        self.next_bank_btn.clicked.connect(lambda: self.show_bank(self.current_bank + 1))
+        self.next_bank_btn.setStyleSheet(self.get_control_button_style("#7f8c8d"))
+        bank_layout.addWidget(self.next_bank_btn)
+        
+        self.bank_label = QLabel()
+        self.bank_label.setStyleSheet("color: #616161; font-size: 12px; padding-left: 10px;")
+        bank_layout.addWidget(self.bank_label)
+        
+        # プロファイル（セーブデータ）の切り替え
+        profile_label = QLabel("プロファイル:")
+        profile_label.setStyleSheet("color: #616161; font-size: 12px; padding-left: 20px;")
+        bank_layout.addWidget(profile_label)
+        
+        self.profile_combo = QComboBox()
+        self.profile_combo.setMinimumWidth(160)
+        self.profile_combo.setToolTip("Ctrl+Tab / Ctrl+Shift+Tab で順に切り替え、Alt+1〜9 で直接選択")
+        self.profile_combo.textActivated.connect(self.switch_profile)
+        bank_layout.addWidget(self.profile_combo)
+        
+        bank_layout.addStretch()
+        main_layout.addLayout(bank_layout)
+        
+        QShortcut(QKeySequence(Qt.Key_PageUp), self, lambda: self.show_bank(self.current_bank - 1))
+        QShortcut(QKeySequence(Qt.Key_PageDown), self, lambda: self.show_bank(self.current_bank + 1))
+        QShortcut(QKeySequence("Ctrl+K"), self, self.show_command_palette)
+        QShortcut(QKeySequence("Ctrl+Tab"), self, lambda: self.cycle_profile(1))
+        QShortcut(QKeySequence("Ctrl+Shift+Tab"), self, lambda: self.cycle_profile(-1))
+        for number in range(1, 10):
+            QShortcut(QKeySequence(f"Alt+{number}"), self, lambda n=number: self.switch_profile_at(n - 1))
+        
+        # 数字キー（1〜9, 0）とファンクションキー（F1〜F12）で表示中のバンクのスロットを起動
+        for position, key in enumerate("1234567890"):
+            QShortcut(QKeySequence(key), self, lambda p=position: self.launch_position(p))
+        for position in range(12):
+            QShortcut(QKeySequence(f"F{position + 1}"), self, lambda p=position: self.launch_position(p))
+        
+        self.profile_store.profiles_changed.connect(self.update_profile_combo)
+        self.update_profile_combo()
+        
+        # ボタングリッド（1バンク分だけ作り、バンク切り替え時は中身を差し替える）
         self.button_frame = QFrame()
         grid_layout = QGridLayout()
         grid_layout.setSpacing(15)
         
-        for i in range(10):
+        for i in range(self.bank_size):
             button = GameButton(i + 1)
             button.clicked.connect(lambda checked, b=button: self.on_button_clicked(b))
             self.buttons.append(button)
-            row = i // 5
-            col = i % 5
+            row = i // self.slot_columns
+            col = i % self.slot_columns
             grid_layout.addWidget(button, row, col)
         
         self.button_frame.setLayout(grid_layout)
         main_layout.addWidget(self.button_frame)
+        self.update_bank_combo()
+        self.show_bank(0)
         
         # コントロールボタン
         control_layout = QHBoxLayout()
@@ -2049,6 +5678,11 @@ class MainWindow(QMainWindow):
         save_button.setStyleSheet(self.get_control_button_style("#3498db"))
         control_layout.addWidget(save_button)
         
+        auto_fill_button = QPushButton("✨ 自動配置")
+        auto_fill_button.clicked.connect(self.auto_fill_slots)
+        auto_fill_button.setStyleSheet(self.get_control_button_style("#d35400"))
+        control_layout.addWidget(auto_fill_button)
+        
         load_button = QPushButton("📂 ロード")
         load_button.clicked.connect(self.load_configuration)
         load_button.setStyleSheet(self.get_control_button_style("#9b59b6"))
@@ -2059,6 +5693,16 @@ class MainWindow(QMainWindow):
         log_button.setStyleSheet(self.get_control_button_style("#16a085"))
         control_layout.addWidget(log_button)
         
+        stats_button = QPushButton("📈 統計")
+        stats_button.clicked.connect(self.show_usage_stats)
+        stats_button.setStyleSheet(self.get_control_button_style("#2c3e50"))
+        control_layout.addWidget(stats_button)
+        
+        audit_button = QPushButton("🩺 依存監査")
+        audit_button.clicked.connect(self.show_dependency_audit)
+        audit_button.setStyleSheet(self.get_control_button_style("#8e44ad"))
+        control_layout.addWidget(audit_button)
+        
         help_button = QPushButton("❓ ヘルプ")
         help_button.clicked.connect(self.show_help)
         help_button.setStyleSheet(self.get_control_button_style("#f39c12"))
@@ -2111,6 +5755,144 @@ class MainWindow(QMainWindow):
         for button in self.buttons:
             button.update_display()
     
+    def bank_slots(self, bank):
+        """バンクに含まれるスロット番号の範囲"""
+        start = bank * self.bank_size + 1
+        return range(start, start + self.bank_size)
+    
+    def update_bank_combo(self):
+        """バンクの選択肢をバンク数に合わせる"""
+        self.bank_combo.blockSignals(True)
+        while self.bank_combo.count() < self.bank_count:
+            self.bank_combo.addItem(f"バンク {self.bank_combo.count() + 1}")
+        while self.bank_combo.count() > self.bank_count:
+            self.bank_combo.removeItem(self.bank_combo.count() - 1)
+        self.bank_combo.setCurrentIndex(self.current_bank)
+        self.bank_combo.blockSignals(False)
+    
+    def update_bank_label(self):
+        """表示中のバンクの割り当て数を表示"""
+        if self.cassette_load_task is not None:
+            self.bank_label.setText("カセットを読み込み中...")
+            return
+        assigned = sum(1 for slot in self.bank_slots(self.current_bank) if slot in self.slot_assignments)
+        self.bank_label.setText(
+            f"{assigned}/{self.bank_size} 割り当て済み（全体 {len(self.slot_assignments)} スロット）")
+    
+    def show_bank(self, bank):
+        """バンクを切り替える（ボタンは作り直さず、変わったボタンだけ割り当てを差し替える）"""
+        bank = max(0, min(bank, self.bank_count - 1))
+        self.current_bank = bank
+        for button, slot in zip(self.buttons, self.bank_slots(bank)):
+            look = self.snapshot_slots.get(slot)
+            if look is not None:
+                # 仮表示のまま（読み込みが終わったら take_over_snapshot で差し替える）
+                if button.snapshot is None or button.slot_number != slot:
+                    button.set_snapshot(slot, *look)
+                continue
+            cassette = self.slot_assignments.get(slot)
+            if button.slot_number != slot or button.cassette is not cassette:
+                button.set_slot(slot, cassette)
+        
+        self.bank_combo.blockSignals(True)
+        self.bank_combo.setCurrentIndex(bank)
+        self.bank_combo.blockSignals(False)
+        self.prev_bank_btn.setEnabled(bank > 0)
+        self.next_bank_btn.setEnabled(bank < self.bank_count - 1)
+        self.update_bank_label()
+        self.update_launch_specs()
+    
+    def set_slot_cassette(self, slot, cassette):
+        """スロットにカセットを割り当てる（Noneでクリア）。表示中のバンクならボタンも更新"""
+        if cassette:
+            self.slot_assignments[slot] = cassette
+        else:
+            self.slot_assignments.pop(slot, None)
+        self.mark_layout_dirty()
+        
+        index = slot - 1 - self.current_bank * self.bank_size
+        if 0 <= index < self.bank_size:
+            self.buttons[index].set_cassette(cassette)
+            self.update_bank_label()
+            self.update_launch_specs()
+    
+    def apply_slot_map(self, slot_map):
+        """スロットマップの配置にする（表示中のバンクは変わったボタンだけ更新）"""
+        assignments = {}
+        for slot, (cassette_id, cassette_folder) in slot_map.items():
+            cassette = self.cassette_index.find(cassette_id, cassette_folder)
+            if cassette:
+                assignments[slot] = cassette
+        self.slot_assignments = assignments
+        self.mark_layout_dirty()
+        
+        # 既定のバンク数を超えるスロットがあればバンクを増やす
+        last_slot = max(assignments, default=0)
+        self.bank_count = max(self.bank_count, -(-last_slot // self.bank_size))
+        self.update_bank_combo()
+        self.show_bank(self.current_bank)
+    
+    def update_profile_combo(self):
+        """プロファイルの選択肢を作り直す"""
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItems(self.profile_store.names())
+        self.profile_combo.setCurrentIndex(self.profile_combo.findText(self.current_save_name or ""))
+        self.profile_combo.blockSignals(False)
+    
+    def switch_profile(self, name):
+        """プロファイルを切り替える（読み込み済みのスロットマップを使うのでダイアログは出さない）"""
+        if self.is_loading_cassettes():
+            return
+        slot_map = self.profile_store.slot_map(name)
+        if slot_map is None:
+            return
+        self.apply_slot_map(slot_map)
+        self.current_save_name = name
+        self.update_title()
+        self.profile_combo.setCurrentIndex(self.profile_combo.findText(name))
+        self.statusBar().showMessage(f"プロファイル「{name}」に切り替えました", 3000)
+    
+    def switch_profile_at(self, index):
+        """一覧の index 番目のプロファイルに切り替える"""
+        names = self.profile_store.names()
+        if 0 <= index < len(names):
+            self.switch_profile(names[index])
+    
+    def cycle_profile(self, step):
+        """前後のプロファイルに切り替える"""
+        names = self.profile_store.names()
+        if not names:
+            return
+        index = names.index(self.current_save_name) + step if self.current_save_name in names else 0
+        self.switch_profile(names[index % len(names)])
+    
+    def mark_layout_dirty(self):
+        """配置が変わったことを記録し、自動保存を予約する（続けて変わったら待ち直す）"""
+        self.layout_dirty = True
+        self.autosave_timer.start()
+    
+    def autosave(self):
+        """変更があったときだけ配置を last_save.json に、カセット情報を info.json に保存する"""
+        for cassette in self.cassettes:
+            if cassette.is_dirty():
+                cassette.save_info()
+        
+        if not self.layout_dirty:
+            return
+        try:
+            write_json_atomic(self.saves_dir / "last_save.json", self.build_save_data(), indent=2, ensure_ascii=False)
+            self.layout_dirty = False
+        except Exception as e:
+            print(f"自動保存エラー: {e}")
+    
+    def build_save_data(self):
+        """セーブデータを作成（割り当て済みのスロットだけを記録する）"""
+        return [
+            {'slot': slot, 'cassette_folder': cassette.folder_path.name, 'cassette_id': cassette.cassette_id}
+            for slot, cassette in sorted(self.slot_assignments.items())
+        ]
+    
     def update_title(self):
         """タイトルを更新"""
         if self.current_save_name:
@@ -2123,6 +5905,8 @@ class MainWindow(QMainWindow):
     
     def create_new_cassette(self):
         """新規カセットを作成"""
+        if self.is_loading_cassettes():
+            return
         dialog = NewCassetteWizard(self.cassettes_dir, self)
         if dialog.exec_() == QDialog.Accepted:
             self.load_cassettes()
@@ -2152,19 +5936,52 @@ class MainWindow(QMainWindow):
             CustomMessageBox.information(self, "モード変更", "ユーザーモードに切り替えました。")
     
     def swap_buttons(self, slot1, slot2):
-        """ボタンの位置を交換"""
-        button1 = self.buttons[slot1 - 1]
-        button2 = self.buttons[slot2 - 1]
-        
-        # カセットを交換
-        temp_cassette = button1.cassette
-        button1.set_cassette(button2.cassette)
-        button2.set_cassette(temp_cassette)
+        """ボタンの位置を交換（別のバンクのスロット同士でもよい）"""
+        cassette1 = self.cassette_index.resolve(self.slot_assignments.get(slot1))
+        cassette2 = self.cassette_index.resolve(self.slot_assignments.get(slot2))
+        self.set_slot_cassette(slot1, cassette2)
+        self.set_slot_cassette(slot2, cassette1)
         
         CustomMessageBox.information(self, "交換完了", f"スロット {slot1} と スロット {slot2} を交換しました。")
     
+    def auto_fill_slots(self):
+        """空きスロットをよく使うカセットで埋める"""
+        if self.is_loading_cassettes():
+            return
+        if not self.is_admin_mode:
+            CustomMessageBox.warning(self, "エラー", "自動配置は管理者モードでのみ使用できます。")
+            return
+        
+        empty_slots = [slot for slot in self.bank_slots(self.current_bank) if slot not in self.slot_assignments]
+        if not empty_slots:
+            CustomMessageBox.information(self, "情報", "このバンクに空きスロットはありません。")
+            return
+        
+        assigned = {cassette.folder_path for cassette in self.slot_assignments.values()}
+        frecency = self.execution_log.rollup.get_frecency()
+        candidates = heapq.nsmallest(
+            len(empty_slots),
+            (c for c in self.cassettes if c.folder_path not in assigned),
+            key=lambda c: (-frecency.get(c.folder_path.name, 0.0), not c.is_favorite, c.name)
+        )
+        if not candidates:
+            CustomMessageBox.information(self, "情報", "配置できるカセットがありません。")
+            return
+        
+        names = "\n".join(f"• {c.name}" for c in candidates)
+        if not CustomMessageBox.question(self, "確認", f"空きスロット {len(candidates)} 個によく使うカセットを配置しますか？\n\n{names}"):
+            return
+        
+        for slot, cassette in zip(empty_slots, candidates):
+            self.set_slot_cassette(slot, cassette)
+    
     def on_button_clicked(self, button):
         """ボタンクリック時の処理"""
+        if self.is_loading_cassettes():
+            # ユーザーモードなら読み込みが終わってから起動する
+            if not self.is_admin_mode:
+                self.queue_pending_launch(button, lambda: self.on_button_clicked(button))
+            return
         if self.is_admin_mode:
             if not self.cassettes:
                 reply = CustomMessageBox.question(
@@ -2176,20 +5993,72 @@ class MainWindow(QMainWindow):
                     self.create_new_cassette()
                 return
             
-            dialog = SlotAssignDialog(button.slot_number, self.cassettes, self)
+            # ダイアログは一度だけ作り、2回目以降は中身を差し替えて使い回す
+            if self.slot_assign_dialog is None:
+                self.slot_assign_dialog = SlotAssignDialog(button.slot_number, self.cassettes, self)
+            else:
+                self.slot_assign_dialog.prepare(button.slot_number, self.cassettes)
+            dialog = self.slot_assign_dialog
             if dialog.exec_() == QDialog.Accepted:
-                cassette = dialog.get_selected_cassette()
-                if cassette:
-                    button.set_cassette(cassette)
-                else:
-                    button.clear_cassette()
-                self.load_cassettes()
+                self.set_slot_cassette(button.slot_number, dialog.get_selected_cassette())
+            
+            # ダイアログ内でカセットを編集した場合に備えて並び順と表示を更新
+            self.sort_cassettes()
+            for slot_button in self.buttons:
+                slot_button.update_display()
+            self.update_launch_specs()
         else:
             if button.cassette:
                 self.execute_script(button.cassette)
             else:
                 CustomMessageBox.information(self, "情報", f"スロット {button.slot_number} にはカセットが割り当てられていません。")
     
+    @staticmethod
+    def build_launch_spec(cassette):
+        """起動に必要な情報をまとめる (引数, シェル経由か, 作業フォルダ, スクリプトのパス, カセット)"""
+        script = str(cassette.script_path)
+        if cassette.script_path.suffix == '.py':
+            return ([sys.executable, script], False, str(cassette.folder_path), script, cassette)
+        return ([script], True, str(cassette.folder_path), script, cassette)
+    
+    def update_launch_specs(self):
+        """表示中のバンクの起動情報を作り直す"""
+        self.launch_specs = [
+            self.build_launch_spec(button.cassette) if button.cassette and button.cassette.script_path else None
+            for button in self.buttons
+        ]
+    
+    def launch_position(self, position):
+        """キー操作で表示中のバンクの position 番目のスロットを起動（確認ダイアログは出さない）"""
+        start = time.perf_counter()
+        if self.is_admin_mode:
+            return
+        if self.is_loading_cassettes():
+            if position < len(self.buttons):
+                self.queue_pending_launch(self.buttons[position], lambda: self.launch_position(position))
+            return
+        spec = self.launch_specs[position] if position < len(self.launch_specs) else None
+        if spec is None:
+            if position < len(self.buttons):
+                self.statusBar().showMessage(f"スロット {self.buttons[position].slot_number} にはカセットが割り当てられていません", 3000)
+            return
+        
+        args, shell, cwd, script, cassette = spec
+        if not os.path.exists(script):
+            CustomMessageBox.critical(self, "エラー", f"スクリプトが見つかりません: {script}")
+            return
+        try:
+            self.process_registry.start(spec)
+        except Exception as e:
+            CustomMessageBox.critical(self, "エラー", f"スクリプトの実行に失敗しました: {str(e)}")
+            return
+        latency = (time.perf_counter() - start) * 1000
+        
+        # 起動後の記録はプロセス起動の後で行う
+        self.statusBar().showMessage(f"「{cassette.name}」を起動しました（{latency:.1f}ms）", 3000)
+        self.execution_log.add_log(cassette.name, cassette.folder_path.name)
+        self.sort_cassettes()
+    
     def execute_script(self, cassette):
         """スクリプトを実行"""
         if not cassette.script_path.exists():
@@ -2197,48 +6066,182 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            if cassette.script_path.suffix == '.py':
-                subprocess.Popen([sys.executable, str(cassette.script_path)], cwd=str(cassette.folder_path))
-            else:
-                subprocess.Popen([str(cassette.script_path)], shell=True, cwd=str(cassette.folder_path))
+            self.process_registry.start(self.build_launch_spec(cassette))
             
             # 実行ログに記録
             self.execution_log.add_log(cassette.name, cassette.folder_path.name)
+            self.sort_cassettes()
             
             CustomMessageBox.information(self, "実行", f"「{cassette.name}」を起動しました！")
         except Exception as e:
             CustomMessageBox.critical(self, "エラー", f"スクリプトの実行に失敗しました: {str(e)}")
     
+    def find_cassette(self, key):
+        """フォルダ名・カセットID・カセット名のどれかでカセットを探す"""
+        cassette = self.cassette_index.find(key, key)
+        if cassette is None:
+            cassette = next((c for c in self.cassettes if c.name == key), None)
+        return cassette
+    
+    def handle_remote_request(self, method, params):
+        """別のプロセスからの要求を処理（InstanceServer・RpcHttpServer から呼ばれる）"""
+        handlers = {
+            'window.show': self.remote_show,
+            'server.info': self.remote_server_info,
+            'cassettes.list': self.remote_list_cassettes,
+            'cassette.launch': self.remote_launch,
+            'processes.list': self.remote_list_processes,
+            'process.output': self.remote_process_output,
+            'logs.recent': self.remote_recent_logs,
+            'profiles.list': self.remote_list_profiles,
+            'profile.switch': self.remote_switch_profile,
+        }
+        handler = handlers.get(method)
+        if handler is None:
+            raise RpcError(-32601, f"不明なメソッドです: {method}")
+        if self.cassette_load_task is not None and method in ('cassettes.list', 'cassette.launch', 'profile.switch'):
+            raise RpcError(-32000, "カセットを読み込み中です。少し待ってから送り直してください")
+        return handler(params)
+    
+    def remote_show(self, params):
+        """ウィンドウを前面に出す"""
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        return {'shown': True}
+    
+    def remote_server_info(self, params):
+        """待ち受け中のソケットとポート"""
+        return {
+            'socket': self.instance_server.server.fullServerName() if self.instance_server else None,
+            'http_port': self.http_server.server.serverPort() if self.http_server else None,
+            'pid': os.getpid(),
+        }
+    
+    def remote_list_cassettes(self, params):
+        """カセットの一覧（割り当て済みのスロット番号付き）"""
+        slots = {}
+        for slot, cassette in sorted(self.slot_assignments.items()):
+            slots.setdefault(cassette.folder_path.name, []).append(slot)
+        return [
+            {
+                'folder': cassette.folder_path.name,
+                'id': cassette.cassette_id,
+                'name': cassette.name,
+                'description': cassette.description,
+                'tags': cassette.tags,
+                'favorite': cassette.is_favorite,
+                'slots': slots.get(cassette.folder_path.name, []),
+            }
+            for cassette in self.cassettes
+        ]
+    
+    def remote_launch(self, params):
+        """カセットを起動（確認ダイアログは出さない）。cassette（フォルダ名・ID・名前）か slot で指定
+        
+        capture_output を true にすると出力をログファイルに記録し、process.output で読める
+        （既定では従来どおり起動元の標準入出力を引き継ぐ）
+        """
+        if 'slot' in params:
+            slot = params['slot']
+            cassette = self.slot_assignments.get(slot) if isinstance(slot, int) else None
+            if cassette is None:
+                raise RpcError(-32602, f"スロット {slot} にはカセットが割り当てられていません")
+        else:
+            key = params.get('cassette') or params.get('folder')
+            cassette = self.find_cassette(key) if key else None
+            if cassette is None:
+                raise RpcError(-32602, f"カセットが見つかりません: {key}")
+        if not cassette.script_path or not cassette.script_path.exists():
+            raise RpcError(-32000, f"スクリプトが見つかりません: {cassette.script_path}")
+        
+        record = self.process_registry.start(self.build_launch_spec(cassette),
+                                             capture_output=bool(params.get('capture_output')))
+        
+        self.statusBar().showMessage(f"「{cassette.name}」を起動しました", 3000)
+        self.execution_log.add_log(cassette.name, cassette.folder_path.name)
+        self.sort_cassettes()
+        return record.to_dict()
+    
+    def remote_list_processes(self, params):
+        """起動したプロセスの一覧（running_only で実行中だけ）"""
+        records = self.process_registry.list(include_finished=not params.get('running_only', False))
+        return [record.to_dict() for record in records]
+    
+    def remote_process_output(self, params):
+        """プロセスの出力の末尾（lines 行、既定100行。capture_output で起動したプロセスのみ）"""
+        record = self.process_registry.get(params.get('pid'))
+        if record is None:
+            raise RpcError(-32602, f"プロセスが見つかりません: {params.get('pid')}")
+        lines = params.get('lines', 100)
+        if not isinstance(lines, int):
+            raise RpcError(-32602, "lines には整数を指定してください")
+        result = record.to_dict()
+        result['lines'] = record.tail(min(lines, ProcessRegistry.MAX_TAIL_LINES))
+        return result
+    
+    def remote_recent_logs(self, params):
+        """最近の実行ログ（limit 件、既定50件）"""
+        limit = params.get('limit', 50)
+        if not isinstance(limit, int):
+            raise RpcError(-32602, "limit には整数を指定してください")
+        return self.execution_log.get_recent_logs(max(0, min(limit, 1000)))
+    
+    def remote_list_profiles(self, params):
+        """プロファイルの一覧と現在のプロファイル"""
+        return {'profiles': self.profile_store.names(), 'current': self.current_save_name}
+    
+    def remote_switch_profile(self, params):
+        """プロファイルを切り替える"""
+        name = params.get('name')
+        if self.profile_store.slot_map(name) is None:
+            raise RpcError(-32602, f"プロファイルが見つかりません: {name}")
+        self.switch_profile(name)
+        return {'profile': name}
+    
+    def show_command_palette(self):
+        """コマンドパレットを開く"""
+        if self.is_loading_cassettes():
+            return
+        if self.command_palette is None:
+            self.command_palette = CommandPalette(self.search_index, self)
+            self.command_palette.cassette_launched.connect(self.execute_script)
+        self.command_palette.open_palette(self.cassettes, self.execution_log.rollup.get_frecency())
+    
     def show_execution_log(self):
         """実行ログを表示"""
         dialog = ExecutionLogDialog(self.execution_log, self)
         dialog.exec_()
     
+    def show_dependency_audit(self):
+        """カセットライブラリの依存関係を監査"""
+        dialog = DependencyAuditDialog(self.cassettes_dir, self)
+        dialog.exec_()
+    
+    def show_usage_stats(self):
+        """利用統計を表示"""
+        dialog = UsageStatsDialog(self.execution_log, self)
+        dialog.exec_()
+    
     def save_configuration(self):
         """設定を保存"""
+        if self.is_loading_cassettes():
+            return
         dialog = SaveLoadDialog('save', self.saves_dir, self)
         if dialog.exec_() == QDialog.Accepted:
             save_file = dialog.get_selected_file()
-            config = []
-            for button in self.buttons:
-                if button.cassette:
-                    config.append({
-                        'slot': button.slot_number,
-                        'cassette_folder': button.cassette.folder_path.name
-                    })
-                else:
-                    config.append({
-                        'slot': button.slot_number,
-                        'cassette_folder': None
-                    })
+            config = self.build_save_data()
             
             try:
-                with open(save_file, 'w', encoding='utf-8') as f:
-                    json.dump(config, f, indent=2, ensure_ascii=False)
+                write_json_atomic(save_file, config, indent=2, ensure_ascii=False)
                 
                 # セーブ名を更新
                 self.current_save_name = save_file.stem
                 self.update_title()
+                self.profile_store.refresh()
+                self.update_profile_combo()
                 
                 CustomMessageBox.information(self, "保存完了", f"設定を保存しました: {save_file.name}")
             except Exception as e:
@@ -2246,6 +6249,8 @@ class MainWindow(QMainWindow):
     
     def load_configuration(self):
         """設定を読み込み"""
+        if self.is_loading_cassettes():
+            return
         dialog = SaveLoadDialog('load', self.saves_dir, self)
         if dialog.exec_() == QDialog.Accepted:
             save_file = dialog.get_selected_file()
@@ -2254,26 +6259,16 @@ class MainWindow(QMainWindow):
     def load_from_file(self, save_file):
         """ファイルから設定を読み込み"""
         try:
-            with open(save_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            for button in self.buttons:
-                button.clear_cassette()
-            
-            for item in config:
-                slot = item['slot']
-                cassette_folder = item.get('cassette_folder')
-                
-                if cassette_folder and 0 < slot <= 10:
-                    cassette = next((c for c in self.cassettes if c.folder_path.name == cassette_folder), None)
-                    if cassette:
-                        self.buttons[slot - 1].set_cassette(cassette)
+            # 空きスロットは記録しない形式（旧形式の cassette_folder: null もそのまま読める）
+            # IDで探すので、セーブ後にフォルダ名を変えたカセットも見つかる
+            self.apply_slot_map(self.profile_store.read(save_file))
             
             # セーブ名を更新
             self.current_save_name = save_file.stem
             self.update_title()
+            self.profile_combo.setCurrentIndex(self.profile_combo.findText(self.current_save_name))
             
-            CustomMessageBox.information(self, "読み込み完了", f"設定を読み込みました: {save_file.name}")
+            self.statusBar().showMessage(f"設定を読み込みました: {save_file.name}", 3000)
         except Exception as e:
             CustomMessageBox.critical(self, "エラー", f"読み込みに失敗しました: {str(e)}")
     
@@ -2282,39 +6277,111 @@ class MainWindow(QMainWindow):
         last_save = self.saves_dir / "last_save.json"
         if last_save.exists():
             self.load_from_file(last_save)
+            # 読み込んだだけなので保存し直す必要はない
+            self.layout_dirty = False
+            self.autosave_timer.stop()
     
     def show_help(self):
         """ヘルプを表示"""
-        dialog = HelpDialog(self.buttons, self)
+        if self.is_loading_cassettes():
+            return
+        dialog = HelpDialog(self.slot_assignments, self.bank_size, self)
         dialog.exec_()
     
     def closeEvent(self, event):
-        """終了時に自動保存"""
-        last_save = self.saves_dir / "last_save.json"
-        config = []
-        for button in self.buttons:
-            if button.cassette:
-                config.append({
-                    'slot': button.slot_number,
-                    'cassette_folder': button.cassette.folder_path.name
-                })
-            else:
-                config.append({
-                    'slot': button.slot_number,
-                    'cassette_folder': None
-                })
-        
-        try:
-            with open(last_save, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"自動保存エラー: {e}")
-        
+        """終了時に自動保存（変更がなければ書き込まない）し、次回の起動用にグリッドの見た目を保存"""
+        self.autosave_timer.stop()
+        self.autosave()
+        if self.cassette_load_task is None:
+            self.save_snapshot()
         event.accept()
 
+def parse_args(argv):
+    """コマンドライン引数を解析（Qt用の引数はそのまま残す）"""
+    parser = argparse.ArgumentParser(description="スクリプトボタン")
+    parser.add_argument('--rebuild-stats', action='store_true',
+                        help="実行ログから利用統計の集計を作り直して終了")
+    parser.add_argument('--audit-deps', action='store_true',
+                        help="全カセットの依存ライブラリを監査してレポートを表示し終了")
+    parser.add_argument('--export-log', metavar='PATH',
+                        help="実行ログを書き出して終了（PATHに - を指定すると標準出力）")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv',
+                        help="--export-log の形式（既定: csv）")
+    parser.add_argument('--since', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="--export-log の開始日（この日を含む）")
+    parser.add_argument('--until', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="--export-log の終了日（この日を含む）")
+    parser.add_argument('--cassette', metavar='NAME',
+                        help="--export-log の対象カセット（フォルダ名またはカセット名）")
+    parser.add_argument('--run', metavar='CASSETTE',
+                        help="カセットを起動（起動中のウィンドウがあればそちらで起動）")
+    parser.add_argument('--profile', metavar='NAME',
+                        help="プロファイル（セーブデータ）を切り替えて表示")
+    return parser.parse_known_args(argv[1:])
+
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    base_dir = Path(__file__).parent.resolve()
+    
+    if args.rebuild_stats:
+        execution_log = ExecutionLog(base_dir / "execution_log.json")
+        rollup = execution_log.rebuild_rollup()
+        print(f"集計を作り直しました: {rollup.entry_count}件 / {len(rollup.totals)}カセット -> {rollup.rollup_file}")
+        return
+    
+    if args.audit_deps:
+        report = DependencyAudit(base_dir / "cassettes").run()
+        print(DependencyAudit.format_report(report))
+        return
+    
+    if args.export_log:
+        execution_log = ExecutionLog(base_dir / "execution_log.json")
+        start = datetime.combine(args.since, datetime.min.time()) if args.since else None
+        end = datetime.combine(args.until, datetime.min.time()) + timedelta(days=1) if args.until else None
+        if args.export_log == '-':
+            count = execution_log.export(sys.stdout, args.format, start, end, args.cassette)
+        else:
+            with open(args.export_log, 'w', encoding='utf-8', newline='') as f:
+                count = execution_log.export(f, args.format, start, end, args.cassette)
+        print(f"{count}件をエクスポートしました", file=sys.stderr)
+        return
+    
+    # 起動中のインスタンスがあれば要求を渡してすぐ終了する
+    instance_requests = []
+    if args.profile:
+        instance_requests.append(('profile.switch', {'name': args.profile}))
+    if args.run:
+        instance_requests.append(('cassette.launch', {'cassette': args.run}))
+    if not instance_requests:
+        instance_requests.append(('window.show', {}))
+    
+    server_name = instance_server_name(base_dir)
+    exit_code = forward_instance_requests(server_name, instance_requests)
+    if exit_code is not None:
+        sys.exit(exit_code)
+    
+    # ウィンドウを作る前に待ち受けを始め、ほぼ同時に起動した2つ目は先に待ち受けた方へ渡す
+    app = QApplication(sys.argv[:1] + qt_args)
+    instance_server = InstanceServer(server_name, None, app)
+    listening = instance_server.listen()
+    if not listening:
+        exit_code = forward_instance_requests(server_name, instance_requests)
+        if exit_code is not None:
+            sys.exit(exit_code)
+        print(f"単一インスタンス用ソケットを開けません: {instance_server.server.errorString()}")
+    
     window = MainWindow()
+    instance_server.handler = window.handle_remote_request
+    if listening:
+        window.instance_server = instance_server
+    
+    http_port = int(window.config.get('rpc_http_port') or 0)
+    if http_port:
+        http_server = RpcHttpServer(window.handle_remote_request, window)
+        if http_server.listen(http_port):
+            window.http_server = http_server
+        else:
+            print(f"JSON-RPC の HTTP ポート {http_port} を開けません: {http_server.server.errorString()}")
     
     # ウィンドウを画面の中央に配置
     screen = app.primaryScreen().geometry()
@@ -2324,6 +6391,20 @@ def main():
     window.move(window_geometry.topLeft())
     
     window.show()
+    
+    def apply_instance_requests():
+        for method, params in instance_requests:
+            if method != 'window.show':
+                try:
+                    window.handle_remote_request(method, params)
+                except RpcError as e:
+                    print(f"エラー: {e}", file=sys.stderr)
+    
+    # スナップショットから起動した場合はカセットの読み込みを待ってから処理する
+    if window.cassette_load_task is not None:
+        window.cassettes_loaded.connect(apply_instance_requests)
+    else:
+        apply_instance_requests()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+"""CassetteIndex（カセットID・フォルダ名の索引）のテスト"""
+from pathlib import Path
+from types import SimpleNamespace
+
+from game_script_button import CassetteIndex
+
+
+def make_cassette(folder, cassette_id=None):
+    return SimpleNamespace(folder_path=Path("/cassettes") / folder, cassette_id=cassette_id)
+
+
+def test_find_prefers_exact_id_and_folder_for_copied_cassettes():
+    original = make_cassette('tool', cassette_id='id-1')
+    copy = make_cassette('tool_copy', cassette_id='id-1')
+    index = CassetteIndex([copy, original])
+    assert index.duplicate_ids == {'id-1': ['tool', 'tool_copy']}
+    assert index.find('id-1', 'tool') is original
+    assert index.find('id-1', 'tool_copy') is copy
+    # フォルダ名を変えたときはIDで（重複していればフォルダ名順で最初のもの）
+    assert index.find('id-1', 'renamed') is original
+
+
+def test_find_falls_back_to_folder_and_id():
+    a = make_cassette('a', cassette_id='id-a')
+    b = make_cassette('b')
+    index = CassetteIndex([a, b])
+    assert len(index) == 2
+    assert index.find('id-a', 'moved') is a
+    assert index.find(None, 'b') is b
+    assert index.find('unknown', 'b') is b
+    assert index.find('unknown', 'missing') is None
+    assert index.find() is None
+
+
+def test_resolve_replaces_stale_cassette():
+    stale = make_cassette('a', cassette_id='id-a')
+    fresh = make_cassette('a', cassette_id='id-a')
+    index = CassetteIndex([fresh])
+    assert index.resolve(stale) is fresh
+    assert index.resolve(None) is None
+    gone = make_cassette('gone', cassette_id='id-gone')
+    assert index.resolve(gone) is gone
@@ -0,0 +1,77 @@
+"""CassetteInfo（info.json の読み書き）のテスト"""
+import json
+
+import pytest
+
+from game_script_button import CassetteInfo
+
+
+def write_info(folder, **data):
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "info.json").write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+
+def read_info(folder):
+    return json.loads((folder / "info.json").read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def shared_icon(tmp_path):
+    icon = tmp_path / "shared" / "shared_icon.png"
+    icon.parent.mkdir()
+    icon.write_bytes(b"")
+    return icon
+
+
+def test_copy_mode_icon_outside_folder_loads_and_is_kept(tmp_path, shared_icon):
+    folder = tmp_path / "cassettes" / "tool"
+    write_info(folder, name="ツール", script="main.py", icon=str(shared_icon))
+    (folder / "main.py").write_text("print('hi')\n", encoding='utf-8')
+
+    cassette = CassetteInfo(folder)
+    assert cassette.icon_path == shared_icon
+    assert cassette.saved_data['icon'] == str(shared_icon)
+    assert not cassette.is_dirty()
+
+    cassette.description = "説明"
+    cassette.save_info()
+    assert read_info(folder)['icon'] == str(shared_icon)
+    assert read_info(folder)['script'] == "main.py"
+
+
+def test_outside_paths_do_not_break_load_all(tmp_path, shared_icon):
+    cassettes_dir = tmp_path / "cassettes"
+    write_info(cassettes_dir / "a", name="A", script="../../outside.py", icon=str(shared_icon))
+    write_info(cassettes_dir / "b", name="B")
+    (tmp_path / "outside.py").write_text("", encoding='utf-8')
+    (cassettes_dir / "b" / "main.py").write_text("", encoding='utf-8')
+    names = sorted(cassette.name for cassette in CassetteInfo.load_all(cassettes_dir))
+    assert names == ["A", "B"]
+
+
+def test_changed_paths_are_written_relative_inside_and_absolute_outside(tmp_path, shared_icon):
+    folder = tmp_path / "cassettes" / "tool"
+    write_info(folder, name="ツール", script="main.py", icon="icon.png")
+    (folder / "sub").mkdir()
+    (folder / "sub" / "run.py").write_text("", encoding='utf-8')
+
+    cassette = CassetteInfo(folder)
+    cassette.script_path = folder / "sub" / "run.py"
+    cassette.icon_path = shared_icon  # 編集画面でフォルダの外のアイコンを選んだ
+    cassette.save_info()
+    data = read_info(folder)
+    assert data['script'] == str(folder.joinpath("sub", "run.py").relative_to(folder))
+    assert data['icon'] == str(shared_icon)
+    assert CassetteInfo(folder).icon_path == shared_icon
+
+
+def test_reference_mode_with_missing_source_keeps_settings(tmp_path):
+    folder = tmp_path / "cassettes" / "ref"
+    write_info(folder, name="参照", source_folder=str(tmp_path / "gone"), script="app/run.py", icon="logo.png")
+    (folder / "fallback.py").write_text("", encoding='utf-8')
+
+    cassette = CassetteInfo(folder)
+    assert cassette.source_folder is None
+    assert cassette.saved_data['script'] == "app/run.py"
+    assert cassette.saved_data['icon'] == "logo.png"
+    assert cassette.saved_data['source_folder'] == str(tmp_path / "gone")
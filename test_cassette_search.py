@@ -0,0 +1,133 @@
+"""CassetteSearchIndex（コマンドパレットのあいまい検索）のテスト
+
+検索結果は、全カセットについて部分一致と3文字組の一致率を素朴に調べた結果と比べる。
+"""
+import math
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from game_script_button import CassetteSearchIndex
+
+
+def make_cassette(folder, name=None, tags=(), description=""):
+    return SimpleNamespace(folder_path=Path("/cassettes") / folder, name=name or folder,
+                           tags=list(tags), description=description)
+
+
+WORDS = ['calc', 'calculator', 'note', 'notepad', 'memo', 'メモ帳', 'timer', 'image', 'resize',
+         'backup', 'ファイル', 'rename', 'pdf', 'merge', 'Ｃａｌｃ', 'photo', 'sync']
+
+
+def make_cassettes(count, seed):
+    rng = random.Random(seed)
+    return [make_cassette(f"c{i:03d}",
+                          name=" ".join(rng.sample(WORDS, rng.randint(1, 2))),
+                          tags=rng.sample(WORDS, rng.randint(0, 2)),
+                          description=" ".join(rng.sample(WORDS, rng.randint(0, 3))))
+            for i in range(count)]
+
+
+def normalize(text):
+    return CassetteSearchIndex.normalize(text)
+
+
+def grams_of(text):
+    n = CassetteSearchIndex.NGRAM
+    return {text[i:i + n] for i in range(len(text) - n + 1)} if len(text) >= n else ({text} if text else set())
+
+
+def brute_tier(cassette, term):
+    """語に対するカセットの一致段階（0=名前の前方一致 … 4=あいまい一致、None=不一致）"""
+    name, tags = normalize(cassette.name), normalize(" ".join(cassette.tags))
+    description = normalize(cassette.description)
+    if name.startswith(term):
+        return 0
+    if term in name:
+        return 1
+    if term in tags:
+        return 2
+    if term in description:
+        return 3
+    if len(term) >= CassetteSearchIndex.NGRAM:
+        term_grams = grams_of(term)
+        grams = set()
+        for word in name.split() + tags.split():
+            grams |= grams_of(word)
+        need = math.ceil(round(len(term_grams) * CassetteSearchIndex.MIN_OVERLAP, 6))
+        if len(term_grams & grams) >= max(1, need):
+            return 4
+    return None
+
+
+@pytest.fixture(scope='module')
+def cassettes():
+    return make_cassettes(200, seed=7)
+
+
+@pytest.fixture(scope='module')
+def index(cassettes):
+    index = CassetteSearchIndex()
+    index.sync(cassettes)
+    return index
+
+
+@pytest.mark.parametrize('query', ['calc', 'CALC', 'ｃａｌｃ', 'note', 'calcu', 'clac', 'notpad', 'メモ',
+                                   'pdf', 'xyz', 'ca', 'imgae', 'calculatr', 'notepd'])
+def test_single_term_matches_brute_force_in_tier_order(index, cassettes, query):
+    term = normalize(query)
+    expected = {c.folder_path.name: brute_tier(c, term) for c in cassettes}
+    expected = {key: tier for key, tier in expected.items() if tier is not None}
+
+    results = index.search(query, limit=len(cassettes))
+    keys = [c.folder_path.name for c in results]
+    assert sorted(keys) == sorted(expected)
+    tiers = [expected[key] for key in keys]
+    assert tiers == sorted(tiers)
+
+
+def test_single_term_limit_returns_best_tiers(index, cassettes):
+    full = [c.folder_path.name for c in index.search('note', limit=len(cassettes))]
+    assert [c.folder_path.name for c in index.search('note', limit=5)] == full[:5]
+
+
+@pytest.mark.parametrize('query', ['calc note', 'memo timer photo', 'pdf merge', 'calc xyz'])
+def test_multiple_terms_are_and_of_brute_force_matches(index, cassettes, query):
+    terms = normalize(query).split()
+    expected = {c.folder_path.name for c in cassettes
+                if all(brute_tier(c, term) is not None for term in terms)}
+    results = index.search(query, limit=len(cassettes))
+    assert {c.folder_path.name for c in results} == expected
+
+
+def test_boost_breaks_ties_within_a_tier():
+    cassettes = [make_cassette('a', name='timer'), make_cassette('b', name='timer')]
+    index = CassetteSearchIndex()
+    index.sync(cassettes)
+    assert index.search('timer', boost={'b': 1.0})[0] is cassettes[1]
+    assert index.search('timer', boost={'a': 1.0})[0] is cassettes[0]
+
+
+def test_sync_reindexes_only_changed_and_drops_removed(cassettes):
+    index = CassetteSearchIndex()
+    index.sync(cassettes)
+    renamed = make_cassette('c000', name='zebra')
+    kept = cassettes[1:150]
+    index.sync([renamed] + kept)
+    assert len(index) == 150
+    assert index.search('zebra') == [renamed]
+    # 外したカセットは3文字組の索引にも残らない
+    removed = {c.folder_path.name for c in cassettes[150:]}
+    assert not any(keys & removed for keys in index.postings.values())
+    assert removed.isdisjoint(c.folder_path.name for c in index.search('calc', limit=1000))
+    # 内容が同じなら新しいオブジェクトに差し替えるだけ
+    same = make_cassette('c001', name=kept[0].name, tags=kept[0].tags, description=kept[0].description)
+    index.sync([renamed, same] + kept[1:])
+    assert index.entries['c001'][1] is same
+
+
+def test_empty_query_returns_nothing(index):
+    assert index.search('') == []
+    assert index.search('   ') == []
@@ -0,0 +1,34 @@
+"""DependencyCache（依存関係チェック結果のディスクキャッシュ）のテスト"""
+import json
+
+from game_script_button import DependencyCache
+
+
+def test_round_trip_and_fingerprint(tmp_path):
+    cache = DependencyCache(tmp_path / "cache.json")
+    cache.put('key', 'env-1', {'missing': ['requests']})
+    assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]  # 一時ファイルが残らない
+
+    reloaded = DependencyCache(tmp_path / "cache.json")
+    assert reloaded.get('key', 'env-1') == {'missing': ['requests']}
+    assert reloaded.get('key', 'env-2') is None  # 環境が変われば無効
+    assert reloaded.get('other', 'env-1') is None
+
+
+def test_keeps_most_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(DependencyCache, 'MAX_ENTRIES', 3)
+    cache = DependencyCache(tmp_path / "cache.json")
+    for i in range(3):
+        cache.put(f"k{i}", 'env', i, save=False)
+        cache.entries[f"k{i}"]['used'] = i
+    cache.entries['k0']['used'] = 10  # 最近使われた
+    cache.put('k3', 'env', 3)
+    assert sorted(json.loads((tmp_path / "cache.json").read_text(encoding='utf-8'))) == ['k0', 'k2', 'k3']
+
+
+def test_broken_file_is_ignored(tmp_path):
+    (tmp_path / "cache.json").write_text('{"key": {"fingerprint"', encoding='utf-8')
+    cache = DependencyCache(tmp_path / "cache.json")
+    assert cache.get('key', 'env') is None
+    cache.put('key', 'env', 1)
+    assert DependencyCache(tmp_path / "cache.json").get('key', 'env') == 1
@@ -0,0 +1,49 @@
+"""dependency_scan（importの解析とワーカープロセス）のテスト"""
+import pytest
+
+import dependency_scan
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "main.py").write_text("import os, requests\nimport helper\nfrom pkg import sub\n", encoding='utf-8')
+    (tmp_path / "helper.py").write_text("import missing_lib_helper\n", encoding='utf-8')
+    (tmp_path / "pkg" / "__init__.py").write_text("", encoding='utf-8')
+    (tmp_path / "pkg" / "sub.py").write_text("from .. import helper\nimport missing_lib_sub\n", encoding='utf-8')
+    (tmp_path / "broken.py").write_text("import (\n", encoding='utf-8')
+    return tmp_path
+
+
+def test_collect_imports_follows_local_modules(project):
+    result = dependency_scan.collect_imports(project / "main.py", project)
+    assert result['third_party'] == ['missing_lib_helper', 'missing_lib_sub', 'requests']
+    assert result['chains']['missing_lib_sub'] == ['main.py', 'pkg/sub.py']
+    assert result['local_modules'] == ['helper.py', 'pkg/__init__.py', 'pkg/sub.py']
+    assert 'error' in dependency_scan.collect_imports(project / "broken.py", project)
+
+
+@pytest.fixture
+def pool():
+    pool = dependency_scan.ScanPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_results_match_in_process(project, pool):
+    paths = [str(project / name) for name in ("main.py", "helper.py", "broken.py")]
+    for path, (imports, error) in zip(paths, pool.map('parse_imports', paths)):
+        expected_imports, expected_error = dependency_scan.parse_imports(path)
+        assert [tuple(item) for item in imports] == expected_imports
+        assert error == expected_error
+    remote = pool.submit('collect_cassette_imports', str(project / "main.py"), str(project)).result()
+    assert remote == dependency_scan.collect_cassette_imports(str(project / "main.py"), str(project))
+
+
+def test_worker_survives_bad_requests(pool):
+    assert pool.call('parse_imports', __file__)[1] is None
+    with pytest.raises(RuntimeError):
+        pool.call('no_such_function')
+    # 不正な要求のあとも同じワーカーで続けられる
+    assert pool.call('parse_imports', __file__)[1] is None
+    assert len(pool.processes) == 1
@@ -0,0 +1,157 @@
+"""ExecutionLog（実行ログ）のテスト
+
+手で作ったログ（日時を解析できない行を含む）に対して、絞り込みや並べ替えの
+結果を素朴な計算と比べる。
+"""
+import io
+import json
+import random
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from game_script_button import ExecutionLog, UsageRollup
+
+CASSETTES = [('電卓', 'calc'), ('メモ帳', 'notepad'), ('Hello', 'hello_world'), ('電卓', 'calc_old')]
+
+
+def build_entries(count, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 8, 0)
+    entries = []
+    for i in range(count):
+        name, folder = rng.choice(CASSETTES)
+        timestamp = (start + timedelta(minutes=37 * i)).isoformat()
+        if i % 17 == 5:
+            timestamp = 'not a date'
+        entries.append({'cassette_name': name, 'cassette_folder': folder, 'timestamp': timestamp})
+    return entries
+
+
+@pytest.fixture
+def entries():
+    return build_entries(500, seed=4)
+
+
+@pytest.fixture
+def log(tmp_path, entries):
+    log_file = tmp_path / "execution_log.json"
+    log_file.write_text(json.dumps(entries, ensure_ascii=False), encoding='utf-8')
+    return ExecutionLog(log_file)
+
+
+def parse(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+
+def date_prefix(text):
+    """日時の前方一致を、桁をそろえた ISO 形式の前方一致に直す（"2025-1-3 1" → "2025-01-03T01"）"""
+    parts = re.split(r'[-/ :t]', text)
+    if not all(part.isdigit() for part in parts) or len(parts[0]) != 4:
+        return None
+    return parts[0] + ''.join(separator + part.zfill(2) for separator, part in zip('--T:', parts[1:]))
+
+
+def test_unfiltered_records_keep_unparsable_rows(log, entries):
+    records = list(log.iter_records())
+    assert len(records) == len(entries)
+    for record, entry in zip(records, entries):
+        assert record['cassette_folder'] == entry['cassette_folder']
+        expected = entry['timestamp'] if parse(entry['timestamp']) else ''
+        assert record['timestamp'] == expected
+
+
+@pytest.mark.parametrize('start, end, cassette', [
+    (datetime(2025, 1, 3), None, None),
+    (None, datetime(2025, 1, 5), None),
+    (datetime(2025, 1, 2), datetime(2025, 1, 4), 'calc'),
+    (None, None, '電卓'),
+    (None, None, 'missing'),
+])
+def test_filtered_records_match_brute_force(log, entries, start, end, cassette):
+    expected = []
+    for entry in entries:
+        moment = parse(entry['timestamp'])
+        if start or end:
+            if moment is None or (start and moment < start) or (end and moment >= end):
+                continue
+        if cassette and cassette not in (entry['cassette_name'], entry['cassette_folder']):
+            continue
+        expected.append(entry['cassette_folder'])
+    assert [record['cassette_folder'] for record in log.iter_records(start, end, cassette)] == expected
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_export_writes_every_row(log, entries, fmt):
+    f = io.StringIO()
+    assert log.export(f, fmt) == len(entries)
+    lines = f.getvalue().splitlines()
+    assert len(lines) == len(entries) + (1 if fmt == 'csv' else 0)
+
+
+@pytest.mark.parametrize('text', ['', 'calc', '電卓', 'hello', '2025', '2025-01-02', '2025/1/3 1', '2025-01-03 10:5', 'zzz'])
+@pytest.mark.parametrize('sort_column', [0, 1, 2])
+@pytest.mark.parametrize('descending', [False, True])
+def test_query_matches_brute_force(log, entries, text, sort_column, descending):
+    needle = text.lower()
+    prefix = date_prefix(needle)
+    rows = []
+    for index, entry in enumerate(entries):
+        moment = parse(entry['timestamp'])
+        if needle and not (needle in entry['cassette_name'].lower() or needle in entry['cassette_folder'].lower()
+                           or (prefix and moment and moment.isoformat().startswith(prefix))):
+            continue
+        rows.append(index)
+    if sort_column == 0:
+        rows.sort(key=lambda i: entries[i]['cassette_name'])
+    elif sort_column == 2:
+        rows.sort(key=lambda i: entries[i]['cassette_folder'])
+    if descending:
+        rows.reverse()
+
+    result = [int(i) for i in log.query(text, sort_column, descending)]
+    if sort_column == 1:
+        assert result == rows
+    else:
+        # 同じキーの中の順序は問わない
+        key = (lambda i: entries[i]['cassette_name']) if sort_column == 0 else (lambda i: entries[i]['cassette_folder'])
+        assert sorted(result) == sorted(rows)
+        assert [key(i) for i in result] == [key(i) for i in rows]
+
+
+def test_as_arrays_returns_copies(log):
+    cassette_ids, timestamps = log.as_arrays()
+    count = log.count()
+    log.add_log('電卓', 'calc')  # 配列を保持したままでも追記できる
+    assert log.count() == count + 1
+    assert len(cassette_ids) == len(timestamps) == count
+
+
+def test_rollup_rebuild_matches_incremental_adds(log, entries, tmp_path):
+    incremental = UsageRollup(tmp_path / "incremental.json")
+    for entry in entries:
+        moment = parse(entry['timestamp'])
+        if moment:
+            incremental.add(entry['cassette_name'], entry['cassette_folder'], moment)
+
+    assert log.rollup.totals == incremental.totals
+    assert log.rollup.daily == incremental.daily
+    assert log.rollup.heatmap == incremental.heatmap
+    now = (datetime(2025, 2, 1) - ExecutionLog.EPOCH).total_seconds()
+    expected = incremental.get_frecency(now)
+    assert log.rollup.get_frecency(now) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('text', ['', 'calc', '2025-01-02', '2025-01-03 10'])
+@pytest.mark.parametrize('sort_column', [0, 1, 2])
+def test_python_fallback_matches_numpy_query(log, text, sort_column):
+    for descending in (False, True):
+        fast = [int(i) for i in log.query(text, sort_column, descending)]
+        slow = list(log._query_python(text, sort_column, descending))
+        assert sorted(fast) == sorted(slow)
+        if sort_column == 1:
+            assert fast == slow
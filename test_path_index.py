@@ -0,0 +1,125 @@
+"""PathIndex（ファイル名のあいまい検索）のテスト
+
+検索結果を、検索語の文字が順番どおりに含まれるかを素朴に調べた結果と比べる。
+"""
+import random
+import string
+
+import pytest
+
+from game_script_button import PathIndex
+
+
+def is_subsequence(query, text):
+    """query の文字が text に順番どおりに含まれるか"""
+    position = 0
+    for char in query:
+        position = text.find(char, position)
+        if position < 0:
+            return False
+        position += 1
+    return True
+
+
+def make_paths(count, seed):
+    """ランダムな相対パス"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_lowercase[:8] + string.digits[:3] + "_-. " + "あé+"
+    paths = set()
+    while len(paths) < count:
+        parts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))).strip() or 'x'
+                 for _ in range(rng.randint(1, 4))]
+        paths.add('/'.join(parts[:-1] + [parts[-1] + rng.choice(['.py', '.txt', '.BAT', ''])]))
+    return sorted(paths)
+
+
+@pytest.fixture(scope='module')
+def paths():
+    return make_paths(3000, seed=1)
+
+
+@pytest.fixture(scope='module')
+def index(paths):
+    index = PathIndex()
+    index.add((path, f"/root/{path}") for path in paths)
+    return index
+
+
+QUERIES = ['a', 'ab', 'abc', 'a/b', 'ba.py', 'py', 'c0', 'h_', 'zz', 'A B', 'a\\b', 'abcdefgh', '.bat', '-',
+           '_', '/', '.', 'あ', 'é', '+', 'É', 'aあ', 'é/']
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_matches_brute_force(index, paths, query):
+    normalized = PathIndex.normalize(query)
+    expected = [path for path in paths if is_subsequence(normalized, path.lower())]
+
+    results, count, exact = index.search(query, limit=len(paths))
+    assert {relative for relative, _path in results} <= set(expected)
+    if exact:
+        assert count == len(expected)
+    else:
+        assert count >= len(expected)
+    if len(expected) <= PathIndex.VERIFY_LIMIT:
+        assert sorted(relative for relative, _path in results) == expected
+
+
+@pytest.mark.parametrize('query', ['a', 'b', 'ab'])
+def test_large_index_unverified_candidates_are_a_superset(query):
+    paths = make_paths(PathIndex.VERIFY_LIMIT + 3000, seed=2)
+    index = PathIndex()
+    index.add((path, path) for path in paths)
+    expected = {path for path in paths if is_subsequence(query, path.lower())}
+    results, count, exact = index.search(query, limit=50)
+    assert len(results) == min(50, len(expected))
+    assert {relative for relative, _path in results} <= expected
+    assert count == len(expected) if exact else count >= len(expected)
+
+
+def test_incremental_typing_uses_prefix_cache_correctly(paths):
+    index = PathIndex()
+    index.add((path, path) for path in paths)
+    query = ''
+    for char in 'ab_c.p':
+        query += char
+        expected = {path for path in paths if is_subsequence(query, path.lower())}
+        results, _count, _exact = index.search(query, limit=len(paths))
+        assert {relative for relative, _path in results} == expected
+
+
+def test_results_are_limited_and_ranked_by_file_name(paths):
+    index = PathIndex()
+    index.add((path, path) for path in paths)
+    results, count, _exact = index.search('a', limit=10)
+    assert len(results) == 10
+    assert count >= 10
+    # ファイル名が検索語で始まるものが先に来る
+    prefix = [relative.rsplit('/', 1)[-1].lower().startswith('a') for relative, _path in results]
+    assert prefix == sorted(prefix, reverse=True)
+
+
+def test_single_symbols_do_not_match_other_symbols():
+    index = PathIndex()
+    index.add((path, path) for path in ['foo/bar.sh', 'src/main.py', 'a_b.py', 'ノート.txt', 'x+y.py'])
+    assert index.search('_') == ([('a_b.py', 'a_b.py')], 1, True)
+    assert sorted(index.search('/')[0]) == [('foo/bar.sh', 'foo/bar.sh'), ('src/main.py', 'src/main.py')]
+    assert index.search('ノ') == ([('ノート.txt', 'ノート.txt')], 1, True)
+    assert index.search('+') == ([('x+y.py', 'x+y.py')], 1, True)
+    assert index.search('ア') == ([], 0, True)
+
+
+def test_add_after_search_invalidates_view():
+    index = PathIndex()
+    index.add([('one/alpha.py', 'p1')])
+    assert index.search('alp')[1] == 1
+    index.add([('two/alpine.txt', 'p2')])
+    results, count, exact = index.search('alp')
+    assert exact and count == 2
+    assert sorted(path for _relative, path in results) == ['p1', 'p2']
+
+
+def test_empty_query_and_empty_index():
+    assert PathIndex().search('abc') == ([], 0, True)
+    index = PathIndex()
+    index.add([('a.py', 'a')])
+    assert index.search('   ') == ([], 0, True)
@@ -0,0 +1,53 @@
+"""dispatch_rpc（JSON-RPC 2.0 の要求1件の処理）のテスト"""
+import json
+
+import pytest
+
+from game_script_button import RpcError, dispatch_rpc
+
+
+def handler(method, params):
+    if method == 'echo':
+        return params
+    if method == 'fail':
+        raise RpcError(-32602, "パラメーターが正しくありません")
+    if method == 'crash':
+        raise RuntimeError("壊れた")
+    raise RpcError(-32601, f"不明なメソッドです: {method}")
+
+
+def call(payload):
+    if not isinstance(payload, bytes):
+        payload = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    response = json.loads(dispatch_rpc(handler, payload))
+    assert response['jsonrpc'] == '2.0'
+    return response
+
+
+def test_success_returns_result_with_same_id():
+    response = call({'jsonrpc': '2.0', 'id': 7, 'method': 'echo', 'params': {'名前': '電卓'}})
+    assert response == {'jsonrpc': '2.0', 'id': 7, 'result': {'名前': '電卓'}}
+
+
+def test_missing_params_default_to_empty_object():
+    assert call({'jsonrpc': '2.0', 'id': 'a', 'method': 'echo'})['result'] == {}
+
+
+@pytest.mark.parametrize('payload, code', [
+    (b'{not json', -32700),
+    (b'\xff\xfe', -32700),
+    ([1, 2, 3], -32600),
+    ({'id': 1}, -32600),
+    ({'id': 1, 'method': 5}, -32600),
+    ({'id': 1, 'method': 'echo', 'params': [1]}, -32600),
+    ({'id': 1, 'method': 'nope'}, -32601),
+    ({'id': 1, 'method': 'fail'}, -32602),
+    ({'id': 1, 'method': 'crash'}, -32603),
+])
+def test_errors_carry_json_rpc_codes(payload, code):
+    response = call(payload)
+    assert 'result' not in response
+    assert response['error']['code'] == code
+    assert response['error']['message']
+    if isinstance(payload, dict):
+        assert response['id'] == payload['id']
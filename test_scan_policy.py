@@ -0,0 +1,113 @@
+"""ScanPolicy（.gitignore形式の除外とフォルダ走査）のテスト"""
+import fnmatch
+import os
+import random
+import string
+
+import pytest
+
+from game_script_button import ScanPolicy
+
+
+def random_paths(count, seed):
+    rng = random.Random(seed)
+    names = ['build', 'src', 'lib', 'node_modules', 'a', 'b', 'test', 'data']
+    paths = set()
+    while len(paths) < count:
+        depth = rng.randint(0, 3)
+        parts = [rng.choice(names) for _ in range(depth)]
+        stem = ''.join(rng.choice(string.ascii_lowercase[:4]) for _ in range(rng.randint(1, 3)))
+        parts.append(stem + rng.choice(['.py', '.pyc', '.log', '.txt', '']))
+        paths.add('/'.join(parts))
+    return sorted(paths)
+
+
+@pytest.mark.parametrize('pattern', ['*.pyc', '*.log', 'a?.txt', '[ab]*.py', 'b'])
+def test_unanchored_file_pattern_matches_basename_like_fnmatch(pattern):
+    policy = ScanPolicy([pattern])
+    for path in random_paths(400, seed=3):
+        expected = fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern)
+        assert policy.is_ignored(path, is_dir=False) == expected, path
+
+
+def test_anchored_pattern_only_matches_from_root():
+    policy = ScanPolicy(['src/*.py', '/build'])
+    assert policy.is_ignored('src/main.py', False)
+    assert not policy.is_ignored('lib/src/main.py', False)
+    assert not policy.is_ignored('src/pkg/main.py', False)
+    assert policy.is_ignored('build', True)
+    assert not policy.is_ignored('lib/build', True)
+
+
+def test_double_star_and_directory_only_patterns():
+    policy = ScanPolicy(['**/cache/**', 'logs/'])
+    assert policy.is_ignored('cache/x.txt', False)
+    assert policy.is_ignored('a/b/cache/x.txt', False)
+    assert policy.is_ignored('logs', True)
+    assert not policy.is_ignored('logs', False)
+
+
+def test_negation_later_pattern_wins():
+    policy = ScanPolicy(['*.log', '!keep.log', '# comment', ''])
+    assert policy.is_ignored('a/run.log', False)
+    assert not policy.is_ignored('a/keep.log', False)
+    assert len(policy.rules) == 2
+
+
+def test_hidden_entries_are_always_ignored():
+    policy = ScanPolicy(['!.git'])
+    assert policy.is_ignored('.git', True)
+    assert policy.is_ignored('a/.env', False)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    files = ['main.py', 'README.txt', 'sub/tool.py', 'sub/deep/more/x.py',
+             'build/out.py', '.hidden/secret.py', 'sub/run.log']
+    for relative in files:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return tmp_path
+
+
+def walk_relative(policy, root, **kwargs):
+    return sorted(os.path.relpath(path, root).replace(os.sep, '/')
+                  for _relative, files in policy.walk(root, **kwargs) for path in files)
+
+
+def test_walk_matches_os_walk_with_the_same_rules(tree):
+    policy = ScanPolicy(['build/', '*.log'], max_depth=10)
+    expected = []
+    for directory, dirs, files in os.walk(tree):
+        relative_dir = os.path.relpath(directory, tree).replace(os.sep, '/')
+        prefix = '' if relative_dir == '.' else relative_dir + '/'
+        dirs[:] = [d for d in dirs if not policy.is_ignored(prefix + d, True)]
+        expected += [prefix + f for f in files if not policy.is_ignored(prefix + f, False)]
+    assert walk_relative(policy, tree) == sorted(expected)
+
+
+def test_walk_respects_depth_extensions_and_file_limit(tree):
+    policy = ScanPolicy(max_depth=1)
+    assert walk_relative(policy, tree, extensions={'.py'}) == ['build/out.py', 'main.py', 'sub/tool.py']
+    assert walk_relative(policy, tree, extensions={'.py'}, max_depth=0) == ['main.py']
+    assert len(walk_relative(ScanPolicy(max_depth=10, max_files=3), tree)) == 3
+
+
+def test_walk_does_not_loop_on_symlinks(tree):
+    try:
+        os.symlink(tree, tree / 'sub' / 'loop')
+    except (OSError, NotImplementedError):
+        pytest.skip("シンボリックリンクを作れない環境")
+    files = walk_relative(ScanPolicy(max_depth=20), tree)
+    assert len(files) == len(set(files))
+
+
+def test_find_first_prefers_root_then_extension_order(tree):
+    policy = ScanPolicy(max_depth=10)
+    assert policy.find_first(tree, ['.py', '.txt']).name == 'main.py'
+    assert policy.find_first(tree, ['.txt', '.py']).name == 'README.txt'
+    (tree / 'main.py').unlink()
+    (tree / 'README.txt').unlink()
+    assert policy.find_first(tree, ['.py']).name in ('out.py', 'tool.py')
+    assert policy.find_first(tree, ['.exe']) is None
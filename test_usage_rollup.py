@@ -0,0 +1,116 @@
+"""UsageRollup（実行ログの集計）のテスト
+
+差分で加算した集計を、実行の一覧から素朴に数え直した結果と比べる。
+"""
+import json
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from game_script_button import ExecutionLog, UsageRollup
+
+
+def make_runs(count, seed, days=60):
+    rng = random.Random(seed)
+    base = datetime(2025, 3, 1)
+    return [(rng.choice(['calc', 'notepad', 'hello']), base + timedelta(minutes=rng.uniform(0, days * 24 * 60)))
+            for _ in range(count)]
+
+
+@pytest.fixture
+def runs():
+    return make_runs(400, seed=6)
+
+
+@pytest.fixture
+def rollup(tmp_path, runs):
+    rollup = UsageRollup(tmp_path / "rollup.json")
+    for folder, moment in runs:
+        rollup.add(folder.upper(), folder, moment)
+    return rollup
+
+
+def test_counts_match_brute_force(rollup, runs):
+    assert rollup.totals == dict(Counter(folder for folder, _moment in runs))
+    assert rollup.entry_count == len(runs)
+    cells = Counter(moment.weekday() * 24 + moment.hour for _folder, moment in runs)
+    assert rollup.heatmap == [cells.get(cell, 0) for cell in range(7 * 24)]
+    daily = Counter((moment.strftime("%Y-%m-%d"), folder) for folder, moment in runs)
+    assert {(day, folder): count for day, buckets in rollup.daily.items()
+            for folder, count in buckets.items()} == dict(daily)
+    assert [count for _folder, _name, count in rollup.get_ranking()] == sorted(rollup.totals.values(), reverse=True)
+
+
+def test_daily_counts_fill_days_without_runs(rollup, runs):
+    today = date(2025, 4, 20)
+    daily = rollup.get_daily_counts(30, today=today)
+    assert len(daily) == 30
+    assert daily[-1][0] == "2025-04-20"
+    assert [day for day, _count in daily] == [(today - timedelta(days=29 - i)).isoformat() for i in range(30)]
+    expected = Counter(moment.date().isoformat() for _folder, moment in runs)
+    assert [count for _day, count in daily] == [expected.get(day, 0) for day, _count in daily]
+    # 記録がまったくない期間も30日分の0件になる
+    assert rollup.get_daily_counts(30, today=date(2030, 1, 1)) == [
+        ((date(2030, 1, 1) - timedelta(days=29 - i)).isoformat(), 0) for i in range(30)]
+    calc = rollup.get_daily_counts(30, 'calc', today=today)
+    assert sum(count for _day, count in calc) == sum(
+        1 for folder, moment in runs if folder == 'calc' and today - timedelta(days=29) <= moment.date() <= today)
+
+
+def test_daily_is_capped_to_recent_days(tmp_path):
+    rollup = UsageRollup(tmp_path / "rollup.json")
+    base = datetime(2024, 1, 1, 12)
+    for day in range(UsageRollup.DAILY_DAYS * 3):
+        rollup.add('電卓', 'calc', base + timedelta(days=day))
+    assert len(rollup.daily) == UsageRollup.DAILY_DAYS
+    newest = base + timedelta(days=UsageRollup.DAILY_DAYS * 3 - 1)
+    assert max(rollup.daily) == newest.strftime("%Y-%m-%d")
+    # 件数の合計は日別を間引いても変わらない
+    assert rollup.totals == {'calc': UsageRollup.DAILY_DAYS * 3}
+
+
+def test_save_is_atomic_and_round_trips(rollup, tmp_path):
+    rollup.save()
+    assert [path.name for path in tmp_path.iterdir()] == ["rollup.json"]  # 一時ファイルが残らない
+    loaded = UsageRollup(tmp_path / "rollup.json")
+    assert loaded.loaded
+    assert (loaded.totals, loaded.daily, loaded.heatmap) == (rollup.totals, rollup.daily, rollup.heatmap)
+
+
+def test_load_prunes_old_unbounded_files(tmp_path):
+    rollup_file = tmp_path / "rollup.json"
+    days = [(date(2023, 1, 1) + timedelta(days=i)).isoformat() for i in range(400)]
+    rollup_file.write_text(json.dumps({'version': UsageRollup.VERSION, 'entry_count': 400,
+                                       'daily': {day: {'calc': 1} for day in days}}), encoding='utf-8')
+    rollup = UsageRollup(rollup_file)
+    assert rollup.loaded
+    assert sorted(rollup.daily) == days[-UsageRollup.DAILY_DAYS:]
+
+
+def test_broken_file_is_not_loaded(tmp_path):
+    rollup_file = tmp_path / "rollup.json"
+    rollup_file.write_text('{"version": 2, "totals": {"ca', encoding='utf-8')
+    rollup = UsageRollup(rollup_file)
+    assert not rollup.loaded
+    assert rollup.totals == {}
+
+
+def test_frecency_matches_sum_of_decayed_runs(tmp_path):
+    rng = random.Random(5)
+    rollup = UsageRollup(tmp_path / "rollup.json")
+    runs = {}
+    base = datetime(2025, 3, 1)
+    for _ in range(300):
+        folder = rng.choice(['a', 'b', 'c'])
+        # 時刻が前後しても（遅れて届いたログ）同じ値になる
+        moment = base + timedelta(hours=rng.uniform(0, 24 * 60))
+        rollup.add(folder, folder, moment)
+        runs.setdefault(folder, []).append((moment - ExecutionLog.EPOCH).total_seconds())
+
+    now = (base + timedelta(days=61) - ExecutionLog.EPOCH).total_seconds()
+    half_life = UsageRollup.FRECENCY_HALF_LIFE
+    expected = {folder: sum(2 ** (-(now - seconds) / half_life) for seconds in times)
+                for folder, times in runs.items()}
+    assert rollup.get_frecency(now) == pytest.approx(expected)